@@ -0,0 +1 @@
+# Este archivo convierte el directorio 'benchmarks' en un sub-paquete de Python.
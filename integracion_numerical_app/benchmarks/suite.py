@@ -0,0 +1,236 @@
+# suite.py - Benchmarks de los métodos de integración con líneas base en JSON
+#
+# Uso:
+#   python -m integracion_numerical_app.benchmarks.suite --guardar base.json
+#   python -m integracion_numerical_app.benchmarks.suite --comparar base.json --umbral 0.15
+#   python -m integracion_numerical_app.benchmarks.suite --N 100 10000 --metodos simpson_funcion
+#
+# Cada caso es (método, integrando, N, detalle) y registra el mejor tiempo, la mediana,
+# los puntos (y, si el método evalúa el integrando, las evaluaciones) por segundo y la
+# memoria pico. Con --comparar el proceso termina con código 1 si algún caso es más lento
+# (o usa más memoria) que la línea base por encima del umbral, o si falta en alguna de las dos.
+
+import argparse
+import itertools
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from ..core.calculation_report import DETALLE_COMPLETO, DETALLE_NINGUNO
+from ..core.simpson_function_method import simpson_funcion
+from ..core.simpson_vector_method import simpson_un_tercio
+from ..core.trapeze_function_method import trapecio_funcion
+from ..core.vectorized_engine import construir_malla, evaluar_puntos
+
+VERSION_FORMATO = 1
+
+# Integrandos por costo de evaluación: nombre -> (f_str, a, b)
+INTEGRANDOS = {
+    "polinomico": ("3*x**3 - 2*x**2 + x - 5", 0.0, 2.0),
+    "trascendente": ("exp(-x) * sin(3*x) + log1p(x) * cos(x)", 0.0, 3.0),
+    "por_tramos": ("abs(x - 0.7) + floor(3*x) / 3", 0.0, 2.0),
+    # max() de Python no acepta arreglos: mide el camino escalar de respaldo
+    "por_tramos_escalar": ("max(x - 0.7, 0.7 - x) + floor(3*x) / 3", 0.0, 2.0),
+}
+
+VALORES_N = tuple(10 ** k for k in range(2, 8)) # 10^2 ... 10^7 (pares, como exige Simpson)
+# N máximo de los integrandos lentos (el camino escalar tarda ~1.5 s por cada 10^6 puntos)
+N_MAXIMO_INTEGRANDO = {"por_tramos_escalar": 10 ** 6}
+DETALLES = (DETALLE_NINGUNO, DETALLE_COMPLETO)
+MAX_FILAS_REPORTE = 500 # Las GUIs muestran el reporte truncado a estas filas
+
+
+def _preparar_funcion(metodo):
+    def preparar(f_str, a, b, N, detail):
+        return lambda: metodo(f_str, a, b, N, detail=detail)
+    return preparar
+
+
+def _preparar_vector(f_str, a, b, N, detail):
+    # Los vectores tabulados se generan fuera de la medición
+    x = construir_malla("simpson", a, b, N)
+    fx = evaluar_puntos(f_str, x)
+    return lambda: simpson_un_tercio(x, fx, detail=detail)
+
+
+# Métodos medidos: nombre -> función (f_str, a, b, N, detail) que devuelve la llamada a medir
+METODOS = {
+    "simpson_funcion": _preparar_funcion(simpson_funcion),
+    "trapecio_funcion": _preparar_funcion(trapecio_funcion),
+    "simpson_un_tercio": _preparar_vector,
+}
+# Métodos que reciben los valores ya tabulados: procesan puntos pero no evalúan el integrando
+METODOS_TABULADOS = ("simpson_un_tercio",)
+
+
+def _ejecutar(llamada, detail):
+    """Ejecuta una llamada y, con reporte, lo genera como lo haría la GUI."""
+    integral, detalle, _, _ = llamada()
+    if integral is None:
+        raise RuntimeError(f"El método falló: {detalle}")
+    if detail != DETALLE_NINGUNO:
+        detalle.render(max_filas=MAX_FILAS_REPORTE)
+
+
+def medir_caso(metodo, integrando, N, detail, min_tiempo=0.2, max_repeticiones=200):
+    """
+    Mide un caso: la ejecuta primero con tracemalloc para la memoria pico (esa ejecución
+    sirve de calentamiento y no se usa para los tiempos) y luego la repite hasta acumular
+    'min_tiempo' segundos (como mucho 'max_repeticiones' veces).
+
+    Retorna:
+        dict con segundos (mejor tiempo), mediana, repeticiones, puntos, puntos_por_segundo
+        y memoria_pico (bytes); si el método evalúa el integrando, también evaluaciones y
+        evaluaciones_por_segundo.
+    """
+    f_str, a, b = INTEGRANDOS[integrando]
+    llamada = METODOS[metodo](f_str, a, b, N, detail)
+    tracemalloc.start()
+    try:
+        _ejecutar(llamada, detail)
+        _, memoria_pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    tiempos = []
+    while not tiempos or (sum(tiempos) < min_tiempo and len(tiempos) < max_repeticiones):
+        inicio = time.perf_counter()
+        _ejecutar(llamada, detail)
+        tiempos.append(time.perf_counter() - inicio)
+
+    mejor = min(tiempos)
+    medicion = {"segundos": mejor, "mediana": statistics.median(tiempos), "repeticiones": len(tiempos),
+                "puntos": N + 1, "puntos_por_segundo": (N + 1) / mejor, "memoria_pico": memoria_pico}
+    if metodo not in METODOS_TABULADOS:
+        medicion.update(evaluaciones=N + 1, evaluaciones_por_segundo=(N + 1) / mejor)
+    return medicion
+
+
+def clave_caso(metodo, integrando, N, detail):
+    return f"{metodo}|{integrando}|N={N}|detail={detail}"
+
+
+def ejecutar_suite(metodos=tuple(METODOS), integrandos=tuple(INTEGRANDOS), valores_N=VALORES_N,
+                   detalles=DETALLES, min_tiempo=0.2, max_repeticiones=200, progreso=None):
+    """
+    Ejecuta la matriz completa de casos.
+
+    Parámetros:
+        progreso (callable, opcional): Se llama con (clave, medicion) al terminar cada caso.
+
+    Retorna:
+        dict listo para guardarse como JSON: {"version", "entorno", "casos": {clave: medición}}.
+    """
+    casos = {}
+    for metodo, integrando, N, detail in itertools.product(metodos, integrandos, valores_N, detalles):
+        if N > N_MAXIMO_INTEGRANDO.get(integrando, N):
+            continue
+        clave = clave_caso(metodo, integrando, N, detail)
+        casos[clave] = medir_caso(metodo, integrando, N, detail, min_tiempo, max_repeticiones)
+        if progreso is not None:
+            progreso(clave, casos[clave])
+    return {"version": VERSION_FORMATO,
+            "entorno": {"python": platform.python_version(), "numpy": np.__version__,
+                        "plataforma": platform.platform(), "procesador": platform.processor()},
+            "casos": casos}
+
+
+def comparar(actual, base, umbral=0.20, umbral_memoria=None):
+    """
+    Compara dos ejecuciones de la suite caso por caso. Un caso que solo está en una de
+    las dos (ej. un método que dejó de medirse o una línea base de otra matriz) también
+    cuenta como regresión, con estado "sin_medir" o "sin_base" y cambios None.
+
+    Parámetros:
+        umbral (float): Aumento relativo del mejor tiempo que se considera regresión (0.20 = 20%).
+        umbral_memoria (float, opcional): Igual para la memoria pico; None no la compara.
+
+    Retorna:
+        Tupla (list[dict], list[dict]): todas las comparaciones y las que son regresiones.
+    """
+    comparaciones = []
+    for clave in sorted(actual["casos"].keys() | base["casos"].keys()):
+        if clave not in actual["casos"] or clave not in base["casos"]:
+            estado = "sin_medir" if clave not in actual["casos"] else "sin_base"
+            comparaciones.append({"caso": clave, "estado": estado, "cambio_tiempo": None,
+                                  "cambio_memoria": None, "regresion": True})
+            continue
+        nuevo, anterior = actual["casos"][clave], base["casos"][clave]
+        cambio_tiempo = nuevo["segundos"] / anterior["segundos"] - 1.0
+        cambio_memoria = (nuevo["memoria_pico"] / anterior["memoria_pico"] - 1.0
+                          if anterior["memoria_pico"] else 0.0)
+        regresion = cambio_tiempo > umbral or (umbral_memoria is not None and cambio_memoria > umbral_memoria)
+        comparaciones.append({"caso": clave, "estado": "comparado", "cambio_tiempo": cambio_tiempo,
+                              "cambio_memoria": cambio_memoria, "regresion": regresion})
+    return comparaciones, [c for c in comparaciones if c["regresion"]]
+
+
+def _formatear_medicion(clave, medicion):
+    if "evaluaciones_por_segundo" in medicion:
+        ritmo = f"{medicion['evaluaciones_por_segundo']:>12.3e} eval/s "
+    else:
+        ritmo = f"{medicion['puntos_por_segundo']:>12.3e} pts/s  "
+    return (f"{clave:<55} {medicion['segundos'] * 1e3:>11.3f} ms {ritmo}"
+            f"{medicion['memoria_pico'] / 2 ** 20:>9.2f} MiB")
+
+
+def main(argv=None):
+    """Punto de entrada de la línea de comandos."""
+    parser = argparse.ArgumentParser(prog="python -m integracion_numerical_app.benchmarks.suite",
+                                     description="Benchmarks de los métodos de integración.")
+    parser.add_argument("--metodos", nargs="+", choices=tuple(METODOS), default=tuple(METODOS))
+    parser.add_argument("--integrandos", nargs="+", choices=tuple(INTEGRANDOS), default=tuple(INTEGRANDOS))
+    parser.add_argument("--N", nargs="+", type=int, default=VALORES_N, help="Valores de N (pares, >= 6).")
+    parser.add_argument("--detalles", nargs="+", choices=DETALLES, default=DETALLES)
+    parser.add_argument("--min-tiempo", type=float, default=0.2, help="Segundos mínimos medidos por caso.")
+    parser.add_argument("--repeticiones", type=int, default=200, help="Repeticiones máximas por caso.")
+    parser.add_argument("--guardar", metavar="ARCHIVO", help="Guardar los resultados como línea base JSON.")
+    parser.add_argument("--comparar", metavar="ARCHIVO", help="Línea base JSON con la que comparar.")
+    parser.add_argument("--umbral", type=float, default=0.20,
+                        help="Aumento relativo de tiempo que cuenta como regresión (por defecto 0.20).")
+    parser.add_argument("--umbral-memoria", type=float, default=None,
+                        help="Aumento relativo de memoria pico que cuenta como regresión (por defecto no se compara).")
+    args = parser.parse_args(argv)
+    if any(N < 6 or N % 2 for N in args.N):
+        parser.error("Cada N debe ser par y >= 6.")
+
+    base = None
+    if args.comparar:
+        with open(args.comparar, "r", encoding="utf-8") as archivo:
+            base = json.load(archivo)
+        if base.get("version") != VERSION_FORMATO:
+            parser.error(f"Formato de línea base no soportado: {base.get('version')}.")
+
+    resultados = ejecutar_suite(args.metodos, args.integrandos, args.N, args.detalles, args.min_tiempo,
+                                args.repeticiones,
+                                progreso=lambda clave, medicion: print(_formatear_medicion(clave, medicion),
+                                                                       flush=True))
+    if args.guardar:
+        with open(args.guardar, "w", encoding="utf-8") as archivo:
+            json.dump(resultados, archivo, indent=2)
+        print(f"Línea base guardada en {args.guardar}.")
+
+    if base is None:
+        return 0
+    comparaciones, regresiones = comparar(resultados, base, args.umbral, args.umbral_memoria)
+    print(f"\nComparación con {args.comparar} (umbral de tiempo {args.umbral:.0%}):")
+    for c in comparaciones:
+        if c["estado"] == "sin_medir":
+            print(f"{c['caso']:<55} FALTA: está en la línea base pero no se midió")
+            continue
+        if c["estado"] == "sin_base":
+            print(f"{c['caso']:<55} FALTA: no está en la línea base")
+            continue
+        marca = "REGRESIÓN" if c["regresion"] else ""
+        print(f"{c['caso']:<55} tiempo {c['cambio_tiempo']:>+8.1%}  memoria {c['cambio_memoria']:>+8.1%}  {marca}")
+    print(f"{len(regresiones)} regresiones (incluidos los casos faltantes) en {len(comparaciones)} casos.")
+    return 1 if regresiones else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
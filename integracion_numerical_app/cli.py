@@ -0,0 +1,192 @@
+# cli.py - Ejecución de integrales por lotes sin interfaz gráfica
+#
+# Uso:
+#   python -m integracion_numerical_app.cli trabajos.jsonl --workers 4 > resultados.jsonl
+#   cat trabajos.csv | python -m integracion_numerical_app.cli - --formato csv
+#
+# Cada trabajo JSONL es un objeto como:
+#   {"id": "t1", "method": "simpson", "f_str": "x**2", "a": 0, "b": 1, "N": 10}
+#   {"id": "t2", "method": "tanh_sinh", "f_str": "exp(-x**2)", "a": 0, "b": "inf", "tol": 1e-12}
+# Las claves distintas de id, method, f_str, a, b y N se pasan al método como opciones.
+# En CSV la primera fila es el encabezado con esas mismas columnas.
+
+import argparse
+import csv
+import io
+import json
+import math
+import os
+import sys
+
+import numpy as np
+
+from .core.batch_integration import METODOS_LOTE, METODOS_LOTE_SIN_N, integrar_lote
+from .core.calculation_report import DETALLE_NINGUNO, NIVELES_DETALLE
+from .core.phase_timing import RECOLECTOR_FASES, VARIABLE_ENTORNO, activar_medicion
+
+FORMATOS = ("jsonl", "csv")
+_CAMPOS_FIJOS = ("id", "method", "f_str", "a", "b", "N")
+
+
+def _a_numero(valor):
+    """Convierte límites y opciones dados como texto ("inf", "1e-8", "10", "true") a números o booleanos."""
+    if not isinstance(valor, str):
+        return valor
+    if valor.lower() in ("true", "false"): # Columnas CSV como 'acumulado' o 'auto_N'
+        return valor.lower() == "true"
+    for tipo in (int, float):
+        try:
+            return tipo(valor)
+        except ValueError:
+            pass
+    return valor
+
+
+def trabajo_desde_registro(registro):
+    """
+    Convierte un registro (dict leído de JSONL o CSV) en un trabajo para integrar_lote.
+
+    Excepciones:
+        ValueError si falta algún campo obligatorio.
+    """
+    if not isinstance(registro, dict):
+        raise ValueError("Cada trabajo debe ser un objeto JSON.")
+    faltantes = [campo for campo in ("method", "f_str", "a", "b") if registro.get(campo) in (None, "")]
+    if faltantes:
+        raise ValueError(f"Faltan campos obligatorios: {', '.join(faltantes)}.")
+    N = registro.get("N")
+    N = None if N in (None, "") else _a_numero(N)
+    opciones = {clave: _a_numero(valor) for clave, valor in registro.items()
+                if clave not in _CAMPOS_FIJOS and valor not in (None, "")}
+    return (registro["method"], registro["f_str"], _a_numero(registro["a"]), _a_numero(registro["b"]),
+            N, opciones)
+
+
+def leer_registros(archivo, formato):
+    """
+    Lee los registros de entrada uno por uno (sin cargar el archivo completo).
+
+    Retorna:
+        Generador de tuplas (id, trabajo | None, error | None); el id por defecto es el
+        número de línea / fila.
+    """
+    if formato == "csv":
+        lector = csv.DictReader(archivo)
+        filas = ((lector.line_num, fila) for fila in lector)
+    else:
+        filas = ((numero, linea) for numero, linea in enumerate(archivo, start=1) if linea.strip())
+    for numero, fila in filas:
+        try:
+            registro = fila if formato == "csv" else json.loads(fila)
+            identificador = registro.get("id", numero) if isinstance(registro, dict) else numero
+            yield identificador, trabajo_desde_registro(registro), None
+        except ValueError as e: # json.JSONDecodeError es un ValueError
+            yield numero, None, f"Error: Entrada inválida en la línea {numero}: {e}"
+
+
+def _a_json(valor):
+    """Convierte arreglos y escalares de NumPy (y flotantes no finitos) a valores de JSON."""
+    if isinstance(valor, np.ndarray):
+        return [_a_json(v) for v in valor.tolist()]
+    if isinstance(valor, (list, tuple)):
+        return [_a_json(v) for v in valor]
+    if isinstance(valor, np.generic):
+        valor = valor.item()
+    if isinstance(valor, float) and not math.isfinite(valor):
+        return str(valor) # JSON no admite inf ni nan
+    return valor
+
+
+def resultado_json(identificador, integral, detalle, info, error_lectura=None):
+    """
+    Arma el objeto JSON de un resultado de integrar_lote(..., con_info=True):
+    {"id", "integral", "error"} más el reporte (si se pidió) y la información adicional.
+    """
+    error = error_lectura or (detalle if integral is None else None)
+    resultado = {"id": identificador, "integral": _a_json(integral), "error": error}
+    if error is None:
+        if detalle is not None:
+            resultado["detalle"] = detalle
+        resultado.update({clave: _a_json(valor) for clave, valor in info.items()})
+    return resultado
+
+
+def ejecutar(entrada, salida, formato="jsonl", max_workers=None, chunksize=16, ordenado=True,
+             detail=DETALLE_NINGUNO):
+    """
+    Ejecuta todos los trabajos de 'entrada' y escribe una línea JSON por resultado en 'salida'
+    a medida que terminan. Solo se mantienen en memoria los trabajos en vuelo.
+    Las mediciones por fases de los procesos (si están activas) se suman a RECOLECTOR_FASES.
+
+    Retorna:
+        Tupla (int, int): número de trabajos y número de trabajos con error.
+    """
+    pendientes = {} # indice -> (id, error de lectura); solo los trabajos en vuelo
+
+    def trabajos():
+        for indice, (identificador, trabajo, error) in enumerate(leer_registros(entrada, formato)):
+            pendientes[indice] = (identificador, error)
+            yield trabajo
+
+    total = fallidos = 0
+    for indice, integral, detalle, info in integrar_lote(trabajos(), max_workers=max_workers, chunksize=chunksize,
+                                                         ordenado=ordenado, detail=detail, con_info=True):
+        identificador, error_lectura = pendientes.pop(indice)
+        if "medicion" in info:
+            RECOLECTOR_FASES.acumular(info["medicion"])
+        resultado = resultado_json(identificador, integral, detalle, info, error_lectura)
+        salida.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+        salida.flush()
+        total += 1
+        fallidos += resultado["error"] is not None
+    return total, fallidos
+
+
+def main(argv=None):
+    """Punto de entrada de la línea de comandos."""
+    metodos = ", ".join(sorted({**METODOS_LOTE, **METODOS_LOTE_SIN_N}))
+    parser = argparse.ArgumentParser(
+        prog="python -m integracion_numerical_app.cli",
+        description="Ejecuta integrales por lotes sin interfaz gráfica (entrada JSONL/CSV, salida JSONL).",
+        epilog=f"Métodos disponibles: {metodos}.")
+    parser.add_argument("entrada", nargs="?", default="-",
+                        help="Archivo de trabajos (por defecto '-', la entrada estándar).")
+    parser.add_argument("--formato", choices=FORMATOS,
+                        help="Formato de la entrada (por defecto, según la extensión; jsonl para stdin).")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Número de procesos (por defecto, el número de CPUs).")
+    parser.add_argument("--chunksize", type=int, default=16, help="Trabajos por bloque enviado a cada proceso.")
+    parser.add_argument("--desordenado", action="store_true",
+                        help="Escribir los resultados a medida que terminan, sin respetar el orden de entrada.")
+    parser.add_argument("--detail", choices=NIVELES_DETALLE, default=DETALLE_NINGUNO,
+                        help="Nivel del reporte de cada trabajo (por defecto 'none': no se genera).")
+    parser.add_argument("--medir-fases", action="store_true",
+                        help="Medir el tiempo de cada fase de los integradores: se agrega 'medicion' a cada "
+                             "resultado y el resumen se escribe en stderr.")
+    args = parser.parse_args(argv)
+    if args.medir_fases:
+        activar_medicion(True)
+        os.environ[VARIABLE_ENTORNO] = "1" # Procesos del pool iniciados con 'spawn'
+
+    formato = args.formato or ("csv" if args.entrada.lower().endswith(".csv") else "jsonl")
+    desde_stdin = args.entrada == "-"
+    if desde_stdin:
+        entrada = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8", newline="")
+    else:
+        entrada = open(args.entrada, "r", encoding="utf-8", newline="")
+    try:
+        total, fallidos = ejecutar(entrada, sys.stdout, formato=formato, max_workers=args.workers,
+                                   chunksize=args.chunksize, ordenado=not args.desordenado, detail=args.detail)
+    except ValueError as e: # Parámetros inválidos (ej. chunksize < 1)
+        parser.error(str(e))
+    finally:
+        if not desde_stdin:
+            entrada.close()
+    if args.medir_fases:
+        RECOLECTOR_FASES.volcar(sys.stderr)
+    print(f"{total} trabajos, {fallidos} con error.", file=sys.stderr)
+    return 1 if fallidos else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+
+from .calculation_report import DETALLE_NINGUNO
+from .clenshaw_curtis_method import clenshaw_curtis_funcion
+from .double_integral_method import integral_doble
+from .filon_method import filon_funcion
+from .gauss_kronrod_method import gauss_kronrod_adaptativo
+from .gauss_legendre_method import gauss_legendre_funcion
+from .simpson_function_method import simpson_adaptativo, simpson_funcion
+from .tanh_sinh_method import tanh_sinh_funcion
+from .trapeze_function_method import romberg_funcion, trapecio_funcion
+
+# Métodos disponibles para los trabajos del lote: nombre -> función con la firma
+# (f_str, a, b, N, detail=..., **opciones) que devuelve (integral, detalle, x_puntos, y_puntos).
+METODOS_LOTE = {
+    "simpson": simpson_funcion,
+    "trapecio": trapecio_funcion,
+    "gauss_legendre": gauss_legendre_funcion,
+    "filon": filon_funcion,
+}
+
+# Métodos sin N (adaptativos o con sus propios parámetros): (f_str, a, b, detail=..., **opciones).
+METODOS_LOTE_SIN_N = {
+    "simpson_adaptativo": simpson_adaptativo,
+    "romberg": romberg_funcion,
+    "gauss_kronrod": gauss_kronrod_adaptativo,
+    "tanh_sinh": tanh_sinh_funcion,
+    "clenshaw_curtis": clenshaw_curtis_funcion,
+    "doble": integral_doble,
+}
+
+
+def _ejecutar_trabajo(trabajo, detail):
+    """
+    Ejecuta un trabajo (method, f_str, a, b, N) o (method, f_str, a, b, N, opciones) y
+    devuelve (integral, detalle, info).
+
+    Nunca lanza excepciones: cualquier error se devuelve como (None, mensaje, {}), igual que
+    hacen simpson_funcion y trapecio_funcion con sus validaciones.
+    """
+    try:
+        metodo, f_str, a, b, N, *resto = trabajo
+        opciones = dict(*resto)
+    except (TypeError, ValueError):
+        return None, (f"Error: El trabajo {trabajo!r} debe ser una tupla (method, f_str, a, b, N) "
+                      f"o (method, f_str, a, b, N, opciones)."), {}
+    if metodo in METODOS_LOTE:
+        argumentos = (f_str, a, b, N)
+    elif metodo in METODOS_LOTE_SIN_N:
+        if N is not None:
+            return None, f"Error: El método '{metodo}' no usa N; indique N = None.", {}
+        argumentos = (f_str, a, b)
+    else:
+        return None, (f"Error: Método '{metodo}' desconocido. "
+                      f"Use uno de: {', '.join(sorted({**METODOS_LOTE, **METODOS_LOTE_SIN_N}))}."), {}
+    funcion = METODOS_LOTE.get(metodo) or METODOS_LOTE_SIN_N[metodo]
+    try:
+        resultado = funcion(*argumentos, detail=detail, **opciones)
+    except Exception as e:
+        return None, f"Error inesperado en el trabajo {trabajo!r}: {type(e).__name__}: {e}", {}
+    integral, detalle, _, _ = resultado
+    # El reporte perezoso no se puede enviar entre procesos: se genera aquí como texto.
+    return integral, (str(detalle) if detalle is not None else None), getattr(resultado, "info", {})
+
+
+def _ejecutar_bloque(bloque, detail, con_info):
+    """Ejecuta un bloque de trabajos [(indice, trabajo), ...] en un proceso del pool."""
+    resultados = []
+    for indice, trabajo in bloque:
+        integral, detalle, info = _ejecutar_trabajo(trabajo, detail)
+        resultados.append((indice, integral, detalle, info) if con_info else (indice, integral, detalle))
+    return resultados
+
+
+def _agrupar_en_bloques(trabajos, chunksize):
+    iterador = enumerate(trabajos)
+    while True:
+        bloque = list(islice(iterador, chunksize))
+        if not bloque:
+            return
+        yield bloque
+
+
+def integrar_lote(trabajos, max_workers=None, chunksize=16, ordenado=True,
+                  detail=DETALLE_NINGUNO, executor=None, con_info=False):
+    """
+    Integra muchos trabajos en paralelo con un ProcessPoolExecutor.
+
+    Los trabajos se agrupan en bloques de 'chunksize' para amortizar el costo de enviarlos
+    entre procesos, y solo se mantienen en vuelo unos pocos bloques a la vez, de modo que
+    'trabajos' puede ser un iterable muy grande (o infinito) sin agotar la memoria.
+
+    Parámetros:
+        trabajos (iterable): Tuplas (method, f_str, a, b, N) con method en METODOS_LOTE, o
+            (method, f_str, a, b, N, opciones) con un diccionario de argumentos adicionales
+            (ej. {"k": 50.0} para "filon"). Para los métodos de METODOS_LOTE_SIN_N, N = None.
+        max_workers (int, opcional): Número de procesos (por defecto, os.cpu_count()).
+        chunksize (int): Número de trabajos por bloque enviado a cada proceso.
+        ordenado (bool): True para devolver los resultados en el orden de entrada;
+            False para devolverlos a medida que se completan.
+        detail (str): Nivel del reporte de cada trabajo ("none", "summary" o "full").
+        executor (Executor, opcional): Pool ya creado para reutilizar; si no se indica,
+            se crea uno y se cierra al terminar.
+        con_info (bool): True para agregar a cada resultado la información adicional del
+            método (error estimado, evaluaciones, etc.) como cuarto elemento.
+
+    Retorna:
+        Generador de tuplas (int, float | None, str | None):
+            - Índice del trabajo en la entrada.
+            - Aproximación de la integral, o None si el trabajo falló.
+            - Reporte del cálculo como texto (None si detail="none"), o el mensaje de error.
+        Con con_info=True, tuplas (int, float | None, str | None, dict).
+    """
+    if chunksize < 1:
+        raise ValueError("El tamaño de bloque 'chunksize' debe ser mayor o igual a 1.")
+    propio = executor is None
+    if propio:
+        executor = ProcessPoolExecutor(max_workers=max_workers)
+    max_en_vuelo = 2 * (max_workers or os.cpu_count() or 1)
+
+    def enviar(bloque):
+        indices = [indice for indice, _ in bloque]
+        return executor.submit(_ejecutar_bloque, bloque, detail, con_info), indices
+
+    def resultados_de(futuro, indices):
+        try:
+            return futuro.result()
+        except Exception as e: # Falla del proceso (ej. BrokenProcessPool): afecta solo a este bloque
+            mensaje = f"Error al ejecutar el bloque de trabajos: {type(e).__name__}: {e}"
+            return [(indice, None, mensaje, {}) if con_info else (indice, None, mensaje) for indice in indices]
+
+    bloques = _agrupar_en_bloques(trabajos, chunksize)
+    try:
+        if ordenado:
+            en_vuelo = deque(enviar(bloque) for bloque in islice(bloques, max_en_vuelo))
+            while en_vuelo:
+                futuro, indices = en_vuelo.popleft()
+                yield from resultados_de(futuro, indices)
+                for bloque in islice(bloques, 1):
+                    en_vuelo.append(enviar(bloque))
+        else:
+            en_vuelo = dict(enviar(bloque) for bloque in islice(bloques, max_en_vuelo))
+            while en_vuelo:
+                terminados, _ = wait(en_vuelo, return_when=FIRST_COMPLETED)
+                for futuro in terminados:
+                    yield from resultados_de(futuro, en_vuelo.pop(futuro))
+                for bloque in islice(bloques, len(terminados)):
+                    futuro, indices = enviar(bloque)
+                    en_vuelo[futuro] = indices
+    finally:
+        if propio:
+            executor.shutdown(cancel_futures=True)
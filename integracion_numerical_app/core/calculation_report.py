@@ -0,0 +1,114 @@
+from .phase_timing import MEDICION_NULA
+
+# Niveles de detalle aceptados por los métodos de integración (parámetro 'detail').
+DETALLE_NINGUNO = "none"      # Sin reporte: el método devuelve None en lugar del detalle.
+DETALLE_RESUMEN = "summary"   # Solo encabezado y resultado, sin tabla ni suma expandida.
+DETALLE_COMPLETO = "full"     # Reporte completo (comportamiento original).
+
+NIVELES_DETALLE = (DETALLE_NINGUNO, DETALLE_RESUMEN, DETALLE_COMPLETO)
+
+
+def validar_detalle(detail):
+    """Devuelve un mensaje de error si 'detail' no es un nivel válido, o None si lo es."""
+    if detail not in NIVELES_DETALLE:
+        return (f"Error: El nivel de detalle '{detail}' no es válido. "
+                f"Use uno de: {', '.join(NIVELES_DETALLE)}.")
+    return None
+
+
+class ReporteCalculo:
+    """
+    Reporte del cálculo que se construye de forma perezosa.
+
+    Los métodos solo registran las secciones (texto fijo o filas que se formatean con una
+    función); nada se convierte a cadena hasta que se llama a str(), render() o escribir().
+    Las secciones de filas se pueden truncar para mostrar solo las primeras y últimas k.
+
+    Si se indica 'medicion' (ver phase_timing), el tiempo de render() y escribir() se
+    registra en ella como la fase "formato_reporte".
+    """
+
+    def __init__(self, nivel=DETALLE_COMPLETO, medicion=MEDICION_NULA):
+        self.nivel = nivel
+        self.medicion = medicion
+        self._secciones = []
+
+    def agregar_texto(self, texto, nivel=DETALLE_RESUMEN):
+        """
+        Agrega un bloque de texto fijo.
+
+        Parámetros:
+            texto (str): Texto a agregar (con sus saltos de línea).
+            nivel (str): Nivel mínimo en el que aparece ("summary" o "full").
+        """
+        if self._incluye(nivel):
+            self._secciones.append(("texto", texto))
+
+    def agregar_filas(self, n_filas, formatear_fila, separador="",
+                      marcador_omision="... ({omitidas} filas omitidas) ...\n"):
+        """
+        Agrega una sección de n_filas filas que solo existe en el nivel "full".
+
+        Parámetros:
+            n_filas (int): Número de filas.
+            formatear_fila (callable): Función i -> str que formatea la fila i.
+            separador (str): Texto entre filas consecutivas (ej. " + " para una suma).
+            marcador_omision (str): Texto que reemplaza a las filas omitidas al truncar.
+        """
+        if self._incluye(DETALLE_COMPLETO):
+            self._secciones.append(("filas", (n_filas, formatear_fila, separador, marcador_omision)))
+
+    def _incluye(self, nivel):
+        return self.nivel == DETALLE_COMPLETO or nivel == DETALLE_RESUMEN
+
+    def fragmentos(self, max_filas=None):
+        """
+        Genera el reporte por fragmentos, sin construirlo completo en memoria.
+
+        Parámetros:
+            max_filas (int, opcional): Si se indica, cada sección de filas muestra solo
+                las primeras y las últimas max_filas filas.
+        """
+        for tipo, contenido in self._secciones:
+            if tipo == "texto":
+                yield contenido
+                continue
+            n_filas, formatear_fila, separador, marcador_omision = contenido
+            if max_filas is None or n_filas <= 2 * max_filas:
+                indices = [range(n_filas)]
+            else:
+                indices = [range(max_filas), range(n_filas - max_filas, n_filas)]
+            for bloque, rango in enumerate(indices):
+                if bloque > 0:
+                    omitidas = n_filas - 2 * max_filas
+                    yield separador + marcador_omision.format(omitidas=omitidas) + separador
+                for j, i in enumerate(rango):
+                    if j > 0:
+                        yield separador
+                    yield formatear_fila(i)
+
+    def render(self, max_filas=None):
+        """Devuelve el reporte como una sola cadena (ver fragmentos())."""
+        with self.medicion.fase("formato_reporte"):
+            return "".join(self.fragmentos(max_filas))
+
+    def escribir(self, destino, max_filas=None):
+        """
+        Escribe el reporte directamente en un archivo sin generar la cadena completa.
+
+        Parámetros:
+            destino (str | archivo): Ruta del archivo o un objeto con método write().
+            max_filas (int, opcional): Igual que en fragmentos().
+        """
+        with self.medicion.fase("formato_reporte"):
+            if hasattr(destino, "write"):
+                destino.writelines(self.fragmentos(max_filas))
+            else:
+                with open(destino, "w", encoding="utf-8") as archivo:
+                    archivo.writelines(self.fragmentos(max_filas))
+
+    def __str__(self):
+        return self.render()
+
+    def __repr__(self):
+        return f"<ReporteCalculo nivel={self.nivel!r} secciones={len(self._secciones)}>"
@@ -0,0 +1,150 @@
+import math
+from functools import lru_cache
+
+import numpy as np
+
+from .calculation_report import DETALLE_COMPLETO, DETALLE_NINGUNO, ReporteCalculo, validar_detalle
+from .expression_compiler import compilar_expresion
+from .integration_result import ResultadoIntegracion
+from .vectorized_engine import ErrorEvaluacion, evaluar_puntos
+
+N_MAXIMO_CC = 1 << 16
+
+
+@lru_cache(maxsize=32)
+def nodos_pesos_clenshaw_curtis(n):
+    """
+    Devuelve los n + 1 nodos de Chebyshev x_k = cos(k*pi/n) y los pesos de Clenshaw-Curtis
+    en [-1, 1], calculados con una DCT vía FFT (algoritmo de Waldvogel, 2006).
+
+    Se calculan una sola vez por n y se guardan en caché (arreglos de solo lectura).
+
+    Retorna:
+        Tupla (numpy.ndarray, numpy.ndarray): nodos (de 1 a -1) y pesos.
+    """
+    impares = np.arange(1, n, 2)
+    n_impares = impares.size
+    m = n - n_impares
+    v0 = np.concatenate((2.0 / impares / (impares - 2), [1.0 / impares[-1]], np.zeros(m)))
+    v2 = -v0[:-1] - v0[:0:-1]
+    g0 = -np.ones(n)
+    g0[n_impares] += n
+    g0[m] += n
+    g = g0 / (n ** 2 - 1 + n % 2)
+    pesos = np.fft.ifft(v2 + g).real
+    pesos = np.append(pesos, pesos[0])
+    nodos = np.cos(np.pi * np.arange(n + 1) / n)
+    nodos.setflags(write=False)
+    pesos.setflags(write=False)
+    return nodos, pesos
+
+
+def clenshaw_curtis_funcion(f_str, a, b, tol=1e-12, n_inicial=8, n_max=N_MAXIMO_CC, detail=DETALLE_COMPLETO):
+    """
+    Aproxima la integral de f(x) en [a, b] con la cuadratura de Clenshaw-Curtis.
+
+    f se muestrea en los puntos de Chebyshev x_k = cos(k*pi/n) (mapeados a [a, b]) en una
+    sola evaluación vectorizada, y los pesos se obtienen con una DCT vía FFT. El orden n se
+    duplica hasta que dos aproximaciones sucesivas difieren en menos de 'tol'; como los
+    puntos de orden n son los pares del orden 2n, en cada duplicación solo se evalúan los
+    n puntos nuevos.
+
+    Parámetros:
+        f_str (str): La función como cadena, ej. "exp(x) * cos(x)".
+        a (float): Límite inferior de integración.
+        b (float): Límite superior de integración.
+        tol (float): Tolerancia entre dos órdenes sucesivos (> 0).
+        n_inicial (int): Orden inicial (par, >= 2).
+        n_max (int): Orden máximo.
+        detail (str): Nivel del reporte: "none", "summary" o "full".
+
+    Retorna:
+        ResultadoIntegracion (tupla (float, ReporteCalculo | None, list[float], list[float]))
+        con la misma forma que simpson_funcion y los atributos adicionales:
+            - error_estimado (float): |I(2n) - I(n)| en el último orden.
+            - evaluaciones (int): Número de evaluaciones de f(x) (n + 1).
+            - n (int): Orden final.
+            - convergio (bool): False si se alcanzó n_max sin llegar a 'tol'.
+    """
+    # 1. Validaciones de entrada
+    if not isinstance(f_str, str) or not f_str:
+        return None, "Error: La función 'f_str' debe ser una cadena de texto no vacía.", None, None
+    if b <= a:
+        return None, "Error: El límite superior 'b' debe ser mayor que el límite inferior 'a'.", None, None
+    if not tol > 0:
+        return None, "Error: La tolerancia 'tol' debe ser un número positivo.", None, None
+    if not isinstance(n_inicial, int) or n_inicial < 2 or n_inicial % 2 != 0:
+        return None, "Error: El orden inicial 'n_inicial' debe ser un entero par >= 2.", None, None
+    if not isinstance(n_max, int) or n_max < 2 * n_inicial:
+        return None, "Error: El orden máximo 'n_max' debe ser un entero >= 2 * n_inicial.", None, None
+    error_detalle = validar_detalle(detail)
+    if error_detalle:
+        return None, error_detalle, None, None
+    try:
+        compilar_expresion(f_str)
+    except Exception as e:
+        return None, f"Error al parsear la función f_str='{f_str}': {e}", None, None
+
+    centro = (a + b) / 2.0
+    mitad = (b - a) / 2.0
+
+    # 2. Orden inicial: todos los puntos de Chebyshev en una sola evaluación
+    n = n_inicial
+    nodos, pesos = nodos_pesos_clenshaw_curtis(n)
+    x = centro + mitad * nodos
+    try:
+        y = evaluar_puntos(f_str, x)
+    except ErrorEvaluacion as e:
+        return None, str(e), None, None
+    aproximaciones = [(n, mitad * float(np.dot(pesos, y)))]
+    error_estimado = math.inf
+    convergio = False
+
+    # 3. Duplicar el orden: los puntos anteriores quedan en las posiciones pares
+    while 2 * n <= n_max:
+        x_nuevos = centro + mitad * np.cos(np.pi * np.arange(1, 2 * n, 2) / (2 * n))
+        try:
+            y_nuevos = evaluar_puntos(f_str, x_nuevos)
+        except ErrorEvaluacion as e:
+            return None, str(e), None, None
+        n *= 2
+        x_doble = np.empty(n + 1)
+        x_doble[0::2], x_doble[1::2] = x, x_nuevos
+        y_doble = np.empty(n + 1)
+        y_doble[0::2], y_doble[1::2] = y, y_nuevos
+        x, y = x_doble, y_doble
+
+        nodos, pesos = nodos_pesos_clenshaw_curtis(n)
+        aproximaciones.append((n, mitad * float(np.dot(pesos, y))))
+        error_estimado = abs(aproximaciones[-1][1] - aproximaciones[-2][1])
+        if error_estimado <= tol:
+            convergio = True
+            break
+
+    integral_aprox = aproximaciones[-1][1]
+    evaluaciones = n + 1
+    # Los nodos de Chebyshev van de b a a: se devuelven en orden creciente
+    x_puntos = x[::-1].tolist()
+    y_puntos = y[::-1].tolist()
+
+    detalle_calculo = None
+    if detail != DETALLE_NINGUNO:
+        detalle_calculo = ReporteCalculo(detail)
+        detalle_calculo.agregar_texto("Método de Clenshaw-Curtis (puntos de Chebyshev, pesos vía FFT).\n"
+                                      f"Función f(x) = {f_str}\nLímites [{a}, {b}], tolerancia = {tol:g}\n\n")
+        detalle_calculo.agregar_texto("Aproximación en cada orden:\n"
+                                      "Orden n  | Integral\n"
+                                      "-------------------------------\n",
+                                      nivel=DETALLE_COMPLETO)
+        detalle_calculo.agregar_filas(
+            len(aproximaciones),
+            lambda i: f"{aproximaciones[i][0]:<8} | {aproximaciones[i][1]:.15f}\n")
+        detalle_calculo.agregar_texto("\n", nivel=DETALLE_COMPLETO)
+        detalle_calculo.agregar_texto(f"Orden final n = {n}, evaluaciones de f(x): {evaluaciones}\n"
+                                      f"Error estimado |I(2n) - I(n)|: {error_estimado:.2e}"
+                                      f"{'' if convergio else ' (no se alcanzó la tolerancia)'}\n"
+                                      f"Integral ≈ {integral_aprox:.15f}\n\n")
+
+    return ResultadoIntegracion(integral_aprox, detalle_calculo, x_puntos, y_puntos,
+                                error_estimado=error_estimado, evaluaciones=evaluaciones,
+                                n=n, convergio=convergio)
@@ -0,0 +1,142 @@
+import numpy as np
+
+from .calculation_report import DETALLE_COMPLETO, DETALLE_NINGUNO, ReporteCalculo, validar_detalle
+from .expression_compiler import compilar_expresion
+from .integration_result import ResultadoIntegracion
+from .vectorized_engine import _DIVISOR_REGLA, construir_malla, evaluar_variables_en_malla, obtener_pesos
+
+# Número máximo de puntos de la malla (x, y) que se evalúan a la vez (≈ 8 MB en float64).
+TAMANO_BLOQUE_2D = 1 << 20
+
+_VARIABLES_2D = frozenset({"x", "y"})
+
+
+def _evaluar_bloque(f_str, expresion, x_bloque, y_nodos):
+    """
+    Evalúa f(x, y) sobre la malla x_bloque × y_nodos: en una sola llamada vectorizada si es
+    posible y, si no, punto por punto con el ámbito escalar de 'math'.
+
+    Excepciones:
+        ValueError con el primer punto (x, y) donde f_str no se puede evaluar.
+    """
+    forma = (x_bloque.size, y_nodos.size)
+    valores = evaluar_variables_en_malla(f_str, forma, x=x_bloque[:, np.newaxis], y=y_nodos[np.newaxis, :])
+    if valores is not None:
+        return valores
+    valores = np.empty(forma)
+    for i, x_i in enumerate(x_bloque.tolist()):
+        for j, y_j in enumerate(y_nodos.tolist()):
+            try:
+                valores[i, j] = expresion.evaluar(x=x_i, y=y_j)
+            except Exception as e:
+                raise ValueError(f"Error al evaluar f(x, y)='{f_str}' en (x, y) = ({x_i:.4f}, {y_j:.4f}): {e}") from e
+    return valores
+
+
+def integral_doble(f_str, a, b, c, d, Nx, Ny, regla="simpson", detail=DETALLE_COMPLETO,
+                   tamano_bloque=TAMANO_BLOQUE_2D):
+    """
+    Aproxima la integral doble de f(x, y) sobre el rectángulo [a, b] × [c, d] con la regla
+    producto (tensorial) de Simpson 1/3 o del Trapecio:
+
+        Integral ≈ (hx/k) * (hy/k) * sum_i sum_j wx_i * wy_j * f(x_i, y_j)
+
+    donde wx, wy son los mismos vectores de pesos que usan simpson_funcion y
+    trapecio_funcion. f se evalúa sobre la malla de forma vectorizada, por bloques de filas
+    (valores de x) de a lo sumo 'tamano_bloque' puntos, así la memoria queda acotada.
+
+    Parámetros:
+        f_str (str): La función como cadena en x e y, ej. "exp(-x**2 - y**2)".
+        a, b (float): Límites de integración en x (b > a).
+        c, d (float): Límites de integración en y (d > c).
+        Nx, Ny (int): Número de subintervalos en cada eje (pares para Simpson).
+        regla (str): "simpson" o "trapecio".
+        detail (str): Nivel del reporte: "none", "summary" o "full" (incluye la integral
+            en y para cada x_i).
+        tamano_bloque (int): Número máximo de puntos evaluados por bloque.
+
+    Retorna:
+        ResultadoIntegracion (tupla (float, ReporteCalculo | None, list[float], list[float])):
+            - Aproximación numérica de la integral doble.
+            - Reporte perezoso con los detalles del cálculo.
+            - Nodos de la malla en x.
+            - Nodos de la malla en y.
+        con el atributo adicional 'evaluaciones' ((Nx + 1) * (Ny + 1)).
+    """
+    # 1. Validaciones de entrada
+    if not isinstance(f_str, str) or not f_str:
+        return None, "Error: La función 'f_str' debe ser una cadena de texto no vacía.", None, None
+    if regla not in _DIVISOR_REGLA:
+        return None, f"Error: Regla desconocida: '{regla}'. Use 'simpson' o 'trapecio'.", None, None
+    if b <= a or d <= c:
+        return None, "Error: Los límites superiores 'b' y 'd' deben ser mayores que 'a' y 'c'.", None, None
+    if not isinstance(Nx, int) or not isinstance(Ny, int):
+        return None, "Error: Los números de subintervalos 'Nx' y 'Ny' deben ser enteros.", None, None
+    if Nx < 1 or Ny < 1:
+        return None, "Error: Los números de subintervalos 'Nx' y 'Ny' deben ser mayores o iguales a 1.", None, None
+    if regla == "simpson" and (Nx % 2 != 0 or Ny % 2 != 0):
+        return None, "Error: Para Simpson 1/3 los números de subintervalos 'Nx' y 'Ny' deben ser pares.", None, None
+    if not isinstance(tamano_bloque, int) or tamano_bloque < 1:
+        return None, "Error: El tamaño de bloque 'tamano_bloque' debe ser un entero >= 1.", None, None
+    error_detalle = validar_detalle(detail)
+    if error_detalle:
+        return None, error_detalle, None, None
+    try:
+        expresion = compilar_expresion(f_str)
+    except Exception as e:
+        return None, f"Error al parsear la función f_str='{f_str}': {e}", None, None
+    desconocidas = expresion.variables - _VARIABLES_2D
+    if desconocidas:
+        return None, (f"Error: La función f_str='{f_str}' solo puede usar las variables x e y "
+                      f"(nombres no reconocidos: {', '.join(sorted(desconocidas))})."), None, None
+
+    # 2. Pesos de cada eje y evaluación por bloques de filas de la malla
+    x_nodos = construir_malla(regla, a, b, Nx)
+    y_nodos = construir_malla(regla, c, d, Ny)
+    pesos_x = obtener_pesos(regla, Nx)
+    pesos_y = obtener_pesos(regla, Ny)
+    divisor = _DIVISOR_REGLA[regla]
+    hx = (b - a) / Nx
+    hy = (d - c) / Ny
+
+    # Integral en y para cada x_i: g(x_i) ≈ (hy/k) * sum_j wy_j * f(x_i, y_j)
+    integrales_y = np.empty(Nx + 1)
+    filas_por_bloque = max(1, tamano_bloque // (Ny + 1))
+    for inicio in range(0, Nx + 1, filas_por_bloque):
+        x_bloque = x_nodos[inicio:inicio + filas_por_bloque]
+        try:
+            valores = _evaluar_bloque(f_str, expresion, x_bloque, y_nodos)
+        except ValueError as e:
+            return None, str(e), None, None
+        integrales_y[inicio:inicio + x_bloque.size] = (hy / divisor) * (valores @ pesos_y)
+
+    suma_ponderada = float(np.dot(pesos_x, integrales_y))
+    integral_aprox = (hx / divisor) * suma_ponderada
+    evaluaciones = (Nx + 1) * (Ny + 1)
+
+    x_puntos = x_nodos.tolist()
+    y_puntos = y_nodos.tolist()
+
+    detalle_calculo = None
+    if detail != DETALLE_NINGUNO:
+        nombre = "Simpson 1/3" if regla == "simpson" else "Trapecio"
+        detalle_calculo = ReporteCalculo(detail)
+        detalle_calculo.agregar_texto(f"Integral doble con la regla producto de {nombre} "
+                                      f"({Nx + 1} × {Ny + 1} = {evaluaciones} puntos).\n")
+        detalle_calculo.agregar_texto(f"Función f(x, y) = {f_str}\n"
+                                      f"Límites x en [{a}, {b}], y en [{c}, {d}], Nx = {Nx}, Ny = {Ny}\n"
+                                      f"hx = {hx:.8f}, hy = {hy:.8f}\n\n")
+        detalle_calculo.agregar_texto("Integral en y para cada x_i, g(x_i) = (hy/"
+                                      f"{divisor:g}) * Σ wy_j f(x_i, y_j):\n"
+                                      "Índice  | x_i          | g(x_i)       | Coef.\n"
+                                      "---------------------------------------------\n",
+                                      nivel=DETALLE_COMPLETO)
+        detalle_calculo.agregar_filas(
+            Nx + 1,
+            lambda i: f"x_{i:<5} | {x_puntos[i]:<12.8f} | {integrales_y[i]:<12.8f} | {int(pesos_x[i])}\n")
+        detalle_calculo.agregar_texto("\n", nivel=DETALLE_COMPLETO)
+        detalle_calculo.agregar_texto(f"Integral ≈ ({hx:.8f}/{divisor:g}) * [ {suma_ponderada:.8f} ] "
+                                      f"= {integral_aprox:.8f}\n\n")
+
+    return ResultadoIntegracion(integral_aprox, detalle_calculo, x_puntos, y_puntos,
+                                evaluaciones=evaluaciones)
@@ -0,0 +1,237 @@
+import ast
+import math
+from functools import lru_cache
+
+import numpy as np
+
+# Funciones integradas de Python que se permiten dentro de f_str (el resto queda bloqueado).
+_BUILTINS_PERMITIDOS = {
+    "abs": abs, "min": min, "max": max, "round": round,
+    "int": int, "float": float, "bool": bool,
+}
+
+_COMMON_MATH_SCOPE = {
+    "sin": math.sin, "cos": math.cos, "tan": math.tan,
+    "asin": math.asin, "acos": math.acos, "atan": math.atan, "atan2": math.atan2,
+    "sinh": math.sinh, "cosh": math.cosh, "tanh": math.tanh,
+    "asinh": math.asinh, "acosh": math.acosh, "atanh": math.atanh,
+    "exp": math.exp, "log": math.log, "log10": math.log10, "log2": math.log2, "log1p": math.log1p,
+    "sqrt": math.sqrt, "pow": math.pow,
+    "fabs": math.fabs, "ceil": math.ceil, "floor": math.floor,
+    "degrees": math.degrees, "radians": math.radians,
+    "pi": math.pi, "e": math.e, "tau": math.tau,
+    "abs": abs
+}
+
+
+class MathNamespace:
+    """Sustituto de 'math' para expresiones como 'math.sin(x)' evaluadas sobre arreglos."""
+    pass
+
+
+# Popular el namespace con funciones de numpy que imitan las funciones del módulo math.
+# Esto hace que funcionen automáticamente con arrays de numpy.
+_safe_math_namespace = MathNamespace()
+_safe_math_namespace.acos = np.arccos
+_safe_math_namespace.acosh = np.arccosh
+_safe_math_namespace.asin = np.arcsin
+_safe_math_namespace.asinh = np.arcsinh
+_safe_math_namespace.atan = np.arctan
+_safe_math_namespace.atan2 = np.arctan2
+_safe_math_namespace.atanh = np.arctanh
+_safe_math_namespace.ceil = np.ceil
+_safe_math_namespace.copysign = np.copysign
+_safe_math_namespace.cos = np.cos
+_safe_math_namespace.cosh = np.cosh
+_safe_math_namespace.degrees = np.degrees
+_safe_math_namespace.exp = np.exp
+_safe_math_namespace.fabs = np.fabs
+_safe_math_namespace.floor = np.floor
+_safe_math_namespace.fmod = np.fmod
+_safe_math_namespace.hypot = np.hypot
+_safe_math_namespace.isclose = np.isclose
+_safe_math_namespace.isfinite = np.isfinite
+_safe_math_namespace.isinf = np.isinf
+_safe_math_namespace.isnan = np.isnan
+_safe_math_namespace.log = np.log
+_safe_math_namespace.log10 = np.log10
+_safe_math_namespace.log1p = np.log1p
+_safe_math_namespace.log2 = np.log2
+_safe_math_namespace.pow = np.power
+_safe_math_namespace.radians = np.radians
+_safe_math_namespace.sin = np.sin
+_safe_math_namespace.sinh = np.sinh
+_safe_math_namespace.sqrt = np.sqrt
+_safe_math_namespace.tan = np.tan
+_safe_math_namespace.tanh = np.tanh
+_safe_math_namespace.trunc = np.trunc
+
+# Constantes
+_safe_math_namespace.pi = np.pi
+_safe_math_namespace.e = np.e
+_safe_math_namespace.tau = getattr(np, 'tau', 2 * np.pi)
+_safe_math_namespace.inf = np.inf
+_safe_math_namespace.nan = np.nan
+
+
+class NumpyNamespace:
+    """Sustituto de 'np' con solo las funciones elemento a elemento (ufuncs) permitidas."""
+    pass
+
+
+# Solo ufuncs: devuelven un valor por punto, así que 'np.sin(x)' vale igual con un float
+# que con un arreglo. Reducciones como np.mean o np.cumsum no se exponen (cambiarían la
+# forma del resultado).
+_UFUNCS_NUMPY_PERMITIDAS = (
+    "sin", "cos", "tan", "arcsin", "arccos", "arctan", "arctan2",
+    "sinh", "cosh", "tanh", "arcsinh", "arccosh", "arctanh",
+    "exp", "exp2", "expm1", "log", "log10", "log2", "log1p",
+    "sqrt", "cbrt", "square", "power", "reciprocal",
+    "abs", "absolute", "fabs", "sign", "floor", "ceil", "trunc", "rint",
+    "hypot", "maximum", "minimum", "fmax", "fmin", "fmod", "mod", "remainder", "copysign",
+    "heaviside", "degrees", "radians", "deg2rad", "rad2deg",
+)
+
+_safe_numpy_namespace = NumpyNamespace()
+for _nombre in _UFUNCS_NUMPY_PERMITIDAS:
+    setattr(_safe_numpy_namespace, _nombre, getattr(np, _nombre))
+del _nombre
+_safe_numpy_namespace.pi = np.pi
+_safe_numpy_namespace.e = np.e
+
+# Las mismas funciones que _COMMON_MATH_SCOPE, pero en su versión de NumPy (ufuncs),
+# de modo que una sola evaluación de f_str procese un arreglo completo de puntos.
+_NUMPY_MATH_SCOPE = {
+    "np": _safe_numpy_namespace,
+    "sin": np.sin, "cos": np.cos, "tan": np.tan,
+    "asin": np.arcsin, "acos": np.arccos, "atan": np.arctan, "atan2": np.arctan2,
+    "sinh": np.sinh, "cosh": np.cosh, "tanh": np.tanh,
+    "asinh": np.arcsinh, "acosh": np.arccosh, "atanh": np.arctanh,
+    "exp": np.exp, "log": np.log, "log10": np.log10, "log2": np.log2, "log1p": np.log1p,
+    "sqrt": np.sqrt, "pow": np.power,
+    "fabs": np.fabs, "ceil": np.ceil, "floor": np.floor,
+    "degrees": np.degrees, "radians": np.radians,
+    "pi": math.pi, "e": math.e, "tau": math.tau,
+    "abs": np.abs,
+}
+
+# Ámbitos globales completos usados por eval(); se construyen una sola vez.
+_AMBITO_MATH = {**_COMMON_MATH_SCOPE, "math": math, "np": _safe_numpy_namespace,
+                "__builtins__": _BUILTINS_PERMITIDOS}
+_AMBITO_NUMPY = {**_NUMPY_MATH_SCOPE, "math": _safe_math_namespace, "__builtins__": _BUILTINS_PERMITIDOS}
+
+# Nombres ya definidos en los ámbitos de evaluación (funciones, constantes y módulos).
+_NOMBRES_DEL_AMBITO = frozenset(_AMBITO_MATH) | frozenset(_AMBITO_NUMPY) | frozenset(_BUILTINS_PERMITIDOS)
+
+# Nodos del AST que puede contener una expresión matemática.
+_NODOS_PERMITIDOS = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.BoolOp, ast.Compare, ast.IfExp,
+    ast.Call, ast.keyword, ast.Name, ast.Load, ast.Constant, ast.Attribute,
+    ast.operator, ast.unaryop, ast.boolop, ast.cmpop,
+)
+
+# Módulos cuyos atributos se pueden usar, ej. 'math.gamma(x)' o 'np.sinc(x)'.
+_MODULOS_PERMITIDOS = ("math", "np")
+
+TAMANO_CACHE = 256
+
+
+class ExpresionCompilada:
+    """
+    Expresión f_str validada y compilada a un objeto de código de Python.
+
+    Atributos:
+        texto (str): Expresión normalizada.
+        codigo (code): Objeto de código listo para eval().
+        nombres (frozenset[str]): Nombres (variables y funciones) que aparecen en la expresión.
+    """
+    __slots__ = ("texto", "codigo", "nombres")
+
+    def __init__(self, texto, codigo, nombres):
+        self.texto = texto
+        self.codigo = codigo
+        self.nombres = nombres
+
+    @property
+    def variables(self):
+        """Nombres libres que no son funciones ni constantes del ámbito, ej. {'x', 'y'}."""
+        return self.nombres - _NOMBRES_DEL_AMBITO
+
+    def evaluar(self, **variables):
+        """
+        Evalúa la expresión con escalares usando el ámbito de 'math'. Las funciones 'np.*'
+        fallan como las de math (ej. np.log(-1) lanza FloatingPointError en vez de dar nan).
+        """
+        if "np" in self.nombres:
+            with np.errstate(divide='raise', over='raise', invalid='raise', under='ignore'):
+                return eval(self.codigo, _AMBITO_MATH, variables)
+        return eval(self.codigo, _AMBITO_MATH, variables)
+
+    def evaluar_numpy(self, **variables):
+        """Evalúa la expresión con arreglos de NumPy usando el ámbito vectorizado."""
+        return eval(self.codigo, _AMBITO_NUMPY, variables)
+
+    def __repr__(self):
+        return f"ExpresionCompilada({self.texto!r})"
+
+
+def normalizar_expresion(f_str):
+    """Normaliza f_str para usarla como clave de caché (espacios sobrantes eliminados)."""
+    return " ".join(f_str.split())
+
+
+def _validar_arbol(arbol, f_str):
+    """Recorre el AST y rechaza cualquier construcción que no sea una expresión matemática."""
+    for nodo in ast.walk(arbol):
+        if not isinstance(nodo, _NODOS_PERMITIDOS):
+            raise ValueError(f"La expresión '{f_str}' contiene una construcción no permitida "
+                             f"({type(nodo).__name__}).")
+        if isinstance(nodo, ast.Name) and nodo.id.startswith("_"):
+            raise ValueError(f"La expresión '{f_str}' usa un nombre no permitido: '{nodo.id}'.")
+        if isinstance(nodo, ast.Attribute):
+            if not (isinstance(nodo.value, ast.Name) and nodo.value.id in _MODULOS_PERMITIDOS):
+                raise ValueError(f"La expresión '{f_str}' solo puede acceder a atributos de "
+                                 f"{', '.join(_MODULOS_PERMITIDOS)}.")
+            if nodo.attr.startswith("_"):
+                raise ValueError(f"La expresión '{f_str}' usa un atributo no permitido: '{nodo.attr}'.")
+        if isinstance(nodo, ast.Constant) and not isinstance(nodo.value, (int, float, complex)):
+            raise ValueError(f"La expresión '{f_str}' contiene una constante no numérica: {nodo.value!r}.")
+
+
+@lru_cache(maxsize=TAMANO_CACHE)
+def _compilar_normalizada(texto):
+    arbol = ast.parse(texto, mode="eval")
+    _validar_arbol(arbol, texto)
+    codigo = compile(arbol, "<f_str>", "eval")
+    nombres = frozenset(nodo.id for nodo in ast.walk(arbol) if isinstance(nodo, ast.Name))
+    return ExpresionCompilada(texto, codigo, nombres)
+
+
+def compilar_expresion(f_str):
+    """
+    Valida f_str con 'ast' y la compila una sola vez; las llamadas siguientes con la misma
+    expresión (normalizada) se sirven desde una caché LRU acotada.
+
+    Parámetros:
+        f_str (str): La función como cadena, ej. "x**2 * exp(-x)".
+
+    Retorna:
+        ExpresionCompilada
+
+    Excepciones:
+        SyntaxError si f_str no es una expresión de Python válida.
+        ValueError si f_str contiene construcciones no permitidas (importaciones,
+                   atributos privados, cadenas, lambdas, etc.).
+    """
+    return _compilar_normalizada(normalizar_expresion(f_str))
+
+
+def estadisticas_cache():
+    """Devuelve los contadores de la caché de expresiones: aciertos, fallos, tamaño y capacidad."""
+    info = _compilar_normalizada.cache_info()
+    return {"aciertos": info.hits, "fallos": info.misses, "tamano": info.currsize, "capacidad": info.maxsize}
+
+
+def limpiar_cache():
+    """Vacía la caché de expresiones compiladas y reinicia sus contadores."""
+    _compilar_normalizada.cache_clear()
@@ -0,0 +1,124 @@
+import math
+
+import numpy as np
+
+from .calculation_report import DETALLE_COMPLETO, DETALLE_NINGUNO, ReporteCalculo, validar_detalle
+from .expression_compiler import compilar_expresion
+from .integration_result import ResultadoIntegracion
+from .vectorized_engine import ErrorEvaluacion, construir_malla, evaluar_puntos
+
+OSCILADORES = ("sin", "cos")
+
+# Por debajo de este theta = k*h los coeficientes se calculan con su serie de Taylor
+# (la fórmula cerrada pierde dígitos por cancelación).
+_THETA_SERIE = 1.0 / 6.0
+
+
+def coeficientes_filon(theta):
+    """
+    Devuelve los coeficientes (alfa, beta, gamma) de Filon para theta = k*h.
+
+    Retorna:
+        Tupla (float, float, float).
+    """
+    if abs(theta) < _THETA_SERIE:
+        t2 = theta * theta
+        alfa = theta * t2 * (2.0 / 45.0 - t2 * (2.0 / 315.0 - t2 * 2.0 / 4725.0))
+        beta = 2.0 / 3.0 + t2 * (2.0 / 15.0 - t2 * (4.0 / 105.0 - t2 * 2.0 / 567.0))
+        gamma = 4.0 / 3.0 - t2 * (2.0 / 15.0 - t2 * (1.0 / 210.0 - t2 / 11340.0))
+        return alfa, beta, gamma
+    seno, coseno = math.sin(theta), math.cos(theta)
+    t3 = theta ** 3
+    alfa = (theta * theta + theta * seno * coseno - 2.0 * seno * seno) / t3
+    beta = 2.0 * (theta * (1.0 + coseno * coseno) - 2.0 * seno * coseno) / t3
+    gamma = 4.0 * (seno - theta * coseno) / t3
+    return alfa, beta, gamma
+
+
+def filon_funcion(f_str, a, b, N, k, oscilador="sin", detail=DETALLE_COMPLETO):
+    """
+    Aproxima la integral de f(x) * sin(k*x) o f(x) * cos(k*x) en [a, b] con la regla de
+    Filon: f (la parte suave, sin el factor oscilante) se interpola con parábolas como en
+    Simpson 1/3 y el producto con sin(k*x) / cos(k*x) se integra de forma exacta.
+
+    El número de evaluaciones de f es N + 1 sea cual sea k, así que no hace falta un N
+    mayor que k*(b - a) para resolver la oscilación; basta con que N resuelva f.
+
+    Parámetros:
+        f_str (str): Parte suave del integrando como cadena, ej. "exp(-x)".
+        a (float): Límite inferior de integración.
+        b (float): Límite superior de integración.
+        N (int): Número de subintervalos (debe ser par y >= 2).
+        k (float): Frecuencia angular del factor oscilante.
+        oscilador (str): "sin" para f(x)*sin(k*x) o "cos" para f(x)*cos(k*x).
+        detail (str): Nivel del reporte: "none", "summary" o "full".
+
+    Retorna:
+        ResultadoIntegracion (tupla (float, ReporteCalculo | None, list[float], list[float]))
+        con la misma forma que simpson_funcion (los valores y son los de f, sin el factor
+        oscilante) y el atributo adicional 'evaluaciones'.
+    """
+    # 1. Validaciones de entrada
+    if not isinstance(f_str, str) or not f_str:
+        return None, "Error: La función 'f_str' debe ser una cadena de texto no vacía.", None, None
+    if b <= a:
+        return None, "Error: El límite superior 'b' debe ser mayor que el límite inferior 'a'.", None, None
+    if not isinstance(N, int):
+        return None, "Error: El número de subintervalos 'N' debe ser un entero.", None, None
+    if N < 2 or N % 2 != 0:
+        return None, "Error: El número de subintervalos 'N' debe ser par y >= 2.", None, None
+    if not isinstance(k, (int, float)) or not math.isfinite(k):
+        return None, "Error: La frecuencia 'k' debe ser un número finito.", None, None
+    if oscilador not in OSCILADORES:
+        return None, f"Error: Oscilador '{oscilador}' desconocido. Use 'sin' o 'cos'.", None, None
+    error_detalle = validar_detalle(detail)
+    if error_detalle:
+        return None, error_detalle, None, None
+    try:
+        compilar_expresion(f_str)
+    except Exception as e:
+        return None, f"Error al parsear la función f_str='{f_str}': {e}", None, None
+
+    # 2. Evaluar f en la malla (vectorizado) y los factores oscilantes en los nodos
+    x = construir_malla("simpson", a, b, N)
+    try:
+        y = evaluar_puntos(f_str, x)
+    except ErrorEvaluacion as e:
+        return None, str(e), None, None
+    h = (b - a) / N
+    theta = k * h
+    alfa, beta, gamma = coeficientes_filon(theta)
+    seno, coseno = np.sin(k * x), np.cos(k * x)
+
+    # 3. Regla de Filon: extremos (alfa), nodos pares (beta) y nodos impares (gamma)
+    if oscilador == "cos":
+        termino_extremos = y[-1] * seno[-1] - y[0] * seno[0]
+        oscilante = y * coseno
+    else:
+        termino_extremos = -(y[-1] * coseno[-1] - y[0] * coseno[0])
+        oscilante = y * seno
+    suma_pares = float(np.sum(oscilante[0::2])) - 0.5 * float(oscilante[0] + oscilante[-1])
+    suma_impares = float(np.sum(oscilante[1::2]))
+    integral_aprox = h * (alfa * float(termino_extremos) + beta * suma_pares + gamma * suma_impares)
+
+    x_puntos = x.tolist()
+    y_puntos = y.tolist()
+
+    detalle_calculo = None
+    if detail != DETALLE_NINGUNO:
+        detalle_calculo = ReporteCalculo(detail)
+        detalle_calculo.agregar_texto(f"Método de Filon para f(x)*{oscilador}(k*x) con {N + 1} puntos ({N} intervalos).\n")
+        detalle_calculo.agregar_texto(f"Función f(x) = {f_str}, k = {k}\nLímites [{a}, {b}], N = {N}\n"
+                                      f"h = ( {b} - {a} ) / {N} = {h:.8f}, theta = k*h = {theta:.8f}\n"
+                                      f"alfa = {alfa:.10f}, beta = {beta:.10f}, gamma = {gamma:.10f}\n\n")
+        detalle_calculo.agregar_texto("Tabla de evaluación:\n"
+                                      f"Índice  | x_i          | f(x_i)       | f(x_i)*{oscilador}(k*x_i)\n"
+                                      "-----------------------------------------------------------\n",
+                                      nivel=DETALLE_COMPLETO)
+        detalle_calculo.agregar_filas(
+            N + 1, lambda i: f"x_{i:<5} | {x_puntos[i]:<12.8f} | {y_puntos[i]:<12.8f} | {oscilante[i]:.8f}\n")
+        detalle_calculo.agregar_texto("\n", nivel=DETALLE_COMPLETO)
+        detalle_calculo.agregar_texto(f"Integral ≈ h * [ alfa*({float(termino_extremos):.8f}) + beta*({suma_pares:.8f}) "
+                                      f"+ gamma*({suma_impares:.8f}) ] = {integral_aprox:.10f}\n\n")
+
+    return ResultadoIntegracion(integral_aprox, detalle_calculo, x_puntos, y_puntos, evaluaciones=N + 1)
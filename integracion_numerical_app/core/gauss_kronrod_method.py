@@ -0,0 +1,207 @@
+import heapq
+import math
+
+import numpy as np
+
+from .calculation_report import DETALLE_COMPLETO, DETALLE_NINGUNO, ReporteCalculo, validar_detalle
+from .expression_compiler import compilar_expresion
+from .integration_result import ResultadoIntegracion
+from .vectorized_engine import ErrorEvaluacion, evaluar_puntos
+
+# Regla de Gauss-Kronrod G7/K15 en [-1, 1] (valores de QUADPACK, qk15).
+# Nodos de Kronrod x_k >= 0; los de índice impar (0.9491..., 0.7415..., 0.4058..., 0) son los de Gauss.
+_NODOS_K15 = (
+    0.991455371120812639206854697526329, 0.949107912342758524526189684047851,
+    0.864864423359769072789712788640926, 0.741531185599394439863864773280788,
+    0.586087235467691130294144845693013, 0.405845151377397166906606412076961,
+    0.207784955007898467600689403773245, 0.000000000000000000000000000000000,
+)
+_PESOS_K15 = (
+    0.022935322010529224963732008058970, 0.063092092629978553290700663189204,
+    0.104790010322250183839876322541518, 0.140653259715525918745189590510238,
+    0.169004726639267902826583426598550, 0.190350578064785409913256402421014,
+    0.204432940075298892414161999234649, 0.209482141084727828012999174891714,
+)
+_PESOS_G7 = (
+    0.129484966168869693270611432679082, 0.279705391489276667901467771423780,
+    0.381830050505118944950369775488975, 0.417959183673469387755102040816327,
+)
+
+
+def _regla_completa():
+    """Nodos en [-1, 1] (15) y pesos de Kronrod y de Gauss alineados con esos nodos."""
+    nodos = np.array([-x for x in _NODOS_K15[:-1]] + [x for x in reversed(_NODOS_K15)])
+    pesos_k = np.array(_PESOS_K15[:-1] + tuple(reversed(_PESOS_K15)))
+    pesos_g_mitad = np.zeros(8)
+    pesos_g_mitad[1::2] = _PESOS_G7
+    pesos_g = np.concatenate((pesos_g_mitad[:-1], pesos_g_mitad[::-1]))
+    for arreglo in (nodos, pesos_k, pesos_g):
+        arreglo.setflags(write=False)
+    return nodos, pesos_k, pesos_g
+
+
+_NODOS, _PESOS_KRONROD, _PESOS_GAUSS = _regla_completa()
+_EPS = np.finfo(np.float64).eps
+_MINIMO = np.finfo(np.float64).tiny
+
+
+def _evaluar_paneles(f_str, izq, der):
+    """
+    Aplica G7/K15 a todos los paneles [izq_i, der_i] con una sola evaluación de f_str.
+
+    Retorna:
+        Tupla (integral, error, x, y) con arreglos por panel para integral y error (estimación
+        de QUADPACK a partir de |K15 - G7|) y los puntos evaluados.
+
+    Excepciones:
+        ErrorEvaluacion si f_str no se puede evaluar en alguno de los nodos.
+    """
+    centro = (izq + der) / 2.0
+    mitad = (der - izq) / 2.0
+    x = centro[:, np.newaxis] + mitad[:, np.newaxis] * _NODOS
+    y = evaluar_puntos(f_str, x.ravel()).reshape(x.shape)
+
+    kronrod = y @ _PESOS_KRONROD
+    gauss = y @ _PESOS_GAUSS
+    media = kronrod / 2.0
+    res_abs = np.abs(y) @ _PESOS_KRONROD * np.abs(mitad)
+    res_asc = np.abs(y - media[:, np.newaxis]) @ _PESOS_KRONROD * np.abs(mitad)
+
+    error = np.abs((kronrod - gauss) * mitad)
+    con_escala = (res_asc != 0) & (error != 0)
+    error[con_escala] = res_asc[con_escala] * np.minimum(
+        1.0, (200.0 * error[con_escala] / res_asc[con_escala]) ** 1.5)
+    redondeo = res_abs > _MINIMO / (50.0 * _EPS)
+    error[redondeo] = np.maximum(50.0 * _EPS * res_abs[redondeo], error[redondeo])
+    return kronrod * mitad, error, x.ravel(), y.ravel()
+
+
+def gauss_kronrod_adaptativo(f_str, a, b, tol=1e-10, max_intervalos=1000, k_peores=16, detail=DETALLE_COMPLETO):
+    """
+    Aproxima la integral de f(x) en [a, b] con cuadratura adaptativa de Gauss-Kronrod G7/K15
+    (estilo QUADPACK).
+
+    Los subintervalos se guardan en un montículo ordenado por su error estimado. En cada
+    ronda se bisecan los subintervalos con mayor error (a lo sumo k_peores, y solo los
+    necesarios para cubrir el exceso del error total sobre tol) y los 15 nodos de Kronrod
+    de todos los hijos se evalúan en una sola llamada vectorizada a la expresión compilada.
+    El proceso termina cuando la suma de los errores estimados es <= tol.
+
+    Parámetros:
+        f_str (str): La función como cadena, ej. "1/(1e-4 + (x - 0.3)**2)".
+        a (float): Límite inferior de integración.
+        b (float): Límite superior de integración.
+        tol (float): Tolerancia absoluta para el error total estimado (> 0).
+        max_intervalos (int): Número máximo de subintervalos (>= 1).
+        k_peores (int): Número de subintervalos bisecados por ronda (>= 1).
+        detail (str): Nivel del reporte: "none", "summary" o "full".
+
+    Retorna:
+        ResultadoIntegracion (tupla (float, ReporteCalculo | None, list[float], list[float]))
+        con los atributos adicionales:
+            - error_estimado (float): Suma de los errores estimados de los subintervalos.
+            - evaluaciones (int): Número de evaluaciones de f(x) (15 por panel).
+            - intervalos (int): Número de subintervalos finales.
+            - convergio (bool): False si se alcanzó max_intervalos sin llegar a 'tol'.
+    """
+    # 1. Validaciones de entrada
+    if not isinstance(f_str, str) or not f_str:
+        return None, "Error: La función 'f_str' debe ser una cadena de texto no vacía.", None, None
+    if b <= a:
+        return None, "Error: El límite superior 'b' debe ser mayor que el límite inferior 'a'.", None, None
+    if not (math.isfinite(a) and math.isfinite(b)):
+        return None, "Error: Los límites deben ser finitos (use tanh_sinh_funcion para límites infinitos).", None, None
+    if not tol > 0:
+        return None, "Error: La tolerancia 'tol' debe ser un número positivo.", None, None
+    if not isinstance(max_intervalos, int) or max_intervalos < 1:
+        return None, "Error: El número máximo de subintervalos 'max_intervalos' debe ser un entero >= 1.", None, None
+    if not isinstance(k_peores, int) or k_peores < 1:
+        return None, "Error: El número de subintervalos por ronda 'k_peores' debe ser un entero >= 1.", None, None
+    error_detalle = validar_detalle(detail)
+    if error_detalle:
+        return None, error_detalle, None, None
+    try:
+        compilar_expresion(f_str)
+    except Exception as e:
+        return None, f"Error al parsear la función f_str='{f_str}': {e}", None, None
+
+    # 2. Panel inicial [a, b]
+    try:
+        integral_0, error_0, x_nuevos, y_nuevos = _evaluar_paneles(
+            f_str, np.array([a], dtype=np.float64), np.array([b], dtype=np.float64))
+    except ErrorEvaluacion as e:
+        return None, str(e), None, None
+    x_eval, y_eval = [x_nuevos], [y_nuevos]
+    evaluaciones = x_nuevos.size
+    # Montículo de (-error, a_i, b_i, integral_i): el de mayor error queda arriba
+    monticulo = [(-float(error_0[0]), float(a), float(b), float(integral_0[0]))]
+    terminados = [] # Subintervalos que ya no se pueden bisecar (ancho del orden del redondeo)
+    error_total = float(error_0[0])
+
+    # 3. Rondas: bisecar los k peores y evaluar todos los hijos juntos
+    while error_total > tol and monticulo and len(monticulo) + len(terminados) < max_intervalos:
+        cupo = min(k_peores, max_intervalos - len(monticulo) - len(terminados))
+        # Solo los peores necesarios para cubrir el exceso de error sobre tol (hasta k_peores)
+        peores = []
+        error_cubierto = 0.0
+        while monticulo and len(peores) < cupo and error_cubierto < error_total - tol:
+            panel = heapq.heappop(monticulo)
+            error_cubierto -= panel[0]
+            _, izq, der, _ = panel
+            medio = (izq + der) / 2.0
+            if not izq < medio < der:
+                terminados.append(panel)
+            else:
+                peores.append(panel)
+        if not peores:
+            break
+
+        izq = np.array([p[1] for p in peores])
+        der = np.array([p[2] for p in peores])
+        medio = (izq + der) / 2.0
+        hijos_izq = np.concatenate((izq, medio))
+        hijos_der = np.concatenate((medio, der))
+        try:
+            integrales, errores, x_nuevos, y_nuevos = _evaluar_paneles(f_str, hijos_izq, hijos_der)
+        except ErrorEvaluacion as e:
+            return None, str(e), None, None
+        evaluaciones += x_nuevos.size
+        x_eval.append(x_nuevos)
+        y_eval.append(y_nuevos)
+        for panel in zip((-errores).tolist(), hijos_izq.tolist(), hijos_der.tolist(), integrales.tolist()):
+            heapq.heappush(monticulo, panel)
+        # Se recalcula la suma en lugar de actualizarla para no acumular redondeo
+        error_total = math.fsum(-p[0] for p in monticulo) + math.fsum(-p[0] for p in terminados)
+
+    finales = sorted((izq, der, integral, -error_neg) for error_neg, izq, der, integral in monticulo + terminados)
+    integral_aprox = math.fsum(p[2] for p in finales)
+    error_estimado = math.fsum(p[3] for p in finales)
+    convergio = error_estimado <= tol
+
+    x_todos = np.concatenate(x_eval)
+    orden = np.argsort(x_todos, kind="stable")
+    x_puntos = x_todos[orden].tolist()
+    y_puntos = np.concatenate(y_eval)[orden].tolist()
+
+    detalle_calculo = None
+    if detail != DETALLE_NINGUNO:
+        detalle_calculo = ReporteCalculo(detail)
+        detalle_calculo.agregar_texto("Método adaptativo de Gauss-Kronrod (G7/K15).\n"
+                                      f"Función f(x) = {f_str}\nLímites [{a}, {b}], tolerancia = {tol:g}\n\n")
+        detalle_calculo.agregar_texto("Subintervalos finales:\n"
+                                      "a_i          | b_i          | Integral_i          | Error_i\n"
+                                      "-----------------------------------------------------------------\n",
+                                      nivel=DETALLE_COMPLETO)
+        detalle_calculo.agregar_filas(
+            len(finales),
+            lambda i: (f"{finales[i][0]:<12.8f} | {finales[i][1]:<12.8f} | "
+                       f"{finales[i][2]:<19.15f} | {finales[i][3]:.2e}\n"))
+        detalle_calculo.agregar_texto("\n", nivel=DETALLE_COMPLETO)
+        detalle_calculo.agregar_texto(f"Subintervalos: {len(finales)}, evaluaciones de f(x): {evaluaciones}\n"
+                                      f"Error estimado: {error_estimado:.2e}"
+                                      f"{'' if convergio else ' (no se alcanzó la tolerancia)'}\n"
+                                      f"Integral ≈ {integral_aprox:.15f}\n\n")
+
+    return ResultadoIntegracion(integral_aprox, detalle_calculo, x_puntos, y_puntos,
+                                error_estimado=error_estimado, evaluaciones=evaluaciones,
+                                intervalos=len(finales), convergio=convergio)
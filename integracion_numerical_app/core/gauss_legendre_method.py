@@ -0,0 +1,103 @@
+from functools import lru_cache
+
+import numpy as np
+
+from .calculation_report import DETALLE_COMPLETO, DETALLE_NINGUNO, ReporteCalculo, validar_detalle
+from .expression_compiler import compilar_expresion
+from .integration_result import ResultadoIntegracion
+from .vectorized_engine import ErrorEvaluacion, evaluar_puntos
+
+ORDEN_MAXIMO = 100
+
+
+@lru_cache(maxsize=64)
+def nodos_pesos_gauss_legendre(orden):
+    """
+    Devuelve los nodos y pesos de Gauss-Legendre de 'orden' puntos en [-1, 1].
+
+    Se calculan una sola vez por orden y se guardan en caché (arreglos de solo lectura).
+
+    Retorna:
+        Tupla (numpy.ndarray, numpy.ndarray): nodos y pesos.
+    """
+    nodos, pesos = np.polynomial.legendre.leggauss(orden)
+    nodos.setflags(write=False)
+    pesos.setflags(write=False)
+    return nodos, pesos
+
+
+def gauss_legendre_funcion(f_str, a, b, N, orden=5, detail=DETALLE_COMPLETO):
+    """
+    Aproxima la integral de f(x) (dada como cadena) en [a, b] con la regla compuesta de
+    Gauss-Legendre: [a, b] se divide en N subintervalos y en cada uno se usan 'orden' nodos.
+
+    Parámetros:
+        f_str (str): La función como cadena, ej. "x**2 * exp(-x)".
+        a (float): Límite inferior de integración.
+        b (float): Límite superior de integración.
+        N (int): Número de subintervalos (debe ser >= 1).
+        orden (int): Número de nodos de Gauss por subintervalo (entre 1 y 100).
+        detail (str): Nivel del reporte: "none", "summary" o "full".
+
+    Retorna:
+        ResultadoIntegracion (tupla (float, ReporteCalculo | None, list[float], list[float]))
+        con la misma forma que simpson_funcion y el atributo adicional 'evaluaciones'.
+    """
+    # 1. Validaciones de entrada
+    if not isinstance(f_str, str) or not f_str:
+        return None, "Error: La función 'f_str' debe ser una cadena de texto no vacía.", None, None
+    if b <= a:
+        return None, "Error: El límite superior 'b' debe ser mayor que el límite inferior 'a'.", None, None
+    if not isinstance(N, int):
+        return None, "Error: El número de subintervalos 'N' debe ser un entero.", None, None
+    if N < 1:
+        return None, "Error: El número de subintervalos 'N' debe ser mayor o igual a 1.", None, None
+    if not isinstance(orden, int) or not 1 <= orden <= ORDEN_MAXIMO:
+        return None, f"Error: El orden de la regla debe ser un entero entre 1 y {ORDEN_MAXIMO}.", None, None
+    error_detalle = validar_detalle(detail)
+    if error_detalle:
+        return None, error_detalle, None, None
+    try:
+        compilar_expresion(f_str)
+    except Exception as e:
+        return None, f"Error al parsear la función f_str='{f_str}': {e}", None, None
+
+    # 2. Mapear los nodos de [-1, 1] a cada subintervalo y evaluar todo en una sola pasada
+    nodos, pesos = nodos_pesos_gauss_legendre(orden)
+    h = (b - a) / N
+    centros = a + h * (np.arange(N) + 0.5)
+    x_nodos = (centros[:, np.newaxis] + (h / 2.0) * nodos).ravel()
+    try:
+        y_nodos = evaluar_puntos(f_str, x_nodos)
+    except ErrorEvaluacion as e:
+        return None, str(e), None, None
+
+    suma_ponderada = float(np.dot(np.tile(pesos, N), y_nodos))
+    integral_aprox = (h / 2.0) * suma_ponderada
+
+    x_puntos = x_nodos.tolist()
+    y_puntos = y_nodos.tolist()
+
+    detalle_calculo = None
+    if detail != DETALLE_NINGUNO:
+        pesos_lista = pesos.tolist()
+        detalle_calculo = ReporteCalculo(detail)
+        detalle_calculo.agregar_texto(f"Método de Gauss-Legendre compuesto ({orden} nodos por subintervalo, "
+                                      f"{N} subintervalos).\n")
+        detalle_calculo.agregar_texto(f"Función f(x) = {f_str}\nLímites [{a}, {b}], N = {N}\n"
+                                      f"h = ( {b} - {a} ) / {N} = {h:.8f}\n\n")
+        detalle_calculo.agregar_texto("Nodos y pesos en [-1, 1]:\n", nivel=DETALLE_COMPLETO)
+        detalle_calculo.agregar_filas(orden, lambda j: f"t_{j:<4} = {nodos[j]: .15f} | w_{j:<4} = {pesos[j]:.15f}\n")
+        detalle_calculo.agregar_texto("\nTabla de evaluación en los nodos:\n"
+                                      "Subint. | x_i          | f(x_i)       | w_i\n"
+                                      "---------------------------------------------------\n",
+                                      nivel=DETALLE_COMPLETO)
+        detalle_calculo.agregar_filas(
+            len(x_puntos),
+            lambda i: (f"{i // orden:<7} | {x_puntos[i]:<12.8f} | {y_puntos[i]:<12.8f} | "
+                       f"{pesos_lista[i % orden]:.8f}\n"))
+        detalle_calculo.agregar_texto("\n", nivel=DETALLE_COMPLETO)
+        detalle_calculo.agregar_texto(f"Integral ≈ ({h:.8f}/2) * [ {suma_ponderada:.8f} ] = {integral_aprox:.8f}\n\n")
+
+    return ResultadoIntegracion(integral_aprox, detalle_calculo, x_puntos, y_puntos,
+                                evaluaciones=len(x_puntos))
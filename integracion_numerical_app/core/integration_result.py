@@ -0,0 +1,27 @@
+class ResultadoIntegracion(tuple):
+    """
+    Resultado de un método de integración con la forma de siempre:
+    (integral, detalle, x_puntos, y_puntos).
+
+    Se comporta exactamente como esa tupla de 4 elementos (se puede desempaquetar y las
+    GUIs la aceptan sin cambios), y además expone información adicional del cálculo como
+    atributos, ej. resultado.error_estimado o resultado.evaluaciones.
+    """
+
+    def __new__(cls, integral, detalle, x_puntos, y_puntos, **info):
+        resultado = super().__new__(cls, (integral, detalle, x_puntos, y_puntos))
+        resultado.__dict__.update(info)
+        return resultado
+
+    @property
+    def info(self):
+        """Diccionario con la información adicional (error estimado, evaluaciones, etc.)."""
+        return dict(self.__dict__)
+
+    def __reduce__(self):
+        # Permite enviar el resultado entre procesos conservando los atributos adicionales.
+        return (self.__class__, tuple(self), self.__dict__)
+
+    def __repr__(self):
+        extras = ", ".join(f"{clave}={valor!r}" for clave, valor in self.__dict__.items())
+        return f"ResultadoIntegracion({tuple.__repr__(self)}{', ' + extras if extras else ''})"
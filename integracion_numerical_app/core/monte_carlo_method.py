@@ -0,0 +1,309 @@
+import math
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import count
+
+import numpy as np
+
+from .calculation_report import DETALLE_NINGUNO, DETALLE_RESUMEN, ReporteCalculo, validar_detalle
+from .expression_compiler import compilar_expresion
+from .integration_result import ResultadoIntegracion
+from .vectorized_engine import evaluar_variables_en_malla
+
+METODOS_MONTE_CARLO = ("sobol", "halton", "aleatorio")
+
+# Puntos por bloque enviado a cada proceso (potencia de 2: conserva el balance de Sobol).
+TAMANO_BLOQUE_MC = 1 << 16
+N_MAXIMO_MC = 1 << 24
+
+# Números de dirección de Sobol (Joe y Kuo, new-joe-kuo-6.21201) para las dimensiones 2 a 16:
+# (grado s del polinomio primitivo, coeficientes a, valores iniciales m_1..m_s).
+# La dimensión 1 es la secuencia de van der Corput en base 2.
+_SOBOL_POLINOMIOS = (
+    (1, 0, (1,)),
+    (2, 1, (1, 3)),
+    (3, 1, (1, 3, 1)),
+    (3, 2, (1, 1, 1)),
+    (4, 1, (1, 1, 3, 3)),
+    (4, 4, (1, 3, 5, 13)),
+    (5, 2, (1, 1, 5, 5, 17)),
+    (5, 4, (1, 1, 5, 5, 5)),
+    (5, 7, (1, 1, 7, 11, 19)),
+    (5, 11, (1, 1, 5, 1, 1)),
+    (5, 13, (1, 1, 1, 3, 11)),
+    (5, 14, (1, 3, 5, 5, 31)),
+    (6, 1, (1, 3, 3, 9, 7, 49)),
+    (6, 13, (1, 1, 1, 15, 21, 21)),
+    (6, 16, (1, 3, 1, 13, 27, 49)),
+)
+SOBOL_DIMENSION_MAXIMA = len(_SOBOL_POLINOMIOS) + 1
+_SOBOL_BITS = 32
+
+
+def _direcciones_sobol(dimension):
+    """Matriz (dimension × 32) de números de dirección V_k de Sobol como enteros de 32 bits."""
+    direcciones = np.zeros((dimension, _SOBOL_BITS), dtype=np.uint64)
+    direcciones[0] = [1 << (_SOBOL_BITS - k) for k in range(1, _SOBOL_BITS + 1)]
+    for j in range(1, dimension):
+        s, a, m = _SOBOL_POLINOMIOS[j - 1]
+        v = [m[k] << (_SOBOL_BITS - 1 - k) for k in range(s)]
+        for i in range(s, _SOBOL_BITS):
+            valor = v[i - s] ^ (v[i - s] >> s)
+            for k in range(1, s):
+                valor ^= ((a >> (s - 1 - k)) & 1) * v[i - k]
+            v.append(valor)
+        direcciones[j] = v
+    return direcciones
+
+
+def puntos_sobol(inicio, n, dimension, desplazamiento=None):
+    """
+    Devuelve los puntos inicio, ..., inicio + n - 1 de la secuencia de Sobol (orden de
+    código Gray) en [0, 1)^dimension, calculados directamente a partir de su índice.
+
+    Parámetros:
+        desplazamiento (numpy.ndarray, opcional): Enteros de 32 bits por dimensión para
+            una aleatorización por desplazamiento digital (XOR), que conserva la estructura
+            de red de la secuencia.
+    """
+    if dimension > SOBOL_DIMENSION_MAXIMA:
+        raise ValueError(f"La secuencia de Sobol admite hasta {SOBOL_DIMENSION_MAXIMA} dimensiones; "
+                         f"use 'halton' o 'aleatorio' para {dimension}.")
+    indices = np.arange(inicio, inicio + n, dtype=np.uint64)
+    gray = indices ^ (indices >> np.uint64(1))
+    direcciones = _direcciones_sobol(dimension)
+    enteros = np.zeros((n, dimension), dtype=np.uint64)
+    for k in range(_SOBOL_BITS):
+        bit = ((gray >> np.uint64(k)) & np.uint64(1)).astype(bool)
+        enteros[bit] ^= direcciones[:, k]
+    if desplazamiento is not None:
+        enteros ^= desplazamiento
+    return enteros.astype(np.float64) / float(1 << _SOBOL_BITS)
+
+
+def _primeros_primos(cantidad):
+    primos = []
+    for candidato in count(2):
+        if all(candidato % p for p in primos if p * p <= candidato):
+            primos.append(candidato)
+            if len(primos) == cantidad:
+                return primos
+
+
+def puntos_halton(inicio, n, dimension, desplazamiento=None):
+    """
+    Devuelve los puntos inicio + 1, ..., inicio + n de la secuencia de Halton (se omite el
+    punto 0) en [0, 1)^dimension, con la inversa radical en la base del j-ésimo primo.
+
+    Parámetros:
+        desplazamiento (numpy.ndarray, opcional): Vector en [0, 1)^dimension para una
+            rotación aleatoria de Cranley-Patterson, (u + desplazamiento) mod 1.
+    """
+    puntos = np.empty((n, dimension))
+    for j, base in enumerate(_primeros_primos(dimension)):
+        restante = np.arange(inicio + 1, inicio + n + 1, dtype=np.int64)
+        valor = np.zeros(n)
+        factor = 1.0 / base
+        while restante.any():
+            valor += factor * (restante % base)
+            restante //= base
+            factor /= base
+        puntos[:, j] = valor
+    if desplazamiento is not None:
+        puntos = (puntos + desplazamiento) % 1.0
+    return puntos
+
+
+def _puntos_unitarios(metodo, semilla, inicio, n, dimension):
+    """Genera n puntos en [0, 1)^dimension; el resultado solo depende de (semilla, inicio)."""
+    if metodo == "aleatorio":
+        return np.random.default_rng([semilla, inicio]).random((n, dimension))
+    # La aleatorización de la secuencia es la misma en todos los bloques (misma semilla)
+    rng = np.random.default_rng(semilla)
+    if metodo == "sobol":
+        desplazamiento = rng.integers(0, 1 << _SOBOL_BITS, size=dimension, dtype=np.uint64)
+        return puntos_sobol(inicio, n, dimension, desplazamiento)
+    return puntos_halton(inicio, n, dimension, rng.random(dimension))
+
+
+def _evaluar_bloque_mc(f_str, limites, metodo, semilla, inicio, n):
+    """
+    Evalúa un bloque de n puntos en un proceso del pool.
+
+    Retorna:
+        Tupla (int, float, float): n, media y suma de cuadrados de las desviaciones (M2) de
+        los valores volumen * f(punto) del bloque.
+    """
+    nombres = [nombre for nombre, _, _ in limites]
+    inferiores = np.array([a for _, a, _ in limites])
+    anchos = np.array([b - a for _, a, b in limites])
+    puntos = inferiores + anchos * _puntos_unitarios(metodo, semilla, inicio, n, len(limites))
+
+    columnas = {nombre: puntos[:, j] for j, nombre in enumerate(nombres)}
+    valores = evaluar_variables_en_malla(f_str, (n,), **columnas)
+    if valores is None: # Camino escalar (respaldo)
+        expresion = compilar_expresion(f_str)
+        valores = np.empty(n)
+        for i, fila in enumerate(puntos.tolist()):
+            try:
+                valores[i] = expresion.evaluar(**dict(zip(nombres, fila)))
+            except Exception as e:
+                punto = ", ".join(f"{nombre}={valor:.4f}" for nombre, valor in zip(nombres, fila))
+                raise ValueError(f"Error al evaluar f='{f_str}' en ({punto}): {e}") from e
+
+    valores *= float(np.prod(anchos))
+    media = float(np.mean(valores))
+    return n, media, float(np.sum((valores - media) ** 2))
+
+
+def _validar_monte_carlo(f_str, limites, metodo, tamano_bloque, n_max):
+    """Devuelve un mensaje de error si los parámetros no son válidos, o None si lo son."""
+    if not isinstance(f_str, str) or not f_str:
+        return "Error: La función 'f_str' debe ser una cadena de texto no vacía."
+    if not isinstance(limites, dict) or not limites:
+        return "Error: Los límites deben ser un diccionario no vacío {variable: (a, b)}."
+    for nombre, intervalo in limites.items():
+        try:
+            a, b = intervalo
+        except (TypeError, ValueError):
+            return f"Error: El intervalo de la variable '{nombre}' debe ser un par (a, b)."
+        if not (math.isfinite(a) and math.isfinite(b)) or b <= a:
+            return f"Error: Para la variable '{nombre}' el límite superior debe ser mayor que el inferior (y finitos)."
+    if metodo not in METODOS_MONTE_CARLO:
+        return f"Error: Método '{metodo}' desconocido. Use uno de: {', '.join(METODOS_MONTE_CARLO)}."
+    if metodo == "sobol" and len(limites) > SOBOL_DIMENSION_MAXIMA:
+        return (f"Error: La secuencia de Sobol admite hasta {SOBOL_DIMENSION_MAXIMA} dimensiones; "
+                f"use 'halton' o 'aleatorio'.")
+    if not isinstance(tamano_bloque, int) or tamano_bloque < 2:
+        return "Error: El tamaño de bloque 'tamano_bloque' debe ser un entero >= 2."
+    if not isinstance(n_max, int) or n_max < tamano_bloque:
+        return "Error: El número máximo de puntos 'n_max' debe ser un entero >= tamano_bloque."
+    try:
+        expresion = compilar_expresion(f_str)
+    except Exception as e:
+        return f"Error al parsear la función f_str='{f_str}': {e}"
+    desconocidas = expresion.variables - set(limites)
+    if desconocidas:
+        return (f"Error: La función f_str='{f_str}' usa variables sin límites de integración: "
+                f"{', '.join(sorted(desconocidas))}.")
+    return None
+
+
+def monte_carlo_progresivo(f_str, limites, metodo="sobol", tamano_bloque=TAMANO_BLOQUE_MC,
+                           n_max=N_MAXIMO_MC, semilla=0, max_workers=None, executor=None):
+    """
+    Integra f sobre un hiperrectángulo con Monte Carlo o cuasi-Monte Carlo y entrega la
+    estimación acumulada después de cada bloque, para que quien llama pueda detenerse
+    (romper el ciclo) en cuanto el error estándar sea suficiente.
+
+    Los bloques de 'tamano_bloque' puntos se evalúan de forma vectorizada en procesos del
+    pool; la media y la varianza se combinan en orden (algoritmo de Chan), así que el
+    resultado no depende del número de procesos. Con 'sobol' y 'halton' la secuencia se
+    aleatoriza con la semilla, y el error estándar (calculado como en Monte Carlo) es una
+    cota conservadora del error real.
+
+    Parámetros:
+        f_str (str): La función como cadena en una o más variables, ej. "exp(-(x**2 + y**2 + z**2))".
+        limites (dict): {variable: (a, b)} con los límites de cada variable.
+        metodo (str): "sobol" (hasta 16 dimensiones), "halton" o "aleatorio" (PRNG con semilla).
+        tamano_bloque (int): Puntos por bloque (potencia de 2 recomendada para Sobol).
+        n_max (int): Número máximo de puntos.
+        semilla (int): Semilla de la aleatorización / del generador.
+        max_workers (int, opcional): Número de procesos (por defecto, os.cpu_count()).
+        executor (Executor, opcional): Pool ya creado para reutilizar.
+
+    Retorna:
+        Generador de tuplas (int, float, float): puntos evaluados, estimación de la
+        integral y error estándar estimado.
+
+    Excepciones:
+        ValueError si los parámetros no son válidos o f no se puede evaluar en algún punto.
+    """
+    error = _validar_monte_carlo(f_str, limites, metodo, tamano_bloque, n_max)
+    if error:
+        raise ValueError(error)
+    limites_lista = tuple((nombre, float(a), float(b)) for nombre, (a, b) in limites.items())
+
+    propio = executor is None
+    if propio:
+        executor = ProcessPoolExecutor(max_workers=max_workers)
+    max_en_vuelo = 2 * (max_workers or os.cpu_count() or 1)
+
+    inicios = iter(range(0, n_max, tamano_bloque))
+
+    def enviar(inicio):
+        n = min(tamano_bloque, n_max - inicio)
+        return executor.submit(_evaluar_bloque_mc, f_str, limites_lista, metodo, semilla, inicio, n)
+
+    total, media, m2 = 0, 0.0, 0.0
+    try:
+        en_vuelo = deque(enviar(inicio) for _, inicio in zip(range(max_en_vuelo), inicios))
+        while en_vuelo:
+            n, media_bloque, m2_bloque = en_vuelo.popleft().result()
+            for inicio in inicios:
+                en_vuelo.append(enviar(inicio))
+                break
+            # Combinación de medias y varianzas (Chan et al.)
+            delta = media_bloque - media
+            nuevo_total = total + n
+            media += delta * n / nuevo_total
+            m2 += m2_bloque + delta * delta * total * n / nuevo_total
+            total = nuevo_total
+            error_estandar = math.sqrt(m2 / (total - 1) / total) if total > 1 else float("inf")
+            yield total, media, error_estandar
+    finally:
+        if propio:
+            executor.shutdown(cancel_futures=True)
+
+
+def integrar_monte_carlo(f_str, limites, metodo="sobol", error_objetivo=None, tamano_bloque=TAMANO_BLOQUE_MC,
+                         n_max=N_MAXIMO_MC, semilla=0, max_workers=None, executor=None, detail=DETALLE_RESUMEN):
+    """
+    Aproxima la integral de f sobre un hiperrectángulo con Monte Carlo / cuasi-Monte Carlo,
+    deteniéndose cuando el error estándar estimado es <= error_objetivo o al llegar a n_max.
+
+    Parámetros:
+        error_objetivo (float, opcional): Error estándar buscado; sin él se usan n_max puntos.
+        detail (str): "none" o "summary" (no hay tabla de puntos; "full" equivale a "summary").
+        Los demás, igual que en monte_carlo_progresivo().
+
+    Retorna:
+        ResultadoIntegracion (tupla (float, ReporteCalculo | None, None, None)) con los atributos:
+            - error_estandar (float), evaluaciones (int), metodo (str) y
+              convergio (bool, False si se llegó a n_max sin alcanzar error_objetivo).
+        Los puntos no se devuelven porque no se conservan en memoria.
+    """
+    error = _validar_monte_carlo(f_str, limites, metodo, tamano_bloque, n_max)
+    if error is None and error_objetivo is not None and not error_objetivo > 0:
+        error = "Error: El error objetivo 'error_objetivo' debe ser un número positivo."
+    if error is None:
+        error = validar_detalle(detail)
+    if error:
+        return None, error, None, None
+
+    evaluaciones, integral_aprox, error_estandar = 0, None, float("inf")
+    try:
+        for evaluaciones, integral_aprox, error_estandar in monte_carlo_progresivo(
+                f_str, limites, metodo, tamano_bloque, n_max, semilla, max_workers, executor):
+            if error_objetivo is not None and error_estandar <= error_objetivo:
+                break
+    except ValueError as e:
+        return None, str(e), None, None
+    convergio = error_objetivo is None or error_estandar <= error_objetivo
+
+    detalle_calculo = None
+    if detail != DETALLE_NINGUNO:
+        intervalos = ", ".join(f"{nombre} en [{a}, {b}]" for nombre, (a, b) in limites.items())
+        detalle_calculo = ReporteCalculo(detail)
+        detalle_calculo.agregar_texto(f"Integración {'Monte Carlo' if metodo == 'aleatorio' else 'cuasi-Monte Carlo'} "
+                                      f"({metodo}, semilla = {semilla}) en {len(limites)} dimensiones.\n")
+        detalle_calculo.agregar_texto(f"Función f = {f_str}\nLímites: {intervalos}\n\n")
+        detalle_calculo.agregar_texto(f"Puntos evaluados: {evaluaciones}\n"
+                                      f"Error estándar estimado: {error_estandar:.3e}"
+                                      f"{'' if convergio else f' (no se alcanzó el objetivo {error_objetivo:g})'}\n")
+        detalle_calculo.agregar_texto(f"Integral ≈ {integral_aprox:.8f}\n\n")
+
+    return ResultadoIntegracion(integral_aprox, detalle_calculo, None, None,
+                                error_estandar=error_estandar, evaluaciones=evaluaciones,
+                                metodo=metodo, convergio=convergio)
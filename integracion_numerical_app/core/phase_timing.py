@@ -0,0 +1,196 @@
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Variable de entorno que activa la medición al importar el paquete (ej. para las GUIs);
+# en ese caso el resumen global se escribe en stderr al terminar el proceso.
+VARIABLE_ENTORNO = "INTEGRACION_MEDIR_FASES"
+
+_activa = False
+
+
+class _FaseNula:
+    """Contexto vacío que se usa cuando la medición está desactivada (no toma tiempos)."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        return False
+
+
+class _MedicionNula:
+    """Sustituto de MedicionFases con la medición desactivada: todas las operaciones son vacías."""
+    __slots__ = ()
+
+    def fase(self, nombre):
+        return _FASE_NULA
+
+    def contar_evaluaciones(self, n):
+        pass
+
+
+_FASE_NULA = _FaseNula()
+MEDICION_NULA = _MedicionNula()
+
+
+class _Fase:
+    __slots__ = ("medicion", "nombre", "inicio")
+
+    def __init__(self, medicion, nombre):
+        self.medicion = medicion
+        self.nombre = nombre
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *excepcion):
+        self.medicion.registrar(self.nombre, time.perf_counter() - self.inicio)
+        return False
+
+
+class MedicionFases(dict):
+    """
+    Tiempos por fase de una llamada a un integrador. Es un diccionario (se puede
+    serializar a JSON o enviar entre procesos) con la forma:
+
+        {"metodo": "simpson_funcion", "evaluaciones": 1001,
+         "fases": {"evaluacion": {"segundos": 0.0012, "llamadas": 1}, ...}}
+
+    "evaluaciones" cuenta solo las evaluaciones del integrando que entran en el resultado;
+    la evaluación de prueba en 'a' se mide en la fase "sonda" pero no se cuenta.
+    Cada registro se suma también al recolector global RECOLECTOR_FASES. La fase
+    "formato_reporte" se agrega más tarde, cuando se genera el texto del reporte.
+    """
+
+    def __init__(self, metodo):
+        super().__init__(metodo=metodo, evaluaciones=0, fases={})
+
+    def fase(self, nombre):
+        """Contexto que mide el tiempo de pared de la fase 'nombre' (se acumula si se repite)."""
+        return _Fase(self, nombre)
+
+    def registrar(self, nombre, segundos):
+        fase = self["fases"].setdefault(nombre, {"segundos": 0.0, "llamadas": 0})
+        fase["segundos"] += segundos
+        fase["llamadas"] += 1
+        RECOLECTOR_FASES.registrar(self["metodo"], nombre, segundos)
+
+    def contar_evaluaciones(self, n):
+        """Suma n evaluaciones del integrando."""
+        self["evaluaciones"] += n
+        RECOLECTOR_FASES.contar_evaluaciones(self["metodo"], n)
+
+
+class RecolectorFases:
+    """
+    Acumula los tiempos por método y fase de todas las llamadas medidas en el proceso.
+    Es seguro entre hilos.
+    """
+
+    def __init__(self):
+        self._candado = threading.Lock()
+        self._metodos = {}
+
+    def _metodo(self, metodo):
+        return self._metodos.setdefault(metodo, {"llamadas": 0, "evaluaciones": 0, "fases": {}})
+
+    def iniciar(self, metodo):
+        with self._candado:
+            self._metodo(metodo)["llamadas"] += 1
+
+    def registrar(self, metodo, nombre, segundos, llamadas=1):
+        with self._candado:
+            fase = self._metodo(metodo)["fases"].setdefault(nombre, {"segundos": 0.0, "llamadas": 0})
+            fase["segundos"] += segundos
+            fase["llamadas"] += llamadas
+
+    def contar_evaluaciones(self, metodo, n):
+        with self._candado:
+            self._metodo(metodo)["evaluaciones"] += n
+
+    def acumular(self, medicion):
+        """
+        Suma una medición hecha en otro proceso (ej. la 'medicion' de los resultados de
+        integrar_lote), que no llegó a este recolector.
+        """
+        self.iniciar(medicion["metodo"])
+        self.contar_evaluaciones(medicion["metodo"], medicion["evaluaciones"])
+        for nombre, fase in medicion["fases"].items():
+            self.registrar(medicion["metodo"], nombre, fase["segundos"], fase["llamadas"])
+
+    def resumen(self):
+        """Copia de los totales: {metodo: {"llamadas", "evaluaciones", "fases": {...}}}."""
+        with self._candado:
+            return json.loads(json.dumps(self._metodos))
+
+    def limpiar(self):
+        with self._candado:
+            self._metodos.clear()
+
+    def volcar(self, destino=None, formato="texto"):
+        """
+        Escribe el resumen en 'destino' (por defecto sys.stderr) como tabla de texto o JSON.
+        """
+        destino = destino or sys.stderr
+        resumen = self.resumen()
+        if formato == "json":
+            destino.write(json.dumps(resumen, indent=2) + "\n")
+            return
+        if formato != "texto":
+            raise ValueError(f"Formato '{formato}' desconocido. Use 'texto' o 'json'.")
+        for metodo, datos in resumen.items():
+            total = sum(fase["segundos"] for fase in datos["fases"].values())
+            destino.write(f"{metodo}: {datos['llamadas']} llamadas, {datos['evaluaciones']} evaluaciones, "
+                          f"{total * 1e3:.3f} ms medidos\n")
+            for nombre, fase in sorted(datos["fases"].items(), key=lambda item: -item[1]["segundos"]):
+                porcentaje = fase["segundos"] / total if total else 0.0
+                destino.write(f"    {nombre:<18} {fase['segundos'] * 1e3:>12.3f} ms {porcentaje:>7.1%} "
+                              f"{fase['llamadas']:>8} llamadas\n")
+        destino.flush()
+
+
+RECOLECTOR_FASES = RecolectorFases()
+
+
+def activar_medicion(activa=True):
+    """Activa (o desactiva) la medición por fases en todo el proceso."""
+    global _activa
+    _activa = bool(activa)
+
+
+def medicion_activa():
+    return _activa
+
+
+@contextmanager
+def midiendo_fases():
+    """Contexto que activa la medición y restaura el estado anterior al salir."""
+    anterior = _activa
+    activar_medicion(True)
+    try:
+        yield RECOLECTOR_FASES
+    finally:
+        activar_medicion(anterior)
+
+
+def iniciar_medicion(metodo):
+    """
+    Devuelve una MedicionFases nueva para una llamada a 'metodo' si la medición está
+    activa, o MEDICION_NULA si no lo está (sin tomar tiempos ni reservar memoria).
+    """
+    if not _activa:
+        return MEDICION_NULA
+    RECOLECTOR_FASES.iniciar(metodo)
+    return MedicionFases(metodo)
+
+
+if os.environ.get(VARIABLE_ENTORNO, "").lower() in ("1", "true", "si", "sí"):
+    activar_medicion(True)
+    atexit.register(RECOLECTOR_FASES.volcar)
@@ -0,0 +1,384 @@
+import ast
+import hashlib
+import inspect
+import json
+import sqlite3
+import struct
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from .calculation_report import ReporteCalculo
+from .expression_compiler import normalizar_expresion
+from .integration_result import ResultadoIntegracion
+from .simpson_function_method import simpson_funcion
+from .simpson_vector_method import simpson_un_tercio
+from .trapeze_function_method import trapecio_funcion
+
+TAMANO_MAXIMO_MEMORIA = 64 * 1024 * 1024 # Bytes (serializados) del nivel en memoria
+TAMANO_MAXIMO_DISCO = 512 * 1024 * 1024 # Bytes (serializados) del nivel SQLite
+MAX_FILAS_REPORTE = 500 # Filas por sección del reporte guardado (lo que muestran las GUIs)
+
+# Métodos con caché: nombre -> función. Los parámetros con estos nombres se toman como
+# expresiones (f_str) o como datos tabulados (x_valores, fx_valores) al armar la clave.
+METODOS_CACHE = {
+    "simpson_funcion": simpson_funcion,
+    "trapecio_funcion": trapecio_funcion,
+    "simpson_un_tercio": simpson_un_tercio,
+}
+_PARAMETROS_EXPRESION = ("f_str",)
+_PARAMETROS_TABULADOS = ("x_valores", "fx_valores")
+_PARAMETROS_REALES = ("a", "b", "tol") # a=0 y a=0.0 son la misma llamada
+
+# Formato de un resultado guardado: _MAGIA, largo de la cabecera (uint32), cabecera JSON y
+# los bytes de cada arreglo. No usa pickle: leer una base SQLite ajena no ejecuta código.
+_MAGIA = b"ICR1"
+_ENTRADAS_ARREGLO = ("x_puntos", "y_puntos")
+
+
+def expresion_canonica(f_str):
+    """
+    Forma canónica de f_str para la clave de caché: "x**2+1", "x ** 2 + 1" y "(x**2) + 1"
+    dan la misma cadena. Si f_str no es una expresión válida se devuelve normalizada
+    (el método reportará el error y el resultado no se guarda).
+    """
+    texto = normalizar_expresion(f_str)
+    try:
+        return ast.unparse(ast.parse(texto, mode="eval"))
+    except (SyntaxError, ValueError):
+        return texto
+
+
+def huella_datos(valores):
+    """Hash del contenido de un vector o arreglo (tipo, forma y bytes), ej. para x_valores."""
+    arreglo = np.ascontiguousarray(valores)
+    if arreglo.dtype == object:
+        return "r:" + repr(valores)
+    resumen = hashlib.blake2b(digest_size=16)
+    resumen.update(f"{arreglo.dtype.str}{arreglo.shape}".encode("ascii"))
+    resumen.update(memoryview(arreglo).cast("B"))
+    return "h:" + resumen.hexdigest()
+
+
+def _canonizar(nombre, valor):
+    if nombre in _PARAMETROS_EXPRESION and isinstance(valor, str):
+        return "e:" + expresion_canonica(valor)
+    if nombre in _PARAMETROS_TABULADOS:
+        return huella_datos(valor)
+    if nombre in _PARAMETROS_REALES and isinstance(valor, int) and not isinstance(valor, bool):
+        valor = float(valor)
+    if isinstance(valor, float):
+        return "f:" + valor.hex() # Exacto bit a bit (sin redondeo)
+    if isinstance(valor, np.generic):
+        return _canonizar(nombre, valor.item())
+    return f"{type(valor).__name__}:{valor!r}" # int, bool, str, None
+
+
+def clave_cache(metodo, *args, **kwargs):
+    """
+    Clave de caché de una llamada a uno de METODOS_CACHE. Los argumentos se asocian a la
+    firma del método con sus valores por defecto, así simpson_funcion(f, a, b, N) y
+    simpson_funcion(f, a, b, N, detail="full") comparten la clave.
+
+    Retorna:
+        str: Resumen SHA-256 (hexadecimal) de la llamada canónica.
+
+    Excepciones:
+        ValueError si el método no está en METODOS_CACHE.
+        TypeError si los argumentos no coinciden con la firma del método.
+    """
+    if metodo not in METODOS_CACHE:
+        raise ValueError(f"Método '{metodo}' sin caché. Use uno de: {', '.join(METODOS_CACHE)}.")
+    argumentos = inspect.signature(METODOS_CACHE[metodo]).bind(*args, **kwargs)
+    argumentos.apply_defaults()
+    partes = [metodo] + [f"{nombre}={_canonizar(nombre, valor)}" for nombre, valor in argumentos.arguments.items()]
+    return hashlib.sha256("|".join(partes).encode("utf-8")).hexdigest()
+
+
+def _tamano_estimado(resultado):
+    """Bytes aproximados de los puntos y arreglos de un resultado, sin serializarlo."""
+    tamano = 0
+    valores = list(resultado[2:])
+    if isinstance(resultado, ResultadoIntegracion):
+        valores += list(resultado.info.values())
+    for valor in valores:
+        if isinstance(valor, np.ndarray):
+            tamano += valor.nbytes
+        elif isinstance(valor, (list, tuple)):
+            tamano += 8 * len(valor)
+    return tamano
+
+
+def _truncar_reporte(resultado, max_filas):
+    """
+    Devuelve el resultado con su ReporteCalculo reemplazado por uno de una sola sección con
+    el texto generado con max_filas filas por sección; es el reporte que se guarda, así que
+    un fallo y un acierto de la caché devuelven el mismo detalle.
+    """
+    integral, detalle, x_puntos, y_puntos = resultado
+    if not isinstance(detalle, ReporteCalculo):
+        return resultado
+    reporte = ReporteCalculo(detalle.nivel)
+    reporte.agregar_texto(detalle.render(max_filas))
+    info = resultado.info if isinstance(resultado, ResultadoIntegracion) else {}
+    return ResultadoIntegracion(integral, reporte, x_puntos, y_puntos, **info)
+
+
+def _serializar(resultado, max_filas):
+    """
+    Serializa lo que muestra un resultado: la integral, el reporte ya generado con
+    max_filas filas por sección, los puntos y la información adicional (sin la medición
+    por fases, que describe el cálculo original y no el acierto).
+
+    Retorna:
+        bytes, o None si el resultado contiene valores que no se pueden guardar.
+    """
+    integral, detalle, x_puntos, y_puntos = resultado
+    info = resultado.info if isinstance(resultado, ResultadoIntegracion) else {}
+    info.pop("medicion", None)
+    if not isinstance(integral, (int, float)):
+        return None
+    cabecera = {"integral": float(integral), "arreglos": [], "info": {}}
+    if isinstance(detalle, ReporteCalculo):
+        cabecera["reporte"] = {"nivel": detalle.nivel, "texto": detalle.render(max_filas)}
+    elif detalle is not None:
+        return None
+    datos = []
+    entradas = [(nombre, valor, "resultado") for nombre, valor in zip(_ENTRADAS_ARREGLO, (x_puntos, y_puntos))]
+    for nombre, valor in info.items():
+        if isinstance(valor, np.ndarray):
+            entradas.append((nombre, valor, "info"))
+        elif valor is None or isinstance(valor, (bool, int, float, str)):
+            cabecera["info"][nombre] = valor
+        else:
+            return None
+    for nombre, valor, destino in entradas:
+        arreglo = np.ascontiguousarray(valor if isinstance(valor, np.ndarray) else np.asarray(valor, dtype=np.float64))
+        if arreglo.dtype.kind not in "biuf":
+            return None
+        cabecera["arreglos"].append({"nombre": nombre, "destino": destino, "lista": not isinstance(valor, np.ndarray),
+                                     "dtype": arreglo.dtype.str, "forma": arreglo.shape})
+        datos.append(arreglo.tobytes())
+    texto = json.dumps(cabecera).encode("utf-8")
+    return b"".join([_MAGIA, struct.pack("<I", len(texto)), texto, *datos])
+
+
+def _deserializar(datos):
+    """Reconstruye el ResultadoIntegracion guardado por _serializar (con listas y arreglos nuevos)."""
+    if datos[:4] != _MAGIA:
+        raise ValueError("Formato de resultado guardado desconocido.")
+    (largo,) = struct.unpack_from("<I", datos, 4)
+    cabecera = json.loads(datos[8:8 + largo].decode("utf-8"))
+    posicion = 8 + largo
+    valores = {"resultado": {}, "info": dict(cabecera["info"])}
+    for descripcion in cabecera["arreglos"]:
+        dtype = np.dtype(descripcion["dtype"])
+        if dtype.kind not in "biuf":
+            raise ValueError(f"Tipo de arreglo no permitido: {descripcion['dtype']}.")
+        cantidad = int(np.prod(descripcion["forma"], dtype=np.int64))
+        arreglo = np.frombuffer(datos, dtype=dtype, count=cantidad, offset=posicion).reshape(descripcion["forma"])
+        posicion += arreglo.nbytes
+        valores[descripcion["destino"]][descripcion["nombre"]] = (arreglo.tolist() if descripcion["lista"]
+                                                                  else arreglo.copy())
+    detalle = None
+    if "reporte" in cabecera:
+        detalle = ReporteCalculo(cabecera["reporte"]["nivel"])
+        detalle.agregar_texto(cabecera["reporte"]["texto"])
+    return ResultadoIntegracion(cabecera["integral"], detalle, valores["resultado"]["x_puntos"],
+                                valores["resultado"]["y_puntos"], **valores["info"])
+
+
+class CacheResultados:
+    """
+    Caché de resultados de integración con dos niveles:
+
+    - Memoria: LRU acotada por el tamaño total de los resultados serializados.
+    - Disco (opcional): base SQLite en 'ruta_sqlite', también acotada por tamaño; se
+      desalojan primero los resultados usados hace más tiempo. Sobrevive entre sesiones.
+
+    Un acierto en disco se copia al nivel en memoria. Solo se guardan los cálculos
+    exitosos (integral distinta de None) cuyos puntos caben en la caché; el tamaño se
+    estima antes de serializar. Del reporte se guarda el texto con 'max_filas_reporte'
+    filas por sección (como lo muestran las GUIs), no el reporte completo, y los métodos
+    con caché devuelven ese mismo reporte truncado también cuando calculan (ver calcular),
+    así que el detalle no depende de si la llamada estaba en la caché. Cada acierto
+    devuelve una copia nueva, así que modificar las listas de un resultado no altera la
+    caché. Es segura entre hilos. La base SQLite no usa pickle: se puede abrir sin riesgo
+    aunque no la haya escrito este programa.
+
+    Uso:
+        cache = CacheResultados(ruta_sqlite="resultados.sqlite")
+        integral, detalle, x, y = cache.simpson_funcion("sin(x)", 0, math.pi, 100)
+    """
+
+    def __init__(self, max_bytes=TAMANO_MAXIMO_MEMORIA, ruta_sqlite=None, max_bytes_disco=TAMANO_MAXIMO_DISCO,
+                 max_filas_reporte=MAX_FILAS_REPORTE):
+        if max_bytes < 0 or max_bytes_disco < 0:
+            raise ValueError("Los tamaños máximos de la caché no pueden ser negativos.")
+        self.max_bytes = max_bytes
+        self.max_bytes_disco = max_bytes_disco
+        self.max_filas_reporte = max_filas_reporte
+        self._memoria = OrderedDict() # clave -> bytes, del menos al más recientemente usado
+        self._bytes_memoria = 0
+        self._candado = threading.Lock()
+        self._contadores = dict.fromkeys(
+            ("aciertos_memoria", "aciertos_disco", "fallos", "desalojos_memoria", "desalojos_disco"), 0)
+        self._conexion = None
+        self._bytes_disco = 0
+        if ruta_sqlite is not None:
+            self._conexion = sqlite3.connect(ruta_sqlite, check_same_thread=False)
+            with self._conexion:
+                self._conexion.execute("CREATE TABLE IF NOT EXISTS resultados ("
+                                       "clave TEXT PRIMARY KEY, valor BLOB NOT NULL, "
+                                       "tamano INTEGER NOT NULL, ultimo_uso REAL NOT NULL)")
+                self._conexion.execute("CREATE INDEX IF NOT EXISTS resultados_uso ON resultados (ultimo_uso)")
+            self._bytes_disco = self._conexion.execute("SELECT COALESCE(SUM(tamano), 0) FROM resultados").fetchone()[0]
+
+    # --- Interfaz genérica ---
+
+    def obtener(self, clave):
+        """Devuelve el resultado guardado con 'clave' (una copia) o None si no está."""
+        with self._candado:
+            datos = self._memoria.get(clave)
+            if datos is not None:
+                self._memoria.move_to_end(clave)
+                self._contadores["aciertos_memoria"] += 1
+            elif self._conexion is not None:
+                fila = self._conexion.execute("SELECT valor, tamano FROM resultados WHERE clave = ?",
+                                              (clave,)).fetchone()
+                if fila is not None and bytes(fila[0][:4]) != _MAGIA:
+                    # Entrada de otro formato (ej. de una versión anterior): se descarta
+                    with self._conexion:
+                        self._conexion.execute("DELETE FROM resultados WHERE clave = ?", (clave,))
+                    self._bytes_disco -= fila[1]
+                    fila = None
+                if fila is not None:
+                    datos = fila[0]
+                    with self._conexion:
+                        self._conexion.execute("UPDATE resultados SET ultimo_uso = ? WHERE clave = ?",
+                                               (time.time(), clave))
+                    self._guardar_en_memoria(clave, datos)
+                    self._contadores["aciertos_disco"] += 1
+            if datos is None:
+                self._contadores["fallos"] += 1
+                return None
+        return _deserializar(datos)
+
+    def guardar(self, clave, resultado):
+        """
+        Guarda un resultado (integral, detalle, x_puntos, y_puntos) si el cálculo fue exitoso
+        y sus puntos caben en algún nivel (si no, ni siquiera se serializa).
+        """
+        if resultado[0] is None:
+            return
+        limite = max(self.max_bytes, self.max_bytes_disco if self._conexion is not None else 0)
+        if _tamano_estimado(resultado) > limite:
+            return
+        datos = _serializar(resultado, self.max_filas_reporte)
+        if datos is None:
+            return
+        with self._candado:
+            self._guardar_en_memoria(clave, datos)
+            if self._conexion is not None:
+                self._guardar_en_disco(clave, datos)
+
+    def calcular(self, metodo, *args, **kwargs):
+        """
+        Devuelve el resultado de METODOS_CACHE[metodo](*args, **kwargs), desde la caché si
+        la misma llamada (canónica) ya se hizo.
+
+        El reporte (detalle) tiene siempre como mucho 'max_filas_reporte' filas por sección,
+        se haya calculado o leído de la caché: al calcular se trunca igual que al guardarlo.
+        Para el reporte completo de un cálculo grande, llame al método sin caché.
+        """
+        clave = clave_cache(metodo, *args, **kwargs)
+        resultado = self.obtener(clave)
+        if resultado is None:
+            resultado = _truncar_reporte(METODOS_CACHE[metodo](*args, **kwargs), self.max_filas_reporte)
+            self.guardar(clave, resultado)
+        return resultado
+
+    def simpson_funcion(self, *args, **kwargs):
+        """simpson_funcion con caché (mismos parámetros y retorno)."""
+        return self.calcular("simpson_funcion", *args, **kwargs)
+
+    def trapecio_funcion(self, *args, **kwargs):
+        """trapecio_funcion con caché (mismos parámetros y retorno)."""
+        return self.calcular("trapecio_funcion", *args, **kwargs)
+
+    def simpson_un_tercio(self, *args, **kwargs):
+        """simpson_un_tercio con caché: los vectores se identifican por un hash de su contenido."""
+        return self.calcular("simpson_un_tercio", *args, **kwargs)
+
+    def estadisticas(self):
+        """Contadores de aciertos, fallos y desalojos, y ocupación de cada nivel."""
+        with self._candado:
+            consultas = self._contadores["aciertos_memoria"] + self._contadores["aciertos_disco"] + self._contadores["fallos"]
+            aciertos = consultas - self._contadores["fallos"]
+            estadisticas = dict(self._contadores,
+                                tasa_aciertos=aciertos / consultas if consultas else 0.0,
+                                entradas_memoria=len(self._memoria), bytes_memoria=self._bytes_memoria,
+                                max_bytes=self.max_bytes)
+            if self._conexion is not None:
+                entradas = self._conexion.execute("SELECT COUNT(*) FROM resultados").fetchone()[0]
+                estadisticas.update(entradas_disco=entradas, bytes_disco=self._bytes_disco,
+                                    max_bytes_disco=self.max_bytes_disco)
+        return estadisticas
+
+    def limpiar(self):
+        """Vacía ambos niveles y reinicia los contadores."""
+        with self._candado:
+            self._memoria.clear()
+            self._bytes_memoria = 0
+            self._contadores = dict.fromkeys(self._contadores, 0)
+            if self._conexion is not None:
+                with self._conexion:
+                    self._conexion.execute("DELETE FROM resultados")
+                self._bytes_disco = 0
+
+    def cerrar(self):
+        """Cierra la base SQLite (el nivel en memoria sigue funcionando)."""
+        with self._candado:
+            if self._conexion is not None:
+                self._conexion.close()
+                self._conexion = None
+
+    # --- Niveles (se llaman con el candado tomado) ---
+
+    def _guardar_en_memoria(self, clave, datos):
+        if len(datos) > self.max_bytes: # Un resultado más grande que la caché completa no se guarda
+            return
+        anterior = self._memoria.pop(clave, None)
+        if anterior is not None:
+            self._bytes_memoria -= len(anterior)
+        self._memoria[clave] = datos
+        self._bytes_memoria += len(datos)
+        while self._bytes_memoria > self.max_bytes:
+            _, desalojado = self._memoria.popitem(last=False)
+            self._bytes_memoria -= len(desalojado)
+            self._contadores["desalojos_memoria"] += 1
+
+    def _guardar_en_disco(self, clave, datos):
+        if len(datos) > self.max_bytes_disco:
+            return
+        with self._conexion:
+            fila = self._conexion.execute("SELECT tamano FROM resultados WHERE clave = ?", (clave,)).fetchone()
+            if fila is not None:
+                self._bytes_disco -= fila[0]
+            self._conexion.execute("INSERT OR REPLACE INTO resultados VALUES (?, ?, ?, ?)",
+                                   (clave, datos, len(datos), time.time()))
+            self._bytes_disco += len(datos)
+            while self._bytes_disco > self.max_bytes_disco:
+                clave_vieja, tamano = self._conexion.execute(
+                    "SELECT clave, tamano FROM resultados ORDER BY ultimo_uso LIMIT 1").fetchone()
+                self._conexion.execute("DELETE FROM resultados WHERE clave = ?", (clave_vieja,))
+                self._bytes_disco -= tamano
+                self._contadores["desalojos_disco"] += 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
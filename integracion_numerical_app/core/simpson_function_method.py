@@ -1,19 +1,15 @@
-import math
-
-_COMMON_MATH_SCOPE = {
-    "sin": math.sin, "cos": math.cos, "tan": math.tan,
-    "asin": math.asin, "acos": math.acos, "atan": math.atan, "atan2": math.atan2,
-    "sinh": math.sinh, "cosh": math.cosh, "tanh": math.tanh,
-    "asinh": math.asinh, "acosh": math.acosh, "atanh": math.atanh,
-    "exp": math.exp, "log": math.log, "log10": math.log10, "log2": math.log2, "log1p": math.log1p,
-    "sqrt": math.sqrt, "pow": math.pow,
-    "fabs": math.fabs, "ceil": math.ceil, "floor": math.floor,
-    "degrees": math.degrees, "radians": math.radians,
-    "pi": math.pi, "e": math.e, "tau": math.tau,
-    "abs": abs
-}
-
-def simpson_funcion(f_str, a, b, N):
+import numpy as np
+
+from .calculation_report import DETALLE_COMPLETO, DETALLE_NINGUNO, ReporteCalculo, validar_detalle
+from .expression_compiler import compilar_expresion
+from .integration_result import ResultadoIntegracion
+from .phase_timing import MEDICION_NULA, iniciar_medicion
+from .vectorized_engine import (N_MAXIMO_AUTO, ErrorEvaluacion, construir_malla, duplicar_hasta_tolerancia,
+                                coeficiente, evaluar_en_malla, evaluar_puntos, integral_acumulada,
+                                suma_ponderada)
+
+def simpson_funcion(f_str, a, b, N, detail=DETALLE_COMPLETO, acumulado=False,
+                    auto_N=False, tol=1e-8, N_max=N_MAXIMO_AUTO):
     """
     Aproxima la integral de f(x) (dada como cadena) en [a, b] usando Simpson 1/3.
 
@@ -21,14 +17,26 @@ def simpson_funcion(f_str, a, b, N):
         f_str (str): La función como cadena, ej. "x**2 * exp(-x)".
         a (float): Límite inferior de integración.
         b (float): Límite superior de integración.
-        N (int): Número de subintervalos (debe ser par y >= 6).
+        N (int): Número de subintervalos (debe ser par y >= 6). Con auto_N=True es el N inicial.
+        detail (str): Nivel del reporte: "none" (sin reporte), "summary" (solo
+            encabezado y resultado) o "full" (tabla y suma completas).
+        acumulado (bool): Si es True, calcula también la integral acumulada desde a hasta
+            cada nodo par x_0, x_2, ..., x_N (atributos 'x_acumulada' y 'acumulada').
+        auto_N (bool): Si es True, duplica N (reutilizando los puntos ya evaluados) hasta que
+            el error estimado por Richardson, |S(h/2) - S(h)| / 15, sea <= tol.
+        tol (float): Tolerancia absoluta del modo auto_N (> 0).
+        N_max (int): Valor máximo de N en el modo auto_N.
 
     Retorna:
-        Tupla (float, str, list[float], list[float]):
+        ResultadoIntegracion (tupla (float, ReporteCalculo | None, list[float], list[float])):
             - Aproximación numérica de la integral.
-            - Cadena con los detalles del cálculo.
+            - Reporte perezoso con los detalles del cálculo (str(reporte) lo genera).
             - Lista de coordenadas x de los puntos evaluados.
             - Lista de coordenadas y (f(x)) de los puntos evaluados.
+        Con acumulado=True incluye además los arreglos 'x_acumulada' y 'acumulada'.
+        Con auto_N=True incluye además 'N' (elegido), 'error_estimado', 'evaluaciones' y
+        'convergio' (False si se llegó a N_max sin alcanzar tol).
+        Con la medición por fases activa (ver phase_timing) incluye además 'medicion'.
     """
     # 1. Validaciones de entrada
     if not isinstance(f_str, str) or not f_str:
@@ -41,12 +49,22 @@ def simpson_funcion(f_str, a, b, N):
         return None, "Error: El número de subintervalos 'N' debe ser mayor que 4 (es decir, >= 6).", None, None
     if N % 2 != 0:
         return None, "Error: El número de subintervalos 'N' debe ser par.", None, None
+    if auto_N and not tol > 0:
+        return None, "Error: La tolerancia 'tol' debe ser un número positivo.", None, None
+    if auto_N and (not isinstance(N_max, int) or N_max < N):
+        return None, "Error: El valor máximo 'N_max' debe ser un entero mayor o igual que N.", None, None
+    error_detalle = validar_detalle(detail)
+    if error_detalle:
+        return None, error_detalle, None, None
 
     # Crear función evaluable
-    eval_globals = {**_COMMON_MATH_SCOPE, "math": math}
+    medicion = iniciar_medicion("simpson_funcion")
     try:
-        func = lambda x_val: eval(f_str, eval_globals, {"x": x_val})
-        func(a) 
+        with medicion.fase("compilacion"):
+            expresion = compilar_expresion(f_str) # Validada y compilada una sola vez (con caché)
+        func = lambda x_val: expresion.evaluar(x=x_val)
+        with medicion.fase("sonda"): # Su tiempo queda en "sonda"; no cuenta como evaluación
+            func(a)
     except NameError as ne:
         error_msg = (
             f"Error al parsear la función f_str='{f_str}'. Variable o función no reconocida: {ne}. "
@@ -57,67 +75,256 @@ def simpson_funcion(f_str, a, b, N):
         error_msg = f"Error al parsear o evaluar inicialmente f_str='{f_str}' en x={a}: {e}"
         return None, error_msg, None, None
 
+    extras = {}
+    if medicion is not MEDICION_NULA:
+        extras["medicion"] = medicion
+    if auto_N:
+        # N automático: se duplica N reutilizando todos los puntos ya evaluados
+        try:
+            with medicion.fase("evaluacion"):
+                N, x_arr, y_arr, error_estimado, evaluaciones, convergio = duplicar_hasta_tolerancia(
+                    "simpson", f_str, a, b, N, tol, N_max)
+        except ErrorEvaluacion as e:
+            return None, str(e), None, None
+        extras.update(N=N, error_estimado=error_estimado, evaluaciones=evaluaciones, convergio=convergio)
+        medicion.contar_evaluaciones(evaluaciones)
+    else:
+        # Camino rápido: una sola evaluación de f_str sobre toda la malla
+        with medicion.fase("evaluacion"):
+            x_arr = construir_malla("simpson", a, b, N)
+            y_arr = evaluar_en_malla(f_str, x_arr)
+        if y_arr is not None:
+            medicion.contar_evaluaciones(N + 1)
+
     h = (b - a) / N
-    
-    puntos_evaluacion_simpson = [] # (índice_str, x_i, fx_i, coeficiente, termino_formula)
-    suma_terminos_formula = 0.0
 
-    # Calcular f(x_i) y aplicar coeficientes de Simpson
-    for i in range(N + 1): # N+1 puntos, de x_0 a x_N
-        x_i = a + i * h
-        try:
-            fx_i = func(x_i)
-        except Exception as e:
-            return None, f"Error al evaluar f(x)='{f_str}' en x = {x_i:.4f}: {e}", None, None
+    if y_arr is not None:
+        with medicion.fase("suma_ponderada"):
+            suma_terminos_formula = suma_ponderada("simpson", y_arr)
+        with medicion.fase("conversion_listas"):
+            x_puntos = x_arr.tolist()
+            y_puntos = y_arr.tolist()
+    else:
+        # Camino escalar (respaldo): expresiones que solo funcionan con floats de Python
+        x_puntos = []
+        y_puntos = []
+        with medicion.fase("evaluacion"):
+            for i in range(N + 1): # N+1 puntos, de x_0 a x_N
+                x_i = a + i * h
+                try:
+                    fx_i = func(x_i)
+                except Exception as e:
+                    return None, f"Error al evaluar f(x)='{f_str}' en x = {x_i:.4f}: {e}", None, None
+                x_puntos.append(x_i)
+                y_puntos.append(fx_i)
+        medicion.contar_evaluaciones(N + 1)
+        with medicion.fase("suma_ponderada"):
+            suma_terminos_formula = sum(coeficiente("simpson", i, N) * fx_i for i, fx_i in enumerate(y_puntos))
+        x_arr, y_arr = x_puntos, y_puntos
+
+    integral_aprox = (h / 3.0) * suma_terminos_formula
 
-        coeficiente = 0
-        idx_str = f"x_{i}"
+    if acumulado: # Integral desde a hasta cada nodo par, en O(N)
+        with medicion.fase("acumulada"):
+            extras.update(x_acumulada=np.asarray(x_arr)[::2], acumulada=integral_acumulada("simpson", y_arr, h))
+
+    if detail == DETALLE_NINGUNO:
+        return ResultadoIntegracion(integral_aprox, None, x_puntos, y_puntos, **extras)
+
+    with medicion.fase("reporte"):
+        detalle_calculo = _reporte_simpson_funcion(detail, medicion, f_str, a, b, N, h, x_puntos, y_puntos,
+                                                   suma_terminos_formula, integral_aprox,
+                                                   extras if auto_N else None, tol)
+
+    return ResultadoIntegracion(integral_aprox, detalle_calculo, x_puntos, y_puntos, **extras)
+
+
+def _reporte_simpson_funcion(detail, medicion, f_str, a, b, N, h, x_puntos, y_puntos,
+                             suma_terminos_formula, integral_aprox, extras_auto_N, tol):
+    """Registra el reporte perezoso de simpson_funcion (extras_auto_N es None sin auto_N)."""
+    # --- Registrar el reporte del cálculo (se formatea solo cuando se solicita) ---
+    def indice(i):
         if i == 0:
-            coeficiente = 1
-            idx_str = "x_0 (a)"
-        elif i == N:
-            coeficiente = 1
-            idx_str = f"x_{N} (b)"
-        elif i % 2 == 1: # Impar
-            coeficiente = 4
-        else: # Par (no extremo)
-            coeficiente = 2
-        
-        termino_actual = coeficiente * fx_i
-        suma_terminos_formula += termino_actual
-        puntos_evaluacion_simpson.append((idx_str, x_i, fx_i, coeficiente, termino_actual))
+            return "x_0 (a)"
+        if i == N:
+            return f"x_{N} (b)"
+        return f"x_{i}"
 
-    integral_aprox = (h / 3.0) * suma_terminos_formula
+    def fila_tabla(i):
+        coef = int(coeficiente("simpson", i, N))
+        return (f"{indice(i):<7} | {x_puntos[i]:<12.8f} | {y_puntos[i]:<12.8f} | "
+                f"{coef:<5} | {coef * y_puntos[i]:.8f}\n")
 
-    # --- Construir la cadena de detalles del cálculo ---
-    detalle_calculo = f"Método de Simpson 1/3 con {N + 1} puntos ({N} intervalos).\\n"
-    detalle_calculo += f"Función f(x) = {f_str}\\nLímites [{a}, {b}], N = {N}\\n\\n"
+    detalle_calculo = ReporteCalculo(detail, medicion)
+    detalle_calculo.agregar_texto(f"Método de Simpson 1/3 con {N + 1} puntos ({N} intervalos).\n")
+    detalle_calculo.agregar_texto(f"Función f(x) = {f_str}\nLímites [{a}, {b}], N = {N}\n\n")
+    if extras_auto_N is not None:
+        detalle_calculo.agregar_texto(f"N elegido automáticamente (tolerancia = {tol:g}): N = {N}, "
+                                      f"error estimado (Richardson) = {extras_auto_N['error_estimado']:.2e}, "
+                                      f"evaluaciones = {extras_auto_N['evaluaciones']}"
+                                      f"{'' if extras_auto_N['convergio'] else ' (se alcanzó N_max sin llegar a la tolerancia)'}\n\n")
+
+    detalle_calculo.agregar_texto("Cálculo de h:\n"
+                                  f"h = ( {b} - {a} ) / {N} = {h:.8f}\n\n")
+
+    detalle_calculo.agregar_texto("Tabla de evaluación de la función y términos de Simpson:\n"
+                                  "Índice  | x_i          | f(x_i)       | Coef. | Coef*f(x_i)\n"
+                                  "-----------------------------------------------------------\n",
+                                  nivel=DETALLE_COMPLETO)
+    detalle_calculo.agregar_filas(N + 1, fila_tabla)
+    detalle_calculo.agregar_texto("\n", nivel=DETALLE_COMPLETO)
 
-    detalle_calculo += "Cálculo de h:\\n"
-    detalle_calculo += f"h = ( {b} - {a} ) / {N} = {h:.8f}\\n\\n"
-        
-    detalle_calculo += "Tabla de evaluación de la función y términos de Simpson:\\n"
-    detalle_calculo += "Índice  | x_i          | f(x_i)       | Coef. | Coef*f(x_i)\\n"
-    detalle_calculo += "-----------------------------------------------------------\\n"
-    for idx_str, x_val, fx_val, coef, term_val in puntos_evaluacion_simpson:
-        detalle_calculo += f"{idx_str:<7} | {x_val:<12.8f} | {fx_val:<12.8f} | {coef:<5} | {term_val:.8f}\\n"
-    detalle_calculo += "\\n"
-
-    detalle_calculo += "Suma completa (según la fórmula de Simpson 1/3):\\n"
-    detalle_calculo += f"Integral ≈ ({h:.8f}/3) * [ "
-    
     # Mostrar la suma de los términos individuales (coef*f(xi))
-    sum_parts_display = " + ".join([f"{p[4]:.8f}" for p in puntos_evaluacion_simpson])
-    detalle_calculo += sum_parts_display
-    detalle_calculo += " ]\\n"
-    
-    detalle_calculo += f"           ≈ ({h:.8f}/3) * [ {suma_terminos_formula:.8f} ] = {integral_aprox:.8f}\\n"
-    detalle_calculo += "\\n" 
+    detalle_calculo.agregar_texto("Suma completa (según la fórmula de Simpson 1/3):\n"
+                                  f"Integral ≈ ({h:.8f}/3) * [ ", nivel=DETALLE_COMPLETO)
+    detalle_calculo.agregar_filas(N + 1, lambda i: f"{coeficiente('simpson', i, N) * y_puntos[i]:.8f}",
+                                  separador=" + ", marcador_omision="...")
+    detalle_calculo.agregar_texto(" ]\n", nivel=DETALLE_COMPLETO)
+
+    # En "full" esta línea continúa la suma expandida; en "summary" es el resultado completo
+    prefijo = "           ≈" if detail == DETALLE_COMPLETO else "Integral ≈"
+    detalle_calculo.agregar_texto(f"{prefijo} ({h:.8f}/3) * [ {suma_terminos_formula:.8f} ] = {integral_aprox:.8f}\n"
+                                  "\n")
+
+    return detalle_calculo
+
+
+def simpson_adaptativo(f_str, a, b, tol=1e-8, max_evaluaciones=10000, detail=DETALLE_COMPLETO):
+    """
+    Aproxima la integral de f(x) en [a, b] con Simpson 1/3 adaptativo: en lugar de fijar N,
+    se refinan (bisección) solo los subintervalos cuyo error local estimado supera su
+    parte de la tolerancia. Cada f(x_i) se evalúa una única vez y se reutiliza en los
+    subintervalos hijos; en cada ronda todos los puntos nuevos se evalúan juntos.
+
+    Parámetros:
+        f_str (str): La función como cadena, ej. "x**2 * exp(-x)".
+        a (float): Límite inferior de integración.
+        b (float): Límite superior de integración.
+        tol (float): Tolerancia absoluta deseada para el error total (> 0).
+        max_evaluaciones (int): Presupuesto máximo de evaluaciones de f(x) (>= 5).
+        detail (str): Nivel del reporte: "none", "summary" o "full".
+
+    Retorna:
+        ResultadoIntegracion (tupla (float, ReporteCalculo | None, list[float], list[float]))
+        con los atributos adicionales:
+            - error_estimado (float): Estimación del error absoluto (Richardson por subintervalo).
+            - evaluaciones (int): Número de evaluaciones de f(x) realizadas.
+            - subintervalos (int): Número de subintervalos aceptados.
+            - convergio (bool): False si se agotó el presupuesto antes de alcanzar 'tol'.
+    """
+    # 1. Validaciones de entrada
+    if not isinstance(f_str, str) or not f_str:
+        return None, "Error: La función 'f_str' debe ser una cadena de texto no vacía.", None, None
+    if b <= a:
+        return None, "Error: El límite superior 'b' debe ser mayor que el límite inferior 'a'.", None, None
+    if not tol > 0:
+        return None, "Error: La tolerancia 'tol' debe ser un número positivo.", None, None
+    if not isinstance(max_evaluaciones, int) or max_evaluaciones < 5:
+        return None, "Error: El presupuesto 'max_evaluaciones' debe ser un entero >= 5.", None, None
+    error_detalle = validar_detalle(detail)
+    if error_detalle:
+        return None, error_detalle, None, None
+    try:
+        compilar_expresion(f_str)
+    except Exception as e:
+        return None, f"Error al parsear la función f_str='{f_str}': {e}", None, None
+
+    # Coeficientes (1, 4, 1) de Simpson 1/3 sobre un solo par de subintervalos
+    c0, c1, c2 = (coeficiente("simpson", i, 2) for i in range(3))
+
+    def simpson_panel(fl, fm, fr, ancho):
+        return (ancho / 6.0) * (c0 * fl + c1 * fm + c2 * fr)
+
+    # 2. Panel inicial [a, b] con su punto medio (3 evaluaciones)
+    try:
+        x_eval = [np.array([a, (a + b) / 2.0, b])]
+        y_eval = [evaluar_puntos(f_str, x_eval[0])]
+    except ErrorEvaluacion as e:
+        return None, str(e), None, None
+    evaluaciones = 3
+
+    izq = np.array([a], dtype=np.float64)
+    der = np.array([b], dtype=np.float64)
+    f_izq, f_med, f_der = y_eval[0][:1], y_eval[0][1:2], y_eval[0][2:]
+    estimacion = simpson_panel(f_izq, f_med, f_der, der - izq)
+    tol_local = np.array([float(tol)])
+
+    integral_aprox = 0.0
+    error_estimado = 0.0
+    n_subintervalos = 0
+    aceptados = [] # (a_i, b_i, integral_i, error_i) por cada subintervalo aceptado
+    convergio = True
+
+    # 3. Refinamiento por rondas: todos los subintervalos pendientes a la vez
+    while izq.size:
+        medio = (izq + der) / 2.0
+        x_nuevos = np.concatenate(((izq + medio) / 2.0, (medio + der) / 2.0))
+        try:
+            y_nuevos = evaluar_puntos(f_str, x_nuevos)
+        except ErrorEvaluacion as e:
+            return None, str(e), None, None
+        evaluaciones += x_nuevos.size
+        x_eval.append(x_nuevos)
+        y_eval.append(y_nuevos)
+
+        f_cuarto_izq, f_cuarto_der = np.split(y_nuevos, 2)
+        mitad = (der - izq) / 2.0
+        s_izq = simpson_panel(f_izq, f_cuarto_izq, f_med, mitad)
+        s_der = simpson_panel(f_med, f_cuarto_der, f_der, mitad)
+        diferencia = s_izq + s_der - estimacion
+
+        # Criterio clásico: |S(izq) + S(der) - S| <= 15 * tol_local
+        acepta = np.abs(diferencia) <= 15.0 * tol_local
+        # Sin presupuesto para otra ronda completa: se aceptan todos los pendientes
+        if evaluaciones + 4 * np.count_nonzero(~acepta) > max_evaluaciones:
+            convergio = bool(np.all(acepta))
+            acepta[:] = True
+
+        valor = s_izq + s_der + diferencia / 15.0
+        integral_aprox += float(np.sum(valor[acepta]))
+        error_estimado += float(np.sum(np.abs(diferencia[acepta]))) / 15.0
+        n_subintervalos += int(np.count_nonzero(acepta))
+        if detail == DETALLE_COMPLETO:
+            aceptados.extend(zip(izq[acepta].tolist(), der[acepta].tolist(),
+                                 valor[acepta].tolist(), (np.abs(diferencia[acepta]) / 15.0).tolist()))
+
+        # Los subintervalos rechazados se dividen en dos hijos que reutilizan sus puntos
+        r = ~acepta
+        izq, der = np.concatenate((izq[r], medio[r])), np.concatenate((medio[r], der[r]))
+        f_izq, f_der = np.concatenate((f_izq[r], f_med[r])), np.concatenate((f_med[r], f_der[r]))
+        f_med = np.concatenate((f_cuarto_izq[r], f_cuarto_der[r]))
+        estimacion = np.concatenate((s_izq[r], s_der[r]))
+        tol_local = np.concatenate((tol_local[r], tol_local[r])) / 2.0
+
+    x_todos = np.concatenate(x_eval)
+    orden = np.argsort(x_todos, kind="stable")
+    x_puntos = x_todos[orden].tolist()
+    y_puntos = np.concatenate(y_eval)[orden].tolist()
+
+    detalle_calculo = None
+    if detail != DETALLE_NINGUNO:
+        detalle_calculo = ReporteCalculo(detail)
+        detalle_calculo.agregar_texto("Método de Simpson 1/3 adaptativo.\n"
+                                      f"Función f(x) = {f_str}\nLímites [{a}, {b}], tolerancia = {tol:g}\n\n")
+        detalle_calculo.agregar_texto("Subintervalos aceptados:\n"
+                                      "a_i          | b_i          | Integral_i     | Error_i\n"
+                                      "-----------------------------------------------------------\n",
+                                      nivel=DETALLE_COMPLETO)
+        aceptados.sort()
+        detalle_calculo.agregar_filas(
+            len(aceptados),
+            lambda i: (f"{aceptados[i][0]:<12.8f} | {aceptados[i][1]:<12.8f} | "
+                       f"{aceptados[i][2]:<14.8f} | {aceptados[i][3]:.2e}\n"))
+        detalle_calculo.agregar_texto("\n", nivel=DETALLE_COMPLETO)
+        detalle_calculo.agregar_texto(f"Evaluaciones de f(x): {evaluaciones} (presupuesto {max_evaluaciones})\n"
+                                      f"Error estimado: {error_estimado:.2e}"
+                                      f"{'' if convergio else ' (presupuesto agotado antes de alcanzar la tolerancia)'}\n"
+                                      f"Integral ≈ {integral_aprox:.8f}\n\n")
 
-    x_puntos = [p[1] for p in puntos_evaluacion_simpson]
-    y_puntos = [p[2] for p in puntos_evaluacion_simpson]
+    return ResultadoIntegracion(integral_aprox, detalle_calculo, x_puntos, y_puntos,
+                                error_estimado=error_estimado, evaluaciones=evaluaciones,
+                                subintervalos=n_subintervalos, convergio=convergio)
 
-    return integral_aprox, detalle_calculo, x_puntos, y_puntos
 
 def solicitar_funcion_str():
     while True:
@@ -0,0 +1,306 @@
+import os
+import time
+import zipfile
+from itertools import islice
+
+import numpy as np
+
+from .calculation_report import DETALLE_NINGUNO, DETALLE_RESUMEN, ReporteCalculo, validar_detalle
+from .integration_result import ResultadoIntegracion
+from .simpson_vector_method import _como_arreglo, _verificar_equiespaciado, simpson_un_tercio
+
+# Número de muestras por bloque leído (≈ 16 MB por bloque para pares de float64).
+TAMANO_BLOQUE = 1 << 20
+
+_EXTENSIONES_CSV = (".csv", ".txt", ".dat")
+_EXTENSIONES_NUMPY = (".npy", ".npz")
+
+
+def leer_bloques_csv(ruta, tamano_bloque=TAMANO_BLOQUE, delimitador=",", columnas=(0, 1)):
+    """
+    Lee un archivo de texto con columnas x, f(x) por bloques de 'tamano_bloque' filas.
+
+    Si la primera línea no es numérica se considera encabezado y se omite.
+
+    Retorna:
+        Generador de tuplas (numpy.ndarray, numpy.ndarray) con x y f(x) de cada bloque.
+    """
+    try:
+        yield from _leer_bloques_texto(ruta, tamano_bloque, delimitador, columnas)
+    except UnicodeDecodeError:
+        raise ValueError(f"El archivo '{ruta}' no es un archivo de texto UTF-8; "
+                         f"si es binario, indique formato='binario'.")
+
+
+def _leer_bloques_texto(ruta, tamano_bloque, delimitador, columnas):
+    with open(ruta, "r", encoding="utf-8") as archivo:
+        primera = archivo.readline()
+        pendientes = [primera]
+        try:
+            np.loadtxt(pendientes, delimiter=delimitador, usecols=columnas, ndmin=2)
+        except ValueError:
+            pendientes = [] # Encabezado
+        while True:
+            lineas = pendientes + list(islice(archivo, tamano_bloque - len(pendientes)))
+            pendientes = []
+            lineas = [linea for linea in lineas if linea.strip()]
+            if not lineas:
+                return
+            datos = np.loadtxt(lineas, delimiter=delimitador, usecols=columnas, ndmin=2)
+            yield datos[:, 0], datos[:, 1]
+
+
+def leer_bloques_binario(ruta, tamano_bloque=TAMANO_BLOQUE, dtype="<f8"):
+    """
+    Lee un archivo binario con pares intercalados (x_0, f_0, x_1, f_1, ...) por bloques.
+
+    Parámetros:
+        dtype (str): Tipo de cada valor, ej. "<f8" (float64 little-endian) o "<f4" (float32).
+
+    Retorna:
+        Generador de tuplas (numpy.ndarray, numpy.ndarray) con x y f(x) de cada bloque.
+    """
+    with open(ruta, "rb") as archivo:
+        while True:
+            datos = np.fromfile(archivo, dtype=dtype, count=2 * tamano_bloque)
+            if datos.size == 0:
+                return
+            if datos.size % 2:
+                raise ValueError(f"El archivo binario '{ruta}' no contiene un número par de valores (pares x, f(x)).")
+            yield datos[0::2], datos[1::2]
+
+
+def _separar_columnas(datos, ruta):
+    """Devuelve las vistas (x, f(x)) de un arreglo con forma (n, 2) o (2, n), sin copiar."""
+    if datos.ndim == 2 and datos.shape[1] == 2:
+        return datos[:, 0], datos[:, 1]
+    if datos.ndim == 2 and datos.shape[0] == 2:
+        return datos[0], datos[1]
+    raise ValueError(f"El arreglo de '{ruta}' debe tener forma (n, 2) o (2, n); tiene forma {datos.shape}.")
+
+
+def _mapear_miembro_npz(ruta, nombre):
+    """
+    Mapea en memoria un arreglo guardado sin compresión dentro de un .npz (np.savez).
+    Si el miembro está comprimido (np.savez_compressed) no se puede mapear y se carga.
+    """
+    with zipfile.ZipFile(ruta) as zf:
+        info = zf.getinfo(nombre)
+        if info.compress_type != zipfile.ZIP_STORED:
+            with zf.open(nombre) as miembro:
+                return np.lib.format.read_array(miembro)
+    with open(ruta, "rb") as archivo:
+        # Cabecera local del zip: 30 bytes fijos + nombre + campo extra
+        archivo.seek(info.header_offset + 26)
+        largo_nombre, largo_extra = np.frombuffer(archivo.read(4), dtype="<u2")
+        archivo.seek(info.header_offset + 30 + int(largo_nombre) + int(largo_extra))
+        version = np.lib.format.read_magic(archivo)
+        if version == (1, 0):
+            forma, fortran, dtype = np.lib.format.read_array_header_1_0(archivo)
+        else:
+            forma, fortran, dtype = np.lib.format.read_array_header_2_0(archivo)
+        desplazamiento = archivo.tell()
+    return np.memmap(ruta, dtype=dtype, mode="r", offset=desplazamiento, shape=forma,
+                     order="F" if fortran else "C")
+
+
+def abrir_tabulado(ruta, formato=None, dtype="<f8", claves=None):
+    """
+    Abre datos tabulados (x, f(x)) mapeados en memoria con np.memmap, sin leer el archivo:
+    el sistema operativo carga solo las páginas que se recorren, así que el tiempo de
+    apertura no depende del tamaño del archivo.
+
+    Formatos (por 'formato' o, para .npy y .npz, por la extensión):
+        - "npy": un arreglo con forma (n, 2) o (2, n).
+        - "npz": dos arreglos (claves 'x' y 'fx'/'y', o los indicados en 'claves'), o uno
+          solo con forma (n, 2) o (2, n). Solo los .npz sin compresión se mapean.
+        - "raw": binario sin cabecera con pares intercalados (x_0, f_0, x_1, f_1, ...)
+          del tipo 'dtype' ("<f8" float64 o "<f4" float32, little-endian). Como no tiene
+          cabecera que lo identifique, hay que indicarlo siempre con formato="raw".
+
+    Retorna:
+        Tupla (numpy.ndarray, numpy.ndarray) con vistas de solo lectura de x y f(x).
+
+    Excepciones:
+        ValueError si el formato no se indica y la extensión no es .npy ni .npz (un archivo
+        de texto mapeado como binario daría valores sin sentido).
+    """
+    if formato is None:
+        extension = os.path.splitext(str(ruta))[1].lower()
+        if extension in _EXTENSIONES_CSV:
+            raise ValueError(f"'{ruta}' es un archivo de texto y no se puede mapear en memoria; "
+                             f"use simpson_un_tercio_por_bloques (formato 'csv').")
+        if extension not in _EXTENSIONES_NUMPY:
+            raise ValueError(f"No se reconoce el formato de '{ruta}' por su extensión. Use .npy o .npz, "
+                             f"o indique formato='raw' para un binario sin cabecera.")
+        formato = extension[1:]
+    if formato == "npy":
+        return _separar_columnas(np.load(ruta, mmap_mode="r"), ruta)
+    if formato == "npz":
+        with zipfile.ZipFile(ruta) as zf:
+            nombres = [nombre[:-4] for nombre in zf.namelist() if nombre.endswith(".npy")]
+        if claves is None:
+            claves = next(((cx, cy) for cx, cy in (("x", "fx"), ("x", "y")) if cx in nombres and cy in nombres),
+                          None)
+        if claves is None:
+            if len(nombres) != 1:
+                raise ValueError(f"No se encontraron las claves 'x' y 'fx' en '{ruta}' (contiene: {nombres}).")
+            return _separar_columnas(_mapear_miembro_npz(ruta, nombres[0] + ".npy"), ruta)
+        return tuple(_mapear_miembro_npz(ruta, clave + ".npy") for clave in claves)
+    if formato == "raw":
+        datos = np.memmap(ruta, dtype=dtype, mode="r")
+        if datos.size % 2:
+            raise ValueError(f"El archivo binario '{ruta}' no contiene un número par de valores (pares x, f(x)).")
+        return _separar_columnas(datos.reshape(-1, 2), ruta)
+    raise ValueError(f"Formato de archivo desconocido: '{formato}'. Use 'npy', 'npz' o 'raw'.")
+
+
+def simpson_un_tercio_archivo(ruta, detail=DETALLE_RESUMEN, **opciones):
+    """
+    Integra con simpson_un_tercio un archivo .npy, .npz o binario crudo (formato="raw")
+    directamente sobre las páginas mapeadas en memoria (ver abrir_tabulado), sin
+    convertirlo a listas.
+
+    Retorna:
+        La misma tupla que simpson_un_tercio; x y f(x) son las vistas mapeadas del archivo.
+    """
+    x_valores, fx_valores = abrir_tabulado(ruta, **opciones)
+    return simpson_un_tercio(x_valores, fx_valores, detail=detail)
+
+
+def leer_bloques_mapeados(ruta, tamano_bloque=TAMANO_BLOQUE, **opciones):
+    """Recorre por bloques un archivo abierto con abrir_tabulado (vistas, sin copias)."""
+    x_valores, fx_valores = abrir_tabulado(ruta, **opciones)
+    for inicio in range(0, x_valores.size, tamano_bloque):
+        yield x_valores[inicio:inicio + tamano_bloque], fx_valores[inicio:inicio + tamano_bloque]
+
+
+def bloques_desde_archivo(ruta, tamano_bloque=TAMANO_BLOQUE, formato=None, **opciones):
+    """
+    Elige el lector según 'formato' ("csv", "binario", "npy" o "npz") o, si no se indica,
+    según la extensión (.csv/.txt/.dat/.tsv, .npy o .npz; los .tsv usan tabulador como
+    delimitador por defecto). Las opciones adicionales se pasan al lector (delimitador,
+    columnas, dtype, claves). Los .npy y .npz se recorren mapeados en memoria.
+
+    Excepciones:
+        ValueError si el formato no se indica y la extensión no es ninguna de las anteriores:
+        un binario sin cabecera hay que indicarlo siempre con formato="binario".
+    """
+    if formato is None:
+        extension = os.path.splitext(str(ruta))[1].lower()
+        if extension in _EXTENSIONES_CSV:
+            formato = "csv"
+        elif extension == ".tsv":
+            formato = "csv"
+            opciones.setdefault("delimitador", "\t")
+        elif extension in _EXTENSIONES_NUMPY:
+            formato = extension[1:]
+        else:
+            raise ValueError(f"No se reconoce el formato de '{ruta}' por su extensión. Use .csv, .txt, .dat, "
+                             f".tsv, .npy o .npz, o indique formato='binario' para un binario sin cabecera.")
+    if formato == "csv":
+        return leer_bloques_csv(ruta, tamano_bloque, **opciones)
+    if formato == "binario":
+        return leer_bloques_binario(ruta, tamano_bloque, **opciones)
+    if formato in ("npy", "npz"):
+        return leer_bloques_mapeados(ruta, tamano_bloque, formato=formato, **opciones)
+    raise ValueError(f"Formato de archivo desconocido: '{formato}'. Use 'csv', 'binario', 'npy' o 'npz'.")
+
+
+def simpson_un_tercio_por_bloques(fuente, tamano_bloque=TAMANO_BLOQUE, detail=DETALLE_RESUMEN, **opciones):
+    """
+    Aproxima la integral de datos tabulados con Simpson 1/3 leyendo los datos por bloques,
+    con memoria constante. Da el mismo resultado que simpson_un_tercio sobre los datos
+    completos (salvo el redondeo de la suma), aunque no quepan en la memoria.
+
+    La fase de los coeficientes (4 en índices impares, 2 en pares) se lleva con el índice
+    global de cada bloque, y la verificación del espaciado incluye el último punto del
+    bloque anterior, por lo que los límites entre bloques no afectan al resultado.
+
+    Parámetros:
+        fuente (str | os.PathLike | iterable): Ruta a un archivo (ver bloques_desde_archivo)
+            o un iterable de pares (x_bloque, fx_bloque).
+        tamano_bloque (int): Número de muestras por bloque al leer archivos.
+        detail (str): "none" o "summary" (con datos en flujo no se conservan los términos,
+            así que "full" equivale a "summary").
+        **opciones: Opciones del lector de archivo (formato, delimitador, columnas, dtype).
+
+    Retorna:
+        ResultadoIntegracion (tupla (float, ReporteCalculo | None, None, None)) con los atributos:
+            - n_puntos (int), h (float), segundos (float) y muestras_por_segundo (float).
+        Los puntos no se devuelven porque no se conservan en memoria.
+
+    Excepciones:
+        ValueError si los datos no son válidos (igual que simpson_un_tercio).
+    """
+    error_detalle = validar_detalle(detail)
+    if error_detalle:
+        raise ValueError(error_detalle)
+    if not isinstance(tamano_bloque, int) or tamano_bloque < 2:
+        raise ValueError("El tamaño de bloque 'tamano_bloque' debe ser un entero >= 2.")
+    if isinstance(fuente, (str, os.PathLike)):
+        fuente = bloques_desde_archivo(fuente, tamano_bloque, **opciones)
+
+    inicio_reloj = time.perf_counter()
+    n_puntos = 0
+    h = None
+    x_anterior = None
+    f_primero = f_ultimo = 0.0
+    suma_impares = 0.0
+    suma_pares = 0.0 # Incluye los extremos; se corrigen al final
+
+    for x_bloque, fx_bloque in fuente:
+        x_bloque = _como_arreglo(x_bloque, "x")
+        fx_bloque = _como_arreglo(fx_bloque, "f(x)")
+        if x_bloque.size != fx_bloque.size:
+            raise ValueError("Los vectores x_valores y fx_valores deben tener la misma longitud.")
+        if x_bloque.size == 0:
+            continue
+
+        # El punto final del bloque anterior enlaza la verificación del espaciado. Se guarda
+        # como arreglo de un elemento para conservar el dtype del bloque: un float de Python
+        # promovería los bloques float32 a float64 y la holgura de _verificar_equiespaciado
+        # se calcularía con el eps de float64.
+        x_extendido = x_bloque if x_anterior is None else np.concatenate((x_anterior, x_bloque))
+        if h is None and x_extendido.size >= 2:
+            h = float(x_extendido[1]) - float(x_extendido[0])
+            if h <= 0:
+                raise ValueError("Los valores de x deben estar en orden ascendente y h debe ser positivo.")
+        if h is not None:
+            _verificar_equiespaciado(x_extendido, h, desplazamiento=n_puntos - (x_anterior is not None))
+
+        if n_puntos == 0:
+            f_primero = float(fx_bloque[0])
+        paridad = n_puntos % 2 # Fase global: índice del primer elemento del bloque
+        suma_pares += float(np.sum(fx_bloque[paridad::2], dtype=np.float64))
+        suma_impares += float(np.sum(fx_bloque[1 - paridad::2], dtype=np.float64))
+
+        n_puntos += x_bloque.size
+        x_anterior = x_bloque[-1:]
+        f_ultimo = float(fx_bloque[-1])
+
+    if n_puntos < 3:
+        raise ValueError("Se requieren al menos 3 puntos para el método de Simpson 1/3.")
+    if (n_puntos - 1) % 2 != 0:
+        raise ValueError(f"El número de puntos ({n_puntos}) debe ser impar para Simpson 1/3 "
+                         f"(lo que implica un número par de {n_puntos - 1} intervalos).")
+
+    # f_0 y f_N están en suma_pares con coeficiente 2; su coeficiente real es 1
+    suma_terminos_formula = 4.0 * suma_impares + 2.0 * suma_pares - f_primero - f_ultimo
+    integral_aprox = (h / 3.0) * suma_terminos_formula
+
+    segundos = time.perf_counter() - inicio_reloj
+    muestras_por_segundo = n_puntos / segundos if segundos > 0 else float("inf")
+
+    detalle_calculo = None
+    if detail != DETALLE_NINGUNO:
+        detalle_calculo = ReporteCalculo(detail)
+        detalle_calculo.agregar_texto(f"Método de Simpson 1/3 por bloques con {n_puntos} puntos "
+                                      f"({n_puntos - 1} intervalos).\n")
+        detalle_calculo.agregar_texto(f"Paso h = {h:.8f}\n\n")
+        detalle_calculo.agregar_texto(f"Integral ≈ ({h:.8f}/3) * [ {suma_terminos_formula:.8f} ] = {integral_aprox:.8f}\n")
+        detalle_calculo.agregar_texto(f"Tiempo: {segundos:.3f} s ({muestras_por_segundo:,.0f} muestras/s)\n")
+
+    return ResultadoIntegracion(integral_aprox, detalle_calculo, None, None,
+                                n_puntos=n_puntos, h=h, segundos=segundos,
+                                muestras_por_segundo=muestras_por_segundo)
@@ -1,28 +1,106 @@
-import math
+import numpy as np
 
-def simpson_un_tercio(x_valores, fx_valores):
+from .calculation_report import (DETALLE_COMPLETO, DETALLE_NINGUNO, DETALLE_RESUMEN, ReporteCalculo,
+                                 validar_detalle)
+from .integration_result import ResultadoIntegracion
+from .phase_timing import MEDICION_NULA, iniciar_medicion
+from .vectorized_engine import integral_acumulada, obtener_pesos
+
+# Tamaño de bloque para la verificación del espaciado: limita la memoria temporal de np.diff.
+_BLOQUE_VERIFICACION = 1 << 20
+
+# Número máximo de valores de la matriz de canales que se convierten a float64 a la vez.
+TAMANO_BLOQUE_CANALES = 1 << 22
+
+
+def _como_arreglo(valores, nombre):
+    """
+    Convierte listas, arreglos de NumPy, memoryviews u objetos con protocolo de buffer
+    en un arreglo 1-D de punto flotante. No copia si los datos ya son flotantes.
+    """
+    arreglo = np.asarray(valores)
+    if arreglo.dtype.kind != "f":
+        try:
+            arreglo = arreglo.astype(np.float64)
+        except (TypeError, ValueError):
+            raise ValueError(f"El vector {nombre} debe contener solo números.")
+    if arreglo.ndim != 1:
+        raise ValueError(f"El vector {nombre} debe ser unidimensional (tiene forma {arreglo.shape}).")
+    return arreglo
+
+
+def _verificar_equiespaciado(x, h, desplazamiento=0):
+    """
+    Verifica de forma vectorizada (por bloques de np.diff) que todos los pasos de x sean
+    iguales a h, con la misma tolerancia relativa que math.isclose(rel_tol=1e-9) más una
+    holgura de unos pocos ulp para el redondeo de los propios valores de x.
+
+    Parámetros:
+        desplazamiento (int): Índice global del primer elemento de x (para los mensajes).
+
+    Excepciones:
+        ValueError con el primer par de puntos no equiespaciados.
+    """
+    # Holgura absoluta de unos pocos ulp de los extremos: el propio redondeo de x al
+    # almacenarlo (relevante si h es muy pequeño frente a |x| o los datos son float32).
+    holgura = 4.0 * float(np.finfo(x.dtype).eps) * max(abs(float(x[0])), abs(float(x[-1])))
+    for inicio in range(0, x.size - 1, _BLOQUE_VERIFICACION):
+        bloque = x[inicio:inicio + _BLOQUE_VERIFICACION + 1].astype(np.float64, copy=False)
+        pasos = np.diff(bloque)
+        correctos = np.abs(pasos - h) <= np.maximum(1e-9 * np.maximum(np.abs(pasos), abs(h)), holgura)
+        if not correctos.all():
+            j = int(np.argmin(correctos))
+            i = desplazamiento + inicio + j
+            raise ValueError(f"Los valores de x no están equiespaciados. "
+                             f"Se esperaba h={h:.6f} pero se encontró h={pasos[j]:.6f} "
+                             f"entre x_{i}={bloque[j]} y x_{i+1}={bloque[j + 1]}.")
+
+
+def _suma_simpson(fx):
+    """Suma f_0 + 4*(impares) + 2*(pares interiores) + f_N con reducciones sobre vistas con paso 2."""
+    return (float(fx[0]) + float(fx[-1])
+            + 4.0 * float(np.sum(fx[1:-1:2], dtype=np.float64))
+            + 2.0 * float(np.sum(fx[2:-1:2], dtype=np.float64)))
+
+
+def simpson_un_tercio(x_valores, fx_valores, detail=DETALLE_COMPLETO, acumulado=False):
     """
     Aproxima la integral de una función tabulada f(x) usando el método de Simpson 1/3.
 
     Parámetros:
-        x_valores (list[float]): Lista de valores de x, deben estar equiespaciados.
-        fx_valores (list[float]): Lista de valores de f(x) correspondientes a x_valores.
+        x_valores (list[float] | numpy.ndarray | buffer): Valores de x, deben estar equiespaciados.
+            Se aceptan listas, arreglos de NumPy, memoryviews y cualquier objeto con protocolo
+            de buffer; los datos flotantes se usan sin copiarlos.
+        fx_valores (list[float] | numpy.ndarray | buffer): Valores de f(x) correspondientes a x_valores.
+        detail (str): Nivel del reporte: "none" (sin reporte), "summary" (solo
+            encabezado y resultado) o "full" (incluye la suma expandida).
+        acumulado (bool): Si es True, calcula también la integral acumulada desde x_0 hasta
+            cada punto par x_0, x_2, ..., x_N (atributos 'x_acumulada' y 'acumulada').
 
     Retorna:
-        Tupla (float, str, list[float], list[float]):
+        ResultadoIntegracion (float, ReporteCalculo | None, list[float], list[float]):
             - Aproximación numérica de la integral.
-            - Cadena con los detalles del cálculo (incluyendo la tabla).
-            - Lista de coordenadas x de los puntos de entrada (los mismos que x_valores).
-            - Lista de coordenadas y (f(x)) de los puntos de entrada (los mismos que fx_valores).
+            - Reporte perezoso con los detalles del cálculo (str(reporte) lo genera).
+            - Coordenadas x de los puntos de entrada (el mismo objeto x_valores recibido).
+            - Coordenadas y (f(x)) de los puntos de entrada (el mismo objeto fx_valores recibido).
+        Con acumulado=True incluye los atributos 'x_acumulada' y 'acumulada', y con la
+        medición por fases activa (ver phase_timing), el atributo 'medicion'.
 
     Excepciones:
         ValueError si las entradas no son válidas (ej: longitudes no coinciden,
-                     número de puntos no es impar, x no equiespaciados, etc.).
+                     número de puntos no es impar, x no equiespaciados, nivel de detalle inválido, etc.).
     """
-    n_puntos = len(x_valores)
-
     # 1. Validaciones básicas
-    if n_puntos != len(fx_valores):
+    error_detalle = validar_detalle(detail)
+    if error_detalle:
+        raise ValueError(error_detalle)
+    medicion = iniciar_medicion("simpson_un_tercio")
+    with medicion.fase("validacion"):
+        x = _como_arreglo(x_valores, "x")
+        fx = _como_arreglo(fx_valores, "f(x)")
+    n_puntos = x.size
+
+    if n_puntos != fx.size:
         raise ValueError("Los vectores x_valores y fx_valores deben tener la misma longitud.")
 
     if n_puntos < 3:
@@ -34,57 +112,259 @@ def simpson_un_tercio(x_valores, fx_valores):
                          f"(lo que implica un número par de {n_puntos - 1} intervalos).")
 
     # 2. Verificar que x_valores estén equiespaciados y calcular h
-    h = x_valores[1] - x_valores[0]
+    h = float(x[1]) - float(x[0])
     if h <= 0:
         raise ValueError("Los valores de x deben estar en orden ascendente y h debe ser positivo.")
 
-    for i in range(1, n_puntos - 1):
-        h_actual = x_valores[i+1] - x_valores[i]
-        # Usar una tolerancia para comparar floats
-        if not math.isclose(h_actual, h, rel_tol=1e-9):
-            raise ValueError(f"Los valores de x no están equiespaciados. "
-                             f"Se esperaba h={h:.6f} pero se encontró h={h_actual:.6f} "
-                             f"entre x_{i}={x_valores[i]} y x_{i+1}={x_valores[i+1]}.")
+    with medicion.fase("validacion"):
+        _verificar_equiespaciado(x, h)
 
     # 3. Aplicar la fórmula de Simpson 1/3
-    suma_terminos_formula = 0.0
-    # Necesitamos los términos individuales para mostrar la suma explícita
-    terminos_para_la_suma_expandida = []
-
-    # Primer término: f(x_0)
-    coef = 1
-    termino_actual = coef * fx_valores[0]
-    suma_terminos_formula += termino_actual
-    terminos_para_la_suma_expandida.append(f"{termino_actual:.8f}")
-
-    # Términos intermedios
-    for i in range(1, n_puntos - 1):
-        if i % 2 == 1: coef = 4
-        else: coef = 2
-        termino_actual = coef * fx_valores[i]
-        suma_terminos_formula += termino_actual
-        terminos_para_la_suma_expandida.append(f"{termino_actual:.8f}")
-
-    # Último término: f(x_N)
-    coef = 1
-    termino_actual = coef * fx_valores[n_puntos - 1]
-    suma_terminos_formula += termino_actual
-    terminos_para_la_suma_expandida.append(f"{termino_actual:.8f}")
-    
+    with medicion.fase("suma_ponderada"):
+        suma_terminos_formula = _suma_simpson(fx)
+
     integral_aprox = (h / 3.0) * suma_terminos_formula
 
-    # --- Construir la cadena de detalles del cálculo REFINADA ---
+    if detail == DETALLE_NINGUNO:
+        detalle_calculo = None
+    else:
+        with medicion.fase("reporte"):
+            detalle_calculo = _reporte_simpson_un_tercio(detail, fx, h, suma_terminos_formula, integral_aprox,
+                                                         medicion)
+
+    extras = {}
+    if medicion is not MEDICION_NULA:
+        extras["medicion"] = medicion
+    if acumulado: # Integral desde x_0 hasta cada punto par, en O(N)
+        with medicion.fase("acumulada"):
+            extras.update(x_acumulada=x[::2], acumulada=integral_acumulada("simpson", fx, h))
+    return ResultadoIntegracion(integral_aprox, detalle_calculo, x_valores, fx_valores, **extras)
+
+
+def _reporte_simpson_un_tercio(detail, fx, h, suma_terminos_formula, integral_aprox, medicion):
+    """Registra el reporte perezoso de simpson_un_tercio."""
+    n_puntos = fx.size
+
+    def coeficiente(i):
+        if i == 0 or i == n_puntos - 1: # Primer y último término: f(x_0), f(x_N)
+            return 1
+        return 4 if i % 2 == 1 else 2   # Términos intermedios
+
+    # --- Registrar el reporte del cálculo (se formatea solo cuando se solicita) ---
     num_intervalos = n_puntos - 1
-    detalle_calculo = f"Método de Simpson 1/3 con {n_puntos} puntos ({num_intervalos} intervalos).\\n"
-    detalle_calculo += f"Paso h = {h:.8f}\\n\\n"
+    detalle_calculo = ReporteCalculo(detail, medicion)
+    detalle_calculo.agregar_texto(f"Método de Simpson 1/3 con {n_puntos} puntos ({num_intervalos} intervalos).\n")
+    detalle_calculo.agregar_texto(f"Paso h = {h:.8f}\n\n")
+
+    detalle_calculo.agregar_texto("Operación de la suma (según la fórmula de Simpson 1/3):\n"
+                                  f"Integral ≈ ({h:.8f}/3) * [ ", nivel=DETALLE_COMPLETO)
+    detalle_calculo.agregar_filas(n_puntos, lambda i: f"{coeficiente(i) * float(fx[i]):.8f}",
+                                  separador=" + ", marcador_omision="...")
+    detalle_calculo.agregar_texto(" ]\n", nivel=DETALLE_COMPLETO)
+    detalle_calculo.agregar_texto(f"           ≈ ({h:.8f}/3) * [ {suma_terminos_formula:.8f} ] = {integral_aprox:.8f}\n")
+
+    return detalle_calculo
+
+
+def pesos_simpson_no_uniforme(x):
+    """
+    Calcula en una sola pasada vectorizada los pesos w_i de Simpson compuesto para una malla
+    x no uniforme, de modo que Integral ≈ sum(w_i * f(x_i)).
+
+    Cada par de subintervalos (h0, h1) sobre los puntos (x_2k, x_2k+1, x_2k+2) usa la
+    parábola que pasa por los tres puntos:
+        (h0 + h1)/6 * [ (2 - h1/h0) f_2k + (h0 + h1)^2/(h0 h1) f_2k+1 + (2 - h0/h1) f_2k+2 ]
+    Si el número de subintervalos es impar, el último se integra con la corrección de la
+    parábola que pasa por los tres últimos puntos.
+
+    Parámetros:
+        x (numpy.ndarray): Valores de x estrictamente crecientes (al menos 3).
+
+    Retorna:
+        numpy.ndarray con los pesos (float64, misma longitud que x).
+    """
+    pasos = np.diff(x.astype(np.float64, copy=False))
+    n_pares = pasos.size // 2
+    h0 = pasos[0:2 * n_pares:2]
+    h1 = pasos[1:2 * n_pares:2]
+    suma = h0 + h1
+
+    pesos = np.zeros(x.size)
+    pesos[0:2 * n_pares:2] += suma / 6.0 * (2.0 - h1 / h0)
+    pesos[1:2 * n_pares:2] += suma / 6.0 * suma * suma / (h0 * h1)
+    pesos[2:2 * n_pares + 1:2] += suma / 6.0 * (2.0 - h0 / h1)
+
+    if pasos.size % 2: # Último subintervalo sobrante
+        h0, h1 = pasos[-2], pasos[-1]
+        pesos[-1] += (2.0 * h1 * h1 + 3.0 * h0 * h1) / (6.0 * (h0 + h1))
+        pesos[-2] += (h1 * h1 + 3.0 * h0 * h1) / (6.0 * h0)
+        pesos[-3] -= h1 ** 3 / (6.0 * h0 * (h0 + h1))
+    return pesos
+
+
+def simpson_no_uniforme(x_valores, fx_valores, detail=DETALLE_COMPLETO):
+    """
+    Aproxima la integral de una función tabulada f(x) con Simpson 1/3 compuesto sobre una
+    malla NO uniforme, trabajando directamente con las muestras originales (sin remuestrear).
+
+    Si los x resultan estar equiespaciados y el número de puntos es impar, se usa
+    simpson_un_tercio, que es el caso especial rápido.
+
+    Parámetros:
+        x_valores (list[float] | numpy.ndarray | buffer): Valores de x, estrictamente crecientes.
+        fx_valores (list[float] | numpy.ndarray | buffer): Valores de f(x) correspondientes a x_valores.
+        detail (str): Nivel del reporte: "none", "summary" o "full" (incluye la tabla de pesos).
+
+    Retorna:
+        ResultadoIntegracion (float, ReporteCalculo | None, x_valores, fx_valores), igual que
+        simpson_un_tercio (con la medición por fases activa, con el atributo 'medicion').
+
+    Excepciones:
+        ValueError si las entradas no son válidas (longitudes distintas, menos de 3 puntos,
+                   x no estrictamente crecientes, nivel de detalle inválido).
+    """
+    error_detalle = validar_detalle(detail)
+    if error_detalle:
+        raise ValueError(error_detalle)
+    x = _como_arreglo(x_valores, "x")
+    fx = _como_arreglo(fx_valores, "f(x)")
+    n_puntos = x.size
+
+    if n_puntos != fx.size:
+        raise ValueError("Los vectores x_valores y fx_valores deben tener la misma longitud.")
+    if n_puntos < 3:
+        raise ValueError("Se requieren al menos 3 puntos para el método de Simpson 1/3.")
+
+    medicion = iniciar_medicion("simpson_no_uniforme")
+    pasos = np.diff(x.astype(np.float64, copy=False))
+    if not np.all(pasos > 0):
+        i = int(np.argmin(pasos > 0))
+        raise ValueError(f"Los valores de x deben ser estrictamente crecientes "
+                         f"(x_{i}={x[i]} y x_{i+1}={x[i + 1]}).")
+
+    # Caso especial rápido: malla uniforme con número par de intervalos
+    if n_puntos % 2 == 1:
+        try:
+            _verificar_equiespaciado(x, float(pasos[0]))
+        except ValueError:
+            pass
+        else:
+            return simpson_un_tercio(x_valores, fx_valores, detail=detail)
+
+    with medicion.fase("pesos"):
+        pesos = pesos_simpson_no_uniforme(x)
+    with medicion.fase("suma_ponderada"):
+        integral_aprox = float(np.dot(pesos, fx))
+
+    extras = {"medicion": medicion} if medicion is not MEDICION_NULA else {}
+    if detail == DETALLE_NINGUNO:
+        return ResultadoIntegracion(integral_aprox, None, x_valores, fx_valores, **extras)
+
+    detalle_calculo = ReporteCalculo(detail, medicion)
+    detalle_calculo.agregar_texto(f"Método de Simpson 1/3 para malla no uniforme con {n_puntos} puntos "
+                                  f"({n_puntos - 1} intervalos).\n")
+    detalle_calculo.agregar_texto(f"Paso mínimo h = {pasos.min():.8f}, paso máximo h = {pasos.max():.8f}\n\n")
+    detalle_calculo.agregar_texto("Pesos calculados a partir del espaciado real:\n"
+                                  "Índice  | x_i          | f(x_i)       | w_i          | w_i*f(x_i)\n"
+                                  "-------------------------------------------------------------------\n",
+                                  nivel=DETALLE_COMPLETO)
+    detalle_calculo.agregar_filas(
+        n_puntos,
+        lambda i: (f"x_{i:<5} | {float(x[i]):<12.8f} | {float(fx[i]):<12.8f} | "
+                   f"{pesos[i]:<12.8f} | {pesos[i] * float(fx[i]):.8f}\n"))
+    detalle_calculo.agregar_texto("\n", nivel=DETALLE_COMPLETO)
+    detalle_calculo.agregar_texto(f"Integral ≈ Σ w_i * f(x_i) = {integral_aprox:.8f}\n")
+
+    return ResultadoIntegracion(integral_aprox, detalle_calculo, x_valores, fx_valores, **extras)
+
+
+def simpson_un_tercio_canales(x_valores, fx_matriz, tamano_bloque=TAMANO_BLOQUE_CANALES,
+                              detail=DETALLE_RESUMEN):
+    """
+    Aproxima con Simpson 1/3 la integral de muchas series tabuladas (canales) que comparten
+    la misma malla x, con un producto matriz-vector.
+
+    La malla x se valida una sola vez y el vector de pesos h/3 * (1, 4, 2, ..., 4, 1) se
+    construye una sola vez; luego la matriz (canales × muestras) se multiplica por bloques
+    de a lo sumo 'tamano_bloque' valores, de modo que la memoria temporal queda acotada
+    aunque la matriz sea un numpy.memmap mucho más grande que la RAM.
+
+    Parámetros:
+        x_valores (list[float] | numpy.ndarray | buffer): Malla común, equiespaciada y con un
+            número impar de puntos.
+        fx_matriz (array 2-D | numpy.memmap): Valores f(x) con forma (canales, muestras).
+        tamano_bloque (int): Número máximo de valores de fx_matriz procesados por bloque.
+        detail (str): "none" o "summary" ("full" agrega la lista de integrales por canal).
+
+    Retorna:
+        ResultadoIntegracion (numpy.ndarray, ReporteCalculo | None, x_valores, fx_matriz):
+            - Integral de cada canal (float64, longitud = número de canales).
+            - Reporte perezoso con los detalles del cálculo.
+            - Los mismos objetos x_valores y fx_matriz recibidos.
+        Con la medición por fases activa (ver phase_timing), incluye el atributo 'medicion'.
+
+    Excepciones:
+        ValueError si las entradas no son válidas (igual que simpson_un_tercio, más la
+                   forma de la matriz y el tamaño de bloque).
+    """
+    # 1. Validaciones (la malla se valida una sola vez para todos los canales)
+    error_detalle = validar_detalle(detail)
+    if error_detalle:
+        raise ValueError(error_detalle)
+    if not isinstance(tamano_bloque, int) or tamano_bloque < 1:
+        raise ValueError("El tamaño de bloque 'tamano_bloque' debe ser un entero >= 1.")
+    x = _como_arreglo(x_valores, "x")
+    fx = np.asarray(fx_matriz)
+    if fx.ndim != 2:
+        raise ValueError(f"La matriz f(x) debe ser bidimensional (canales × muestras), "
+                         f"tiene forma {fx.shape}.")
+    if fx.dtype.kind not in "biuf":
+        raise ValueError("La matriz f(x) debe contener solo números.")
+    n_canales, n_puntos = fx.shape
+
+    if n_puntos != x.size:
+        raise ValueError(f"Cada canal debe tener tantas muestras como puntos tiene x "
+                         f"({n_puntos} != {x.size}).")
+    if n_puntos < 3:
+        raise ValueError("Se requieren al menos 3 puntos para el método de Simpson 1/3.")
+    if (n_puntos - 1) % 2 != 0:
+        raise ValueError(f"El número de puntos ({n_puntos}) debe ser impar para Simpson 1/3 "
+                         f"(lo que implica un número par de {n_puntos - 1} intervalos).")
+
+    h = float(x[1]) - float(x[0])
+    if h <= 0:
+        raise ValueError("Los valores de x deben estar en orden ascendente y h debe ser positivo.")
+    medicion = iniciar_medicion("simpson_un_tercio_canales")
+    with medicion.fase("validacion"):
+        _verificar_equiespaciado(x, h)
+
+    # 2. Pesos una sola vez y producto matriz-vector por bloques de filas (y columnas si
+    #    un solo canal no cabe en el bloque)
+    pesos = obtener_pesos("simpson", n_puntos - 1) * (h / 3.0)
+    integrales = np.zeros(n_canales)
+    filas_por_bloque = max(1, tamano_bloque // n_puntos)
+    columnas_por_bloque = min(n_puntos, tamano_bloque)
+    with medicion.fase("suma_ponderada"):
+        for fila in range(0, n_canales, filas_por_bloque):
+            filas = slice(fila, fila + filas_por_bloque)
+            for columna in range(0, n_puntos, columnas_por_bloque):
+                columnas = slice(columna, columna + columnas_por_bloque)
+                bloque = fx[filas, columnas].astype(np.float64, copy=False)
+                integrales[filas] += bloque @ pesos[columnas]
+
+    extras = {"medicion": medicion} if medicion is not MEDICION_NULA else {}
+    if detail == DETALLE_NINGUNO:
+        return ResultadoIntegracion(integrales, None, x_valores, fx_matriz, **extras)
 
-    detalle_calculo += "Operación de la suma (según la fórmula de Simpson 1/3):\\n"
-    detalle_calculo += f"Integral ≈ ({h:.8f}/3) * [ "
-    detalle_calculo += " + ".join(terminos_para_la_suma_expandida)
-    detalle_calculo += " ]\\n"
-    detalle_calculo += f"           ≈ ({h:.8f}/3) * [ {suma_terminos_formula:.8f} ] = {integral_aprox:.8f}\\n"
+    detalle_calculo = ReporteCalculo(detail, medicion)
+    detalle_calculo.agregar_texto(f"Método de Simpson 1/3 para {n_canales} canales con {n_puntos} puntos "
+                                  f"({n_puntos - 1} intervalos) en la misma malla.\n")
+    detalle_calculo.agregar_texto(f"Paso h = {h:.8f}\n"
+                                  f"Integrales = F · w, con w = (h/3) * [1, 4, 2, ..., 2, 4, 1]\n\n")
+    detalle_calculo.agregar_texto("Integral por canal:\n", nivel=DETALLE_COMPLETO)
+    detalle_calculo.agregar_filas(n_canales, lambda i: f"Canal {i:<6} | {integrales[i]:.8f}\n")
 
-    return integral_aprox, detalle_calculo, x_valores, fx_valores
+    return ResultadoIntegracion(integrales, detalle_calculo, x_valores, fx_matriz, **extras)
 
 
 def solicitar_vector(nombre_vector):
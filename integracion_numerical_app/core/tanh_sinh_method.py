@@ -0,0 +1,167 @@
+import math
+
+import numpy as np
+
+from .calculation_report import DETALLE_COMPLETO, DETALLE_NINGUNO, ReporteCalculo, validar_detalle
+from .expression_compiler import compilar_expresion
+from .integration_result import ResultadoIntegracion
+from .vectorized_engine import ErrorEvaluacion, evaluar_puntos
+
+# Límite de u = (pi/2) * sinh(t): más allá, los pesos son despreciables en doble precisión.
+# En [a, b] el nodo queda a ~2*exp(-2u) de un extremo; con límites infinitos x crece como exp(u).
+_U_MAXIMO_FINITO = 300.0
+_U_MAXIMO_INFINITO = 100.0
+
+
+def _nodos_pesos(t, a, b):
+    """
+    Nodos x(t) y pesos x'(t) de la transformación doble exponencial que corresponde a los
+    límites: tanh-sinh en [a, b], exp-sinh en [a, inf) o (-inf, b] y sinh-sinh en (-inf, inf).
+
+    Los nodos se calculan a partir de la distancia al extremo más cercano, de modo que
+    nunca coinciden con a ni con b; los que el redondeo lleva a un extremo se descartan.
+    """
+    u = (math.pi / 2.0) * np.sinh(t)
+    du = (math.pi / 2.0) * np.cosh(t)
+    if math.isinf(a) and math.isinf(b): # sinh-sinh
+        x, w = np.sinh(u), du * np.cosh(u)
+    elif math.isinf(b): # exp-sinh en [a, inf)
+        x, w = a + np.exp(u), du * np.exp(u)
+    elif math.isinf(a): # exp-sinh en (-inf, b]
+        x, w = b - np.exp(u), du * np.exp(u)
+    else: # tanh-sinh en [a, b]: 1 - tanh|u| = 2 e^(-2|u|) / (1 + e^(-2|u|))
+        mitad = (b - a) / 2.0
+        e2 = np.exp(-2.0 * np.abs(u))
+        distancia = mitad * 2.0 * e2 / (1.0 + e2)
+        x = np.where(u > 0, b - distancia, a + distancia)
+        w = mitad * du * 4.0 * e2 / (1.0 + e2) ** 2
+    validos = (x > a) & (x < b) & (w > 0)
+    return x[validos], w[validos]
+
+
+def tanh_sinh_funcion(f_str, a, b, tol=1e-12, max_niveles=8, detail=DETALLE_COMPLETO):
+    """
+    Aproxima la integral de f(x) en [a, b] con la cuadratura doble exponencial (tanh-sinh).
+
+    El cambio de variable x = x(t) concentra los nodos cerca de los extremos con pesos que
+    decaen doblemente exponencialmente, por lo que integrandos con singularidades en los
+    extremos (ej. 1/sqrt(x) en [0, 1]) convergen casi a precisión de máquina con unos
+    cientos de evaluaciones. f nunca se evalúa exactamente en a ni en b. Los límites
+    pueden ser infinitos (float('inf') o -float('inf')) mediante las variantes exp-sinh y
+    sinh-sinh de la transformación.
+
+    En el nivel k la regla del trapecio en t usa paso h = 2^-k; cada nivel solo evalúa los
+    nodos nuevos (múltiplos impares de h) y reutiliza la suma del nivel anterior.
+
+    Parámetros:
+        f_str (str): La función como cadena, ej. "1/sqrt(x)" o "exp(-x**2)".
+        a (float): Límite inferior de integración (puede ser -inf).
+        b (float): Límite superior de integración (puede ser inf).
+        tol (float): Tolerancia entre las sumas de dos niveles sucesivos (> 0).
+        max_niveles (int): Número máximo de halvings del paso (entre 1 y 12).
+        detail (str): Nivel del reporte: "none", "summary" o "full".
+
+    Retorna:
+        ResultadoIntegracion (tupla (float, ReporteCalculo | None, list[float], list[float]))
+        con los atributos adicionales:
+            - error_estimado (float): |S(k) - S(k-1)| en el último nivel.
+            - evaluaciones (int): Número de evaluaciones de f(x).
+            - niveles (int): Último nivel k calculado.
+            - convergio (bool): False si se alcanzó max_niveles sin llegar a 'tol'.
+    """
+    # 1. Validaciones de entrada
+    if not isinstance(f_str, str) or not f_str:
+        return None, "Error: La función 'f_str' debe ser una cadena de texto no vacía.", None, None
+    try:
+        a, b = float(a), float(b)
+    except (TypeError, ValueError):
+        return None, "Error: Los límites 'a' y 'b' deben ser números (se admiten inf y -inf).", None, None
+    if math.isnan(a) or math.isnan(b) or b <= a:
+        return None, "Error: El límite superior 'b' debe ser mayor que el límite inferior 'a'.", None, None
+    if not tol > 0:
+        return None, "Error: La tolerancia 'tol' debe ser un número positivo.", None, None
+    if not isinstance(max_niveles, int) or not 1 <= max_niveles <= 12:
+        return None, "Error: El número máximo de niveles 'max_niveles' debe ser un entero entre 1 y 12.", None, None
+    error_detalle = validar_detalle(detail)
+    if error_detalle:
+        return None, error_detalle, None, None
+    try:
+        compilar_expresion(f_str)
+    except Exception as e:
+        return None, f"Error al parsear la función f_str='{f_str}': {e}", None, None
+
+    finito = math.isfinite(a) and math.isfinite(b)
+    u_maximo = _U_MAXIMO_FINITO if finito else _U_MAXIMO_INFINITO
+    t_maximo = math.asinh(u_maximo / (math.pi / 2.0))
+
+    def suma_nodos(t):
+        x, w = _nodos_pesos(t, a, b)
+        y = evaluar_puntos(f_str, x)
+        return float(np.dot(w, y)), x, y
+
+    # 2. Nivel 0 (h = 1) y niveles siguientes con solo los nodos nuevos
+    x_eval, y_eval = [], []
+    sumas = [] # S(k) = h * sum w_i f(x_i) en cada nivel
+    suma_acumulada = 0.0
+    evaluaciones = 0
+    error_estimado = math.inf
+    convergio = False
+    for k in range(max_niveles + 1):
+        h = 2.0 ** -k
+        if k == 0:
+            j_maximo = int(t_maximo)
+            t = np.arange(-j_maximo, j_maximo + 1, dtype=np.float64)
+        else:
+            j_maximo = int((t_maximo / h - 1.0) // 2.0)
+            impares = 2.0 * np.arange(0, j_maximo + 1) + 1.0
+            t = h * np.concatenate((-impares[::-1], impares))
+        try:
+            suma_nivel, x_nuevos, y_nuevos = suma_nodos(t)
+        except ErrorEvaluacion as e:
+            return None, str(e), None, None
+        evaluaciones += x_nuevos.size
+        x_eval.append(x_nuevos)
+        y_eval.append(y_nuevos)
+        suma_acumulada += suma_nivel
+        sumas.append(h * suma_acumulada)
+
+        if k >= 1:
+            error_estimado = abs(sumas[k] - sumas[k - 1])
+            # Se exigen al menos 3 niveles para no aceptar una coincidencia casual
+            if k >= 2 and error_estimado <= tol:
+                convergio = True
+                break
+
+    niveles = len(sumas) - 1
+    integral_aprox = sumas[-1]
+
+    x_todos = np.concatenate(x_eval)
+    orden = np.argsort(x_todos, kind="stable")
+    x_puntos = x_todos[orden].tolist()
+    y_puntos = np.concatenate(y_eval)[orden].tolist()
+
+    detalle_calculo = None
+    if detail != DETALLE_NINGUNO:
+        if finito:
+            transformacion = "tanh-sinh"
+        elif math.isinf(a) and math.isinf(b):
+            transformacion = "sinh-sinh"
+        else:
+            transformacion = "exp-sinh"
+        detalle_calculo = ReporteCalculo(detail)
+        detalle_calculo.agregar_texto(f"Cuadratura doble exponencial ({transformacion}).\n"
+                                      f"Función f(x) = {f_str}\nLímites [{a}, {b}], tolerancia = {tol:g}\n\n")
+        detalle_calculo.agregar_texto("Suma en cada nivel (paso h = 2^-k en t):\n"
+                                      "Nivel | h            | S(k)\n"
+                                      "-------------------------------------------\n",
+                                      nivel=DETALLE_COMPLETO)
+        detalle_calculo.agregar_filas(len(sumas), lambda k: f"k={k:<3} | {2.0 ** -k:<12.8f} | {sumas[k]:.15f}\n")
+        detalle_calculo.agregar_texto("\n", nivel=DETALLE_COMPLETO)
+        detalle_calculo.agregar_texto(f"Niveles: {niveles}, evaluaciones de f(x): {evaluaciones}\n"
+                                      f"Error estimado |S(k) - S(k-1)|: {error_estimado:.2e}"
+                                      f"{'' if convergio else ' (no se alcanzó la tolerancia)'}\n"
+                                      f"Integral ≈ {integral_aprox:.15f}\n\n")
+
+    return ResultadoIntegracion(integral_aprox, detalle_calculo, x_puntos, y_puntos,
+                                error_estimado=error_estimado, evaluaciones=evaluaciones,
+                                niveles=niveles, convergio=convergio)
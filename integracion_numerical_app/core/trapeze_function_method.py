@@ -1,19 +1,17 @@
 import math
 
-_COMMON_MATH_SCOPE = {
-    "sin": math.sin, "cos": math.cos, "tan": math.tan,
-    "asin": math.asin, "acos": math.acos, "atan": math.atan, "atan2": math.atan2,
-    "sinh": math.sinh, "cosh": math.cosh, "tanh": math.tanh,
-    "asinh": math.asinh, "acosh": math.acosh, "atanh": math.atanh,
-    "exp": math.exp, "log": math.log, "log10": math.log10, "log2": math.log2, "log1p": math.log1p,
-    "sqrt": math.sqrt, "pow": math.pow,
-    "fabs": math.fabs, "ceil": math.ceil, "floor": math.floor,
-    "degrees": math.degrees, "radians": math.radians,
-    "pi": math.pi, "e": math.e, "tau": math.tau,
-    "abs": abs
-}
-
-def trapecio_funcion(f_str, a, b, N):
+import numpy as np
+
+from .calculation_report import DETALLE_COMPLETO, DETALLE_NINGUNO, ReporteCalculo, validar_detalle
+from .expression_compiler import compilar_expresion
+from .integration_result import ResultadoIntegracion
+from .phase_timing import MEDICION_NULA, iniciar_medicion
+from .vectorized_engine import (N_MAXIMO_AUTO, ErrorEvaluacion, construir_malla, duplicar_hasta_tolerancia,
+                                coeficiente, evaluar_en_malla, evaluar_puntos, integral_acumulada,
+                                suma_ponderada)
+
+def trapecio_funcion(f_str, a, b, N, detail=DETALLE_COMPLETO, acumulado=False,
+                     auto_N=False, tol=1e-8, N_max=N_MAXIMO_AUTO):
     """
     Aproxima la integral de f(x) (dada como cadena) en [a, b] usando la regla del Trapecio.
 
@@ -21,14 +19,26 @@ def trapecio_funcion(f_str, a, b, N):
         f_str (str): La función como cadena, ej. "x**2 * exp(-x)".
         a (float): Límite inferior de integración.
         b (float): Límite superior de integración.
-        N (int): Número de subintervalos (debe ser >= 1).
+        N (int): Número de subintervalos (debe ser >= 1). Con auto_N=True es el N inicial.
+        detail (str): Nivel del reporte: "none" (sin reporte), "summary" (solo
+            encabezado y resultado) o "full" (tabla y suma completas).
+        acumulado (bool): Si es True, calcula también la integral acumulada desde a hasta
+            cada nodo x_0, ..., x_N (atributos 'x_acumulada' y 'acumulada').
+        auto_N (bool): Si es True, duplica N (reutilizando los puntos ya evaluados) hasta que
+            el error estimado por Richardson, |T(h/2) - T(h)| / 3, sea <= tol.
+        tol (float): Tolerancia absoluta del modo auto_N (> 0).
+        N_max (int): Valor máximo de N en el modo auto_N.
 
     Retorna:
-        Tupla (float, str, list[float], list[float]):
+        ResultadoIntegracion (tupla (float, ReporteCalculo | None, list[float], list[float])):
             - Aproximación numérica de la integral.
-            - Cadena con los detalles del cálculo.
+            - Reporte perezoso con los detalles del cálculo (str(reporte) lo genera).
             - Lista de coordenadas x de los puntos evaluados.
             - Lista de coordenadas y (f(x)) de los puntos evaluados.
+        Con acumulado=True incluye además los arreglos 'x_acumulada' y 'acumulada'.
+        Con auto_N=True incluye además 'N' (elegido), 'error_estimado', 'evaluaciones' y
+        'convergio' (False si se llegó a N_max sin alcanzar tol).
+        Con la medición por fases activa (ver phase_timing) incluye además 'medicion'.
     """
     # 1. Validaciones de entrada
     if not isinstance(f_str, str) or not f_str:
@@ -43,12 +53,22 @@ def trapecio_funcion(f_str, a, b, N):
     if N < 1:
         # raise ValueError("El número de subintervalos 'N' debe ser mayor o igual a 1.")
         return None, "Error: El número de subintervalos 'N' debe ser mayor o igual a 1.", None, None
+    if auto_N and not tol > 0:
+        return None, "Error: La tolerancia 'tol' debe ser un número positivo.", None, None
+    if auto_N and (not isinstance(N_max, int) or N_max < N):
+        return None, "Error: El valor máximo 'N_max' debe ser un entero mayor o igual que N.", None, None
+    error_detalle = validar_detalle(detail)
+    if error_detalle:
+        return None, error_detalle, None, None
 
     # Crear función evaluable
-    eval_globals = {**_COMMON_MATH_SCOPE, "math": math}
+    medicion = iniciar_medicion("trapecio_funcion")
     try:
-        func = lambda x_val: eval(f_str, eval_globals, {"x": x_val})
-        func(a) # Probar
+        with medicion.fase("compilacion"):
+            expresion = compilar_expresion(f_str) # Validada y compilada una sola vez (con caché)
+        func = lambda x_val: expresion.evaluar(x=x_val)
+        with medicion.fase("sonda"):
+            func(a) # Probar (su tiempo queda en "sonda"; no cuenta como evaluación)
     except NameError as ne:
         error_msg = (
             f"Error al parsear la función f_str='{f_str}'. Variable o función no reconocida: {ne}. "
@@ -61,85 +81,231 @@ def trapecio_funcion(f_str, a, b, N):
         # raise ValueError(error_msg)
         return None, error_msg, None, None
 
+    extras = {}
+    if medicion is not MEDICION_NULA:
+        extras["medicion"] = medicion
+    if auto_N:
+        # N automático: se duplica N reutilizando todos los puntos ya evaluados
+        try:
+            with medicion.fase("evaluacion"):
+                N, x_arr, y_arr, error_estimado, evaluaciones, convergio = duplicar_hasta_tolerancia(
+                    "trapecio", f_str, a, b, N, tol, N_max)
+        except ErrorEvaluacion as e:
+            return None, str(e), None, None
+        extras.update(N=N, error_estimado=error_estimado, evaluaciones=evaluaciones, convergio=convergio)
+        medicion.contar_evaluaciones(evaluaciones)
+    else:
+        # Camino rápido: una sola evaluación de f_str sobre toda la malla
+        with medicion.fase("evaluacion"):
+            x_arr = construir_malla("trapecio", a, b, N)
+            y_arr = evaluar_en_malla(f_str, x_arr)
+        if y_arr is not None:
+            medicion.contar_evaluaciones(N + 1)
+
     h = (b - a) / N
-    
-    puntos_evaluacion = [] # Lista para almacenar (índice_str, x_i, fx_i)
 
-    # f(x_0)
+    if y_arr is not None:
+        with medicion.fase("suma_ponderada"):
+            suma_total_corchetes = suma_ponderada("trapecio", y_arr)
+        with medicion.fase("conversion_listas"):
+            x_puntos = x_arr.tolist()
+            y_puntos = y_arr.tolist()
+    else:
+        # Camino escalar (respaldo): expresiones que solo funcionan con floats de Python
+        x_puntos = [a] + [a + i * h for i in range(1, N)] + [b] # x_N es b
+        y_puntos = []
+        with medicion.fase("evaluacion"):
+            for x_i in x_puntos:
+                try:
+                    y_puntos.append(func(x_i))
+                except Exception as e:
+                    # raise ValueError(f"Error al evaluar f(x)='{f_str}' en x = {x_i:.4f}: {e}")
+                    return None, f"Error al evaluar f(x)='{f_str}' en x = {x_i:.4f}: {e}", None, None
+        medicion.contar_evaluaciones(N + 1)
+        with medicion.fase("suma_ponderada"):
+            suma_total_corchetes = sum(coeficiente("trapecio", i, N) * fx_i for i, fx_i in enumerate(y_puntos))
+        x_arr, y_arr = x_puntos, y_puntos
+
+    integral_aprox = (h / 2.0) * suma_total_corchetes
+
+    if acumulado: # Integral desde a hasta cada nodo, en O(N)
+        with medicion.fase("acumulada"):
+            extras.update(x_acumulada=np.asarray(x_arr), acumulada=integral_acumulada("trapecio", y_arr, h))
+
+    if detail == DETALLE_NINGUNO:
+        return ResultadoIntegracion(integral_aprox, None, x_puntos, y_puntos, **extras)
+
+    with medicion.fase("reporte"):
+        detalle_calculo = _reporte_trapecio_funcion(detail, medicion, f_str, a, b, N, h, x_puntos, y_puntos,
+                                                    suma_total_corchetes, integral_aprox,
+                                                    extras if auto_N else None, tol)
+
+    return ResultadoIntegracion(integral_aprox, detalle_calculo, x_puntos, y_puntos, **extras)
+
+
+def _reporte_trapecio_funcion(detail, medicion, f_str, a, b, N, h, x_puntos, y_puntos,
+                              suma_total_corchetes, integral_aprox, extras_auto_N, tol):
+    """Registra el reporte perezoso de trapecio_funcion (extras_auto_N es None sin auto_N)."""
+    # --- Registrar el reporte del cálculo (se formatea solo cuando se solicita) ---
+    def indice(i):
+        if i == 0:
+            return "x_0 (a)"
+        if i == N:
+            return f"x_{N} (b)"
+        return f"x_{i}"
+
+    def es_extremo(i):
+        return i == 0 or i == N
+
+    detalle_calculo = ReporteCalculo(detail, medicion)
+    detalle_calculo.agregar_texto(f"Método del Trapecio con {N + 1} puntos ({N} intervalos).\n")
+    detalle_calculo.agregar_texto(f"Función f(x) = {f_str}\nLímites [{a}, {b}], N = {N}\n\n")
+    if extras_auto_N is not None:
+        detalle_calculo.agregar_texto(f"N elegido automáticamente (tolerancia = {tol:g}): N = {N}, "
+                                      f"error estimado (Richardson) = {extras_auto_N['error_estimado']:.2e}, "
+                                      f"evaluaciones = {extras_auto_N['evaluaciones']}"
+                                      f"{'' if extras_auto_N['convergio'] else ' (se alcanzó N_max sin llegar a la tolerancia)'}\n\n")
+
+    detalle_calculo.agregar_texto("Cálculo de h:\n"
+                                  f"h = ( {b} - {a} ) / {N} = {h:.8f}\n\n")
+
+    detalle_calculo.agregar_texto("Tabla de evaluación de la función en los puntos:\n"
+                                  "Índice  | x_i          | f(x_i)\n"
+                                  "-------------------------------\n",
+                                  nivel=DETALLE_COMPLETO)
+    detalle_calculo.agregar_filas(
+        N + 1, lambda i: f"{indice(i):<7} | {x_puntos[i]:<12.8f} | {y_puntos[i]:.8f}\n")
+    detalle_calculo.agregar_texto("\n", nivel=DETALLE_COMPLETO)
+
+    detalle_calculo.agregar_texto("Suma completa (según la fórmula del Trapecio):\n"
+                                  f"Integral ≈ ({h:.8f}/2) * [ ", nivel=DETALLE_COMPLETO)
+    detalle_calculo.agregar_filas(
+        N + 1, lambda i: f"{y_puntos[i]:.8f}" if es_extremo(i) else f"2*{y_puntos[i]:.8f}",
+        separador=" + ", marcador_omision="...")
+    detalle_calculo.agregar_texto(" ]\n", nivel=DETALLE_COMPLETO)
+
+    # Mostrar los valores que se suman dentro del corchete (ya multiplicados por 2 donde corresponde)
+    detalle_calculo.agregar_texto(f"           ≈ ({h:.8f}/2) * [ ", nivel=DETALLE_COMPLETO)
+    detalle_calculo.agregar_filas(
+        N + 1, lambda i: f"{y_puntos[i]:.8f}" if es_extremo(i) else f"{2 * y_puntos[i]:.8f}",
+        separador=" + ", marcador_omision="...")
+    detalle_calculo.agregar_texto(" ]\n", nivel=DETALLE_COMPLETO)
+
+    # En "full" esta línea continúa la suma expandida; en "summary" es el resultado completo
+    prefijo = "           ≈" if detail == DETALLE_COMPLETO else "Integral ≈"
+    detalle_calculo.agregar_texto(f"{prefijo} ({h:.8f}/2) * [ {suma_total_corchetes:.8f} ] = {integral_aprox:.8f}\n"
+                                  "\n")
+
+    return detalle_calculo
+
+
+def romberg_funcion(f_str, a, b, tol=1e-10, max_niveles=20, detail=DETALLE_COMPLETO):
+    """
+    Aproxima la integral de f(x) en [a, b] con el método de Romberg construido sobre la
+    regla del Trapecio.
+
+    En cada nivel k el paso se reduce a la mitad (N = 2^k) y solo se evalúan los nuevos
+    puntos medios: T(h/2) = T(h)/2 + (h/2) * suma f(puntos medios). La extrapolación de
+    Richardson sobre la tabla anidada produce estimaciones de orden h^(2k+2), y el proceso
+    se detiene cuando dos entradas diagonales sucesivas difieren en menos de 'tol'.
+
+    Parámetros:
+        f_str (str): La función como cadena, ej. "x**2 * exp(-x)".
+        a (float): Límite inferior de integración.
+        b (float): Límite superior de integración.
+        tol (float): Tolerancia entre diagonales sucesivas (> 0).
+        max_niveles (int): Número máximo de halvings del paso (entre 1 y 30).
+        detail (str): Nivel del reporte: "none", "summary" o "full".
+
+    Retorna:
+        ResultadoIntegracion (tupla (float, ReporteCalculo | None, list[float], list[float]))
+        con los atributos adicionales:
+            - error_estimado (float): |R(k, k) - R(k-1, k-1)| en el último nivel.
+            - evaluaciones (int): Número de evaluaciones de f(x) (2^k + 1).
+            - niveles (int): Último nivel k calculado.
+            - convergio (bool): False si se alcanzó max_niveles sin llegar a 'tol'.
+    """
+    # 1. Validaciones de entrada
+    if not isinstance(f_str, str) or not f_str:
+        return None, "Error: La función 'f_str' debe ser una cadena de texto no vacía.", None, None
+    if b <= a:
+        return None, "Error: El límite superior 'b' debe ser mayor que el límite inferior 'a'.", None, None
+    if not tol > 0:
+        return None, "Error: La tolerancia 'tol' debe ser un número positivo.", None, None
+    if not isinstance(max_niveles, int) or not 1 <= max_niveles <= 30:
+        return None, "Error: El número máximo de niveles 'max_niveles' debe ser un entero entre 1 y 30.", None, None
+    error_detalle = validar_detalle(detail)
+    if error_detalle:
+        return None, error_detalle, None, None
     try:
-        fx0 = func(a)
+        compilar_expresion(f_str)
     except Exception as e:
-        # raise ValueError(f"Error al evaluar f(x)='{f_str}' en x = {a:.4f}: {e}")
-        return None, f"Error al evaluar f(x)='{f_str}' en x = {a:.4f}: {e}", None, None
-    puntos_evaluacion.append(("x_0 (a)", a, fx0))
-
-    suma_terminos_intermedios_2fx = 0.0
-    
-    # Suma de 2*f(x_i) para i=1 hasta N-1
-    for i in range(1, N): # De x_1 a x_{N-1}
-        x_i = a + i * h
-        try:
-            fx_i = func(x_i)
-        except Exception as e:
-            # raise ValueError(f"Error al evaluar f(x)='{f_str}' en x = {x_i:.4f}: {e}")
-            return None, f"Error al evaluar f(x)='{f_str}' en x = {x_i:.4f}: {e}", None, None
-        puntos_evaluacion.append((f"x_{i}", x_i, fx_i))
-        suma_terminos_intermedios_2fx += 2 * fx_i
-    
-    # f(x_N)
+        return None, f"Error al parsear la función f_str='{f_str}': {e}", None, None
+
+    # 2. Nivel 0: Trapecio con un solo intervalo (N = 1)
     try:
-        fxN = func(b) # x_N es b
-    except Exception as e:
-        # raise ValueError(f"Error al evaluar f(x)='{f_str}' en x = {b:.4f}: {e}")
-        return None, f"Error al evaluar f(x)='{f_str}' en x = {b:.4f}: {e}", None, None
-    puntos_evaluacion.append((f"x_{N} (b)", b, fxN))
-
-    integral_aprox = (h / 2.0) * (fx0 + suma_terminos_intermedios_2fx + fxN)
-    suma_total_corchetes = fx0 + suma_terminos_intermedios_2fx + fxN
-
-    # --- Construir la cadena de detalles del cálculo ---
-    detalle_calculo = f"Método del Trapecio con {N + 1} puntos ({N} intervalos).\\n"
-    detalle_calculo += f"Función f(x) = {f_str}\\nLímites [{a}, {b}], N = {N}\\n\\n"
-    
-    detalle_calculo += "Cálculo de h:\\n"
-    detalle_calculo += f"h = ( {b} - {a} ) / {N} = {h:.8f}\\n\\n"
-        
-    detalle_calculo += "Tabla de evaluación de la función en los puntos:\\n"
-    detalle_calculo += "Índice  | x_i          | f(x_i)\\n"
-    detalle_calculo += "-------------------------------\\n"
-    for idx_str, x_val, fx_val in puntos_evaluacion:
-        detalle_calculo += f"{idx_str:<7} | {x_val:<12.8f} | {fx_val:.8f}\\n"
-    detalle_calculo += "\\n"
-
-    detalle_calculo += "Suma completa (según la fórmula del Trapecio):\\n"
-    detalle_calculo += f"Integral ≈ ({h:.8f}/2) * [ "
-    
-    sum_parts = []
-    sum_parts.append(f"{fx0:.8f}") # f(x0)
-    for i in range(1, N):
-        # fx_i_val es puntos_evaluacion[i][2]
-        sum_parts.append(f"2*{puntos_evaluacion[i][2]:.8f}") 
-    sum_parts.append(f"{fxN:.8f}") # f(xN)
-    
-    detalle_calculo += " + ".join(sum_parts)
-    detalle_calculo += " ]\\n"
-    
-    # Mostrar los valores que se suman dentro del corchete (ya multiplicados por 2 donde corresponde)
-    detalle_calculo += f"           ≈ ({h:.8f}/2) * [ {fx0:.8f}"
-    if N > 1: # Solo mostrar suma de intermedios si existen
-        # Reconstruimos la suma de los 2*f(xi) para mostrarla
-        suma_intermedios_display = " + ".join([f"{2*p[2]:.8f}" for p in puntos_evaluacion[1:-1]])
-        if suma_intermedios_display:
-             detalle_calculo += f" + {suma_intermedios_display}"
-    detalle_calculo += f" + {fxN:.8f} ]\\n"
+        x_eval = [np.array([a, b], dtype=np.float64)]
+        y_eval = [evaluar_puntos(f_str, x_eval[0])]
+    except ErrorEvaluacion as e:
+        return None, str(e), None, None
+    h = b - a
+    tabla = [[(h / 2.0) * suma_ponderada("trapecio", y_eval[0])]]
+    evaluaciones = 2
+    error_estimado = math.inf
+    convergio = False
+
+    # 3. Niveles 1..max_niveles: solo se evalúan los nuevos puntos medios
+    for k in range(1, max_niveles + 1):
+        h /= 2.0
+        x_medios = a + h * np.arange(1, 2 ** k, 2)
+        try:
+            y_medios = evaluar_puntos(f_str, x_medios)
+        except ErrorEvaluacion as e:
+            return None, str(e), None, None
+        evaluaciones += x_medios.size
+        x_eval.append(x_medios)
+        y_eval.append(y_medios)
+
+        fila = [tabla[k - 1][0] / 2.0 + h * float(np.sum(y_medios))]
+        for j in range(1, k + 1): # Extrapolación de Richardson
+            factor = 4.0 ** j
+            fila.append(fila[j - 1] + (fila[j - 1] - tabla[k - 1][j - 1]) / (factor - 1.0))
+        tabla.append(fila)
+
+        error_estimado = abs(fila[k] - tabla[k - 1][k - 1])
+        # Se exigen al menos 3 niveles para no aceptar una coincidencia casual (ej. funciones periódicas)
+        if k >= 3 and error_estimado <= tol:
+            convergio = True
+            break
+
+    niveles = len(tabla) - 1
+    integral_aprox = tabla[-1][-1]
+
+    x_todos = np.concatenate(x_eval)
+    orden = np.argsort(x_todos, kind="stable")
+    x_puntos = x_todos[orden].tolist()
+    y_puntos = np.concatenate(y_eval)[orden].tolist()
 
-    detalle_calculo += f"           ≈ ({h:.8f}/2) * [ {suma_total_corchetes:.8f} ] = {integral_aprox:.8f}\\n"
-    detalle_calculo += "\\n"
+    detalle_calculo = None
+    if detail != DETALLE_NINGUNO:
+        detalle_calculo = ReporteCalculo(detail)
+        detalle_calculo.agregar_texto("Método de Romberg (Trapecio + extrapolación de Richardson).\n"
+                                      f"Función f(x) = {f_str}\nLímites [{a}, {b}], tolerancia = {tol:g}\n\n")
+        detalle_calculo.agregar_texto("Tabla de Romberg R(k, j) (fila k: N = 2^k intervalos):\n",
+                                      nivel=DETALLE_COMPLETO)
+        detalle_calculo.agregar_filas(
+            len(tabla),
+            lambda k: f"k={k:<3} | " + " | ".join(f"{valor:.10f}" for valor in tabla[k]) + "\n")
+        detalle_calculo.agregar_texto("\n", nivel=DETALLE_COMPLETO)
+        detalle_calculo.agregar_texto(f"Niveles: {niveles}, evaluaciones de f(x): {evaluaciones}\n"
+                                      f"Error estimado |R(k,k) - R(k-1,k-1)|: {error_estimado:.2e}"
+                                      f"{'' if convergio else ' (no se alcanzó la tolerancia)'}\n"
+                                      f"Integral ≈ {integral_aprox:.10f}\n\n")
 
-    x_puntos = [p[1] for p in puntos_evaluacion]
-    y_puntos = [p[2] for p in puntos_evaluacion]
+    return ResultadoIntegracion(integral_aprox, detalle_calculo, x_puntos, y_puntos,
+                                error_estimado=error_estimado, evaluaciones=evaluaciones,
+                                niveles=niveles, convergio=convergio)
 
-    return integral_aprox, detalle_calculo, x_puntos, y_puntos
 
 if __name__ == '__main__':
     # Ejemplo de uso directo (para pruebas)
@@ -152,7 +318,7 @@ if __name__ == '__main__':
     try:
         resultado, detalles, x_coords, y_coords = trapecio_funcion(f_prueba, a_prueba, b_prueba, N_prueba)
         print("\n--- Detalles ---")
-        print(detalles.replace("\\n", "\n"))
+        print(detalles)
         print("--- Resultado ---")
         print(f"Integral aproximada: {resultado:.8f}")
         # print(f"Puntos x: {x_coords}") # Descomentar para depurar
@@ -177,7 +343,7 @@ if __name__ == '__main__':
     try:
         resultado_2, detalles_2, x_c2, y_c2 = trapecio_funcion(f_prueba_2, a_prueba_2, b_prueba_2, N_prueba_2)
         print("\n--- Detalles ---")
-        print(detalles_2.replace("\\n", "\n"))
+        print(detalles_2)
         print("--- Resultado ---")
         print(f"Integral aproximada: {resultado_2:.8f} (Valor esperado: 2.0)")
     except ValueError as ve:
@@ -0,0 +1,231 @@
+import numpy as np
+
+from .expression_compiler import compilar_expresion
+
+# Factor que multiplica a la suma ponderada en cada regla: Integral ≈ (h / divisor) * suma
+_DIVISOR_REGLA = {"simpson": 3.0, "trapecio": 2.0}
+
+
+def coeficiente(regla, i, N):
+    """Coeficiente del nodo i (0 <= i <= N) en la regla compuesta con N subintervalos."""
+    if i == 0 or i == N:
+        return 1.0
+    if regla == "simpson" and i % 2 == 1:
+        return 4.0
+    return 2.0
+
+
+def obtener_pesos(regla, N):
+    """
+    Devuelve el vector de coeficientes de la regla compuesta para N subintervalos.
+    Solo hace falta para productos matriciales (ej. muchos canales o la regla producto en
+    2D); para una suma sobre un vector use suma_ponderada(), que no reserva los pesos.
+
+    Parámetros:
+        regla (str): "simpson" (1, 4, 2, ..., 2, 4, 1) o "trapecio" (1, 2, ..., 2, 1).
+        N (int): Número de subintervalos.
+
+    Retorna:
+        numpy.ndarray: Vector nuevo de N + 1 coeficientes.
+    """
+    if regla not in _DIVISOR_REGLA:
+        raise ValueError(f"Regla desconocida: '{regla}'. Use 'simpson' o 'trapecio'.")
+    pesos = np.full(N + 1, 2.0)
+    if regla == "simpson":
+        pesos[1::2] = 4.0
+    pesos[0] = 1.0
+    pesos[-1] = 1.0
+    return pesos
+
+
+def suma_ponderada(regla, y, eje=-1):
+    """
+    Suma ponderada Σ c_i * y_i de la regla compuesta con rebanadas (sin vector de pesos):
+    Simpson: y_0 + 4*Σ impares + 2*Σ pares interiores + y_N; Trapecio: y_0 + 2*Σ interiores + y_N.
+
+    Parámetros:
+        regla (str): "simpson" o "trapecio".
+        y (array): Valores f(x_0), ..., f(x_N) a lo largo de 'eje'.
+        eje (int): Eje de los nodos si y tiene más de una dimensión.
+
+    Retorna:
+        float (o numpy.ndarray con el eje reducido si y tiene más de una dimensión).
+    """
+    if regla not in _DIVISOR_REGLA:
+        raise ValueError(f"Regla desconocida: '{regla}'. Use 'simpson' o 'trapecio'.")
+    y = np.moveaxis(np.asarray(y, dtype=np.float64), eje, -1)
+    extremos = y[..., 0] + y[..., -1]
+    if regla == "simpson":
+        suma = extremos + 4.0 * y[..., 1:-1:2].sum(axis=-1) + 2.0 * y[..., 2:-1:2].sum(axis=-1)
+    else:
+        suma = extremos + 2.0 * y[..., 1:-1].sum(axis=-1)
+    return float(suma) if suma.ndim == 0 else suma
+
+
+def construir_malla(regla, a, b, N):
+    """Construye los N + 1 puntos x_i = a + i*h tal como lo hace el camino escalar."""
+    h = (b - a) / N
+    x = a + np.arange(N + 1) * h
+    if regla == "trapecio":
+        x[-1] = b  # El trapecio evalúa el extremo derecho exactamente en b
+    return x
+
+
+def evaluar_en_malla(f_str, x):
+    """
+    Evalúa f_str una sola vez sobre el arreglo x.
+
+    Retorna:
+        numpy.ndarray con f(x) (float64, misma forma que x), o None si la expresión
+        no se puede vectorizar (funciones solo escalares, condicionales sobre x,
+        resultados complejos, dominio inválido, desbordamiento, etc.).
+    """
+    return evaluar_variables_en_malla(f_str, x.shape, x=x)
+
+
+def evaluar_variables_en_malla(f_str, forma, **variables):
+    """
+    Evalúa f_str una sola vez con varios arreglos de variables que se combinan por
+    broadcasting, ej. x de forma (n, 1) e y de forma (1, m) para una malla de n × m puntos.
+
+    Parámetros:
+        forma (tuple): Forma esperada del resultado.
+        **variables: Arreglos de NumPy de cada variable (x=..., y=..., ...).
+
+    Retorna:
+        numpy.ndarray (float64) con la forma indicada, o None si la expresión no se puede
+        vectorizar (mismos casos que evaluar_en_malla).
+    """
+    try:
+        expresion = compilar_expresion(f_str)
+        # under='ignore' porque math tampoco falla por subdesbordamiento.
+        with np.errstate(divide='raise', over='raise', invalid='raise', under='ignore'):
+            y = np.asarray(expresion.evaluar_numpy(**variables))
+            if y.dtype.kind not in "biuf":
+                return None
+            y = y.astype(np.float64, copy=False)
+            if y.shape != forma:
+                # Solo se expande un resultado con la forma de las variables que la expresión
+                # usa (ej. una constante, o f(x) en una malla x × y); cualquier otra forma
+                # indica que no se evaluó punto a punto.
+                usadas = [np.shape(valor) for nombre, valor in variables.items() if nombre in expresion.nombres]
+                if y.shape != np.broadcast_shapes(*usadas):
+                    return None
+                y = np.broadcast_to(y, forma).copy()
+    except Exception:
+        return None
+    if not np.all(np.isfinite(y)):
+        return None
+    return y
+
+
+def integral_acumulada(regla, y, h):
+    """
+    Calcula en O(N) la integral acumulada (corrida) de la regla compuesta a partir de los
+    valores f(x_i) de una malla uniforme de paso h, con sumas acumuladas vectorizadas.
+
+    Parámetros:
+        regla (str): "trapecio" (un valor por nodo) o "simpson" (un valor por nodo par,
+            ya que Simpson 1/3 integra de a pares de subintervalos).
+        y (array): Valores f(x_0), ..., f(x_N).
+        h (float): Paso de la malla.
+
+    Retorna:
+        numpy.ndarray (float64) con la integral desde x_0 hasta cada nodo (empieza en 0).
+        Para "simpson" tiene N/2 + 1 valores, correspondientes a x_0, x_2, ..., x_N.
+    """
+    if regla not in _DIVISOR_REGLA:
+        raise ValueError(f"Regla desconocida: '{regla}'. Use 'simpson' o 'trapecio'.")
+    y = np.asarray(y, dtype=np.float64)
+    if regla == "simpson":
+        if y.size % 2 == 0:
+            raise ValueError("Simpson 1/3 requiere un número impar de puntos (N par).")
+        terminos = y[:-1:2] + 4.0 * y[1::2] + y[2::2]
+    else:
+        terminos = y[:-1] + y[1:]
+    acumulada = np.empty(terminos.size + 1)
+    acumulada[0] = 0.0
+    np.cumsum(terminos, out=acumulada[1:])
+    acumulada *= h / _DIVISOR_REGLA[regla]
+    return acumulada
+
+
+# Orden del error de cada regla: E(h) ≈ C * h^p (para la extrapolación de Richardson)
+_ORDEN_REGLA = {"simpson": 4, "trapecio": 2}
+
+# Límite por defecto de N en el modo auto_N de simpson_funcion y trapecio_funcion
+N_MAXIMO_AUTO = 1 << 20
+
+
+def duplicar_hasta_tolerancia(regla, f_str, a, b, N, tol, N_max):
+    """
+    Duplica N a partir del valor inicial hasta que la estimación de error de Richardson
+    |I(h/2) - I(h)| / (2^p - 1) sea <= tol o se alcance N_max.
+
+    En cada duplicación solo se evalúan los N puntos medios nuevos; los puntos de la malla
+    anterior se reutilizan (quedan en las posiciones pares de la malla nueva).
+
+    Retorna:
+        Tupla (int, numpy.ndarray, numpy.ndarray, float, int, bool) con el N elegido, los
+        puntos x, los valores f(x), el error estimado, el total de evaluaciones de f(x) y
+        si se alcanzó la tolerancia.
+
+    Excepciones:
+        ErrorEvaluacion si f_str no se puede evaluar en alguno de los puntos.
+    """
+    divisor = _DIVISOR_REGLA[regla]
+    x = construir_malla(regla, a, b, N)
+    y = evaluar_puntos(f_str, x)
+    evaluaciones = x.size
+    anterior = ((b - a) / N / divisor) * suma_ponderada(regla, y)
+    error_estimado = float("inf")
+
+    while error_estimado > tol and 2 * N <= N_max:
+        h = (b - a) / N
+        x_medios = a + (np.arange(N) + 0.5) * h
+        y_medios = evaluar_puntos(f_str, x_medios)
+        evaluaciones += N
+
+        x_nueva = np.empty(2 * N + 1)
+        x_nueva[0::2], x_nueva[1::2] = x, x_medios
+        y_nueva = np.empty(2 * N + 1)
+        y_nueva[0::2], y_nueva[1::2] = y, y_medios
+        x, y, N = x_nueva, y_nueva, 2 * N
+
+        actual = ((b - a) / N / divisor) * suma_ponderada(regla, y)
+        error_estimado = abs(actual - anterior) / (2 ** _ORDEN_REGLA[regla] - 1)
+        anterior = actual
+
+    return N, x, y, error_estimado, evaluaciones, error_estimado <= tol
+
+class ErrorEvaluacion(ValueError):
+    """Error al evaluar f_str en un punto concreto (mismo mensaje que el camino escalar)."""
+
+    def __init__(self, f_str, x, causa):
+        super().__init__(f"Error al evaluar f(x)='{f_str}' en x = {x:.4f}: {causa}")
+        self.x = x
+
+
+def evaluar_puntos(f_str, x):
+    """
+    Evalúa f_str en un arreglo arbitrario de puntos: de forma vectorizada si es posible y,
+    si no, punto por punto con el ámbito escalar de 'math'.
+
+    Retorna:
+        numpy.ndarray (float64) con f(x).
+
+    Excepciones:
+        ErrorEvaluacion si f_str no se puede evaluar en alguno de los puntos.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = evaluar_en_malla(f_str, x)
+    if y is not None:
+        return y
+    expresion = compilar_expresion(f_str)
+    y = np.empty_like(x)
+    for i, x_i in enumerate(x.tolist()):
+        try:
+            y[i] = expresion.evaluar(x=x_i)
+        except Exception as e:
+            raise ErrorEvaluacion(f_str, x_i, e) from e
+    return y
@@ -0,0 +1,460 @@
+# server.py - Servicio HTTP/JSON local para ejecutar integrales
+#
+# Uso:
+#   python -m integracion_numerical_app.server --puerto 8765 --workers 4
+#
+# Peticiones:
+#   POST /integrar  {"trabajos": [{"id": "t1", "method": "simpson", "f_str": "x**2", "a": 0, "b": 1, "N": 10}],
+#                    "detail": "none", "timeout": 5}
+#                   (también se acepta un solo trabajo como objeto). Responde {"resultados": [...]} con
+#                   los mismos objetos que escribe la línea de comandos (ver cli.py).
+#   GET  /salud     Estado del servicio: trabajos en cola, bloques en ejecución y procesos.
+#
+# Respuestas de error: 400 (petición o JSON inválidos, o trabajo por encima de --max-N),
+# 404, 405, 413 (cuerpo muy grande o más de --max-trabajos trabajos), 431 (encabezados
+# demasiado grandes o numerosos), 503 (cola llena, reintentar más tarde) y 504 (se agotó
+# el tiempo de la petición).
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http import HTTPStatus
+
+try:
+    import resource
+except ImportError: # Windows: sin límite de CPU por proceso
+    resource = None
+
+from .cli import resultado_json, trabajo_desde_registro
+from .core.batch_integration import _ejecutar_bloque, _ejecutar_trabajo
+from .core.calculation_report import DETALLE_NINGUNO, validar_detalle
+
+HOSTS_LOCALES = ("127.0.0.1", "localhost", "::1")
+MAX_CUERPO = 8 * 1024 * 1024 # Tamaño máximo del cuerpo de una petición (bytes)
+MAX_LINEA = 8 * 1024 # Tamaño máximo de la línea de petición y de cada encabezado (bytes)
+MAX_ENCABEZADOS = 100 # Número máximo de encabezados por petición
+MAX_BYTES_ENCABEZADOS = 64 * 1024 # Tamaño máximo del conjunto de encabezados (bytes)
+MAX_N = 10 ** 7 # Puntos de evaluación máximos por trabajo (ver _puntos_solicitados)
+MAX_TRABAJOS = 1000 # Trabajos máximos por petición
+GRACIA_CPU = 1.0 # Segundos de CPU tras el vencimiento antes de terminar un proceso atascado
+
+_MENSAJE_TIEMPO_AGOTADO = "Error: Se agotó el tiempo de la petición antes de terminar el trabajo."
+
+
+class _TiempoAgotado(BaseException):
+    """Interrumpe el trabajo en curso de un proceso del pool (no es un Exception, así que
+    _ejecutar_trabajo no lo convierte en un resultado de error)."""
+
+
+def _al_agotar_tiempo(numero, marco):
+    raise _TiempoAgotado()
+
+
+def _programar_alarma(segundos):
+    """Programa (o con 0 cancela) la interrupción del trabajo en curso; sin SIGALRM (Windows) no hace nada."""
+    if hasattr(signal, "setitimer"):
+        signal.setitimer(signal.ITIMER_REAL, segundos)
+
+
+def _limitar_cpu(segundos):
+    """
+    Fija el límite blando de CPU del proceso en 'segundos' más de los ya usados (o con None
+    lo quita). SIGALRM solo se atiende entre instrucciones de Python (o cuando el código de C
+    revisa las señales), así que no interrumpe una llamada larga a C que no las revisa; al
+    superar este límite el sistema envía SIGXCPU, que termina el proceso aunque esté dentro
+    de esa llamada.
+    Sin el módulo resource (Windows) no hace nada.
+    """
+    if resource is None:
+        return
+    _, maximo = resource.getrlimit(resource.RLIMIT_CPU)
+    limite = maximo
+    if segundos is not None:
+        limite = math.ceil(time.process_time() + segundos)
+        if maximo != resource.RLIM_INFINITY:
+            limite = min(limite, maximo)
+    resource.setrlimit(resource.RLIMIT_CPU, (limite, maximo))
+
+
+def _inicializar_proceso():
+    """Importa NumPy y los métodos en cada proceso del pool antes de recibir trabajos."""
+    import numpy # noqa: F401
+    from .core import batch_integration # noqa: F401
+    if hasattr(signal, "SIGALRM"):
+        signal.signal(signal.SIGALRM, _al_agotar_tiempo)
+
+
+def _precalentar():
+    """Trabajo mínimo que compila una expresión y ejecuta una integral en un proceso del pool."""
+    return _ejecutar_bloque([(0, ("simpson", "x", 0.0, 1.0, 6))], DETALLE_NINGUNO, False)
+
+
+def _ejecutar_bloque_con_limite(bloque, detail):
+    """
+    Ejecuta en un proceso del pool un bloque [(indice, trabajo, fecha_limite), ...], donde
+    fecha_limite es el time.time() en que vence la petición del trabajo. Los trabajos ya
+    vencidos no se ejecutan y el que está en curso se interrumpe al vencer (SIGALRM), así un
+    trabajo de una petición que ya respondió 504 no sigue ocupando el proceso. Si el trabajo
+    está dentro de una operación de C que no atiende la señal, el límite de CPU termina el
+    proceso GRACIA_CPU segundos de CPU después (ver _limitar_cpu).
+    """
+    resultados = []
+    for indice, trabajo, fecha_limite in bloque:
+        restante = fecha_limite - time.time()
+        if restante <= 0:
+            resultados.append((indice, None, _MENSAJE_TIEMPO_AGOTADO, {}))
+            continue
+        try:
+            _programar_alarma(restante)
+            _limitar_cpu(restante + GRACIA_CPU)
+            try:
+                integral, detalle, info = _ejecutar_trabajo(trabajo, detail)
+            finally:
+                _programar_alarma(0)
+                _limitar_cpu(None)
+        except _TiempoAgotado:
+            integral, detalle, info = None, _MENSAJE_TIEMPO_AGOTADO, {}
+        resultados.append((indice, integral, detalle, info))
+    return resultados
+
+
+def _entero(valor):
+    return valor if isinstance(valor, int) and not isinstance(valor, bool) else 0
+
+
+def _puntos_solicitados(trabajo):
+    """
+    Cota del número de evaluaciones que puede pedir un trabajo (method, f_str, a, b, N,
+    opciones) según N y las opciones que fijan el tamaño de cada método. Los valores que no
+    son enteros los rechaza el propio método; las opciones omitidas usan valores por
+    defecto acotados.
+    """
+    _, _, _, _, N, opciones = trabajo
+    return max(_entero(N), _entero(N) * _entero(opciones.get("orden")),
+               _entero(opciones.get("N_max")), _entero(opciones.get("n_max")),
+               _entero(opciones.get("max_evaluaciones")), 15 * _entero(opciones.get("max_intervalos")),
+               (_entero(opciones.get("Nx")) + 1) * (_entero(opciones.get("Ny")) + 1),
+               2 ** min(_entero(opciones.get("max_niveles")), 64))
+
+
+class ServidorIntegracion:
+    """
+    Servidor HTTP asíncrono (asyncio) que ejecuta trabajos de integración en un pool de
+    procesos ya iniciado.
+
+    Los trabajos de todas las peticiones entran en una cola acotada; un despachador los
+    agrupa en lotes (hasta 'tamano_lote' trabajos o 'espera_lote' segundos) y los envía al
+    pool, con a lo sumo 2 lotes por proceso en ejecución. Si la cola está llena la
+    petición se rechaza con 503 (contrapresión). Las peticiones con más de 'max_trabajos'
+    trabajos o con algún trabajo de más de 'max_N' puntos se rechazan antes de encolarse.
+    Cada petición tiene su propio tiempo límite, como mucho 'timeout' (504); al vencer, sus
+    trabajos se descartan o se interrumpen en el pool. Un proceso atascado en una operación
+    de C que no se puede interrumpir se termina por su límite de CPU y el pool se reemplaza;
+    los otros lotes que estaban en ese pool responden con error. Solo escucha en la máquina local.
+    """
+
+    def __init__(self, host="127.0.0.1", puerto=8765, max_workers=None, tamano_lote=32,
+                 espera_lote=0.005, max_cola=1024, timeout=30.0, max_N=MAX_N, max_trabajos=MAX_TRABAJOS):
+        if host not in HOSTS_LOCALES:
+            raise ValueError(f"El servidor solo puede escuchar en la máquina local ({', '.join(HOSTS_LOCALES)}).")
+        if tamano_lote < 1 or max_cola < 1 or max_N < 1 or max_trabajos < 1:
+            raise ValueError("'tamano_lote', 'max_cola', 'max_N' y 'max_trabajos' deben ser mayores o iguales a 1.")
+        self.host = host
+        self.puerto = puerto
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.tamano_lote = tamano_lote
+        self.espera_lote = espera_lote
+        self.max_cola = max_cola
+        self.timeout = timeout
+        self.max_N = max_N
+        self.max_trabajos = max_trabajos
+        self._pool = None
+        self._servidor = None
+        self._cola = None
+        self._en_vuelo = None
+        self._lotes_en_ejecucion = 0
+        self._despachador = None
+        self._tareas = set()
+
+    async def iniciar(self):
+        """
+        Crea y precalienta el pool de procesos, y empieza a escuchar.
+
+        Retorna:
+            int: Puerto en el que escucha (útil con puerto=0, que elige uno libre).
+        """
+        loop = asyncio.get_running_loop()
+        self._pool = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_inicializar_proceso)
+        await asyncio.gather(*(loop.run_in_executor(self._pool, _precalentar) for _ in range(self.max_workers)))
+        self._cola = asyncio.Queue(maxsize=self.max_cola)
+        self._en_vuelo = asyncio.Semaphore(2 * self.max_workers)
+        self._despachador = asyncio.create_task(self._despachar())
+        self._servidor = await asyncio.start_server(self._atender_conexion, self.host, self.puerto,
+                                                    limit=MAX_LINEA)
+        self.puerto = self._servidor.sockets[0].getsockname()[1]
+        return self.puerto
+
+    async def detener(self):
+        """Deja de aceptar conexiones, cancela el despachador y cierra el pool."""
+        if self._servidor is not None:
+            self._servidor.close()
+            await self._servidor.wait_closed()
+        if self._despachador is not None:
+            self._despachador.cancel()
+            await asyncio.gather(self._despachador, *self._tareas, return_exceptions=True)
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+
+    async def servir_para_siempre(self):
+        await self.iniciar()
+        try:
+            await self._servidor.serve_forever()
+        finally:
+            await self.detener()
+
+    # --- Despacho de lotes al pool ---
+
+    async def _despachar(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            lote = [await self._cola.get()]
+            limite = loop.time() + self.espera_lote
+            while len(lote) < self.tamano_lote:
+                restante = limite - loop.time()
+                if restante <= 0:
+                    break
+                try:
+                    lote.append(await asyncio.wait_for(self._cola.get(), restante))
+                except asyncio.TimeoutError:
+                    break
+            # Los trabajos cuya petición ya expiró no se envían
+            lote = [item for item in lote if not item[2].done()]
+            if not lote:
+                continue
+            por_detalle = {}
+            for item in lote:
+                por_detalle.setdefault(item[1], []).append(item)
+            for detail, items in por_detalle.items():
+                await self._en_vuelo.acquire() # Como mucho 2 lotes por proceso en ejecución
+                self._lotes_en_ejecucion += 1
+                tarea = asyncio.create_task(self._ejecutar_lote(items, detail))
+                self._tareas.add(tarea)
+                tarea.add_done_callback(self._tareas.discard)
+
+    def _reemplazar_pool(self, pool):
+        """Reemplaza un pool roto (un proceso terminó, ej. por su límite de CPU) por uno nuevo."""
+        if self._pool is pool: # Varios lotes pueden fallar con el mismo pool
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_inicializar_proceso)
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    async def _ejecutar_lote(self, items, detail):
+        loop = asyncio.get_running_loop()
+        bloque = [(i, trabajo, fecha_limite) for i, (trabajo, _, _, fecha_limite) in enumerate(items)]
+        pool = self._pool
+        try:
+            resultados = await loop.run_in_executor(pool, _ejecutar_bloque_con_limite, bloque, detail)
+        except Exception as e: # Falla del proceso (ej. BrokenProcessPool)
+            if isinstance(e, BrokenProcessPool):
+                self._reemplazar_pool(pool)
+            mensaje = f"Error al ejecutar el bloque de trabajos: {type(e).__name__}: {e}"
+            resultados = [(i, None, mensaje, {}) for i, _, _ in bloque]
+        finally:
+            self._lotes_en_ejecucion -= 1
+            self._en_vuelo.release()
+        for indice, integral, detalle, info in resultados:
+            futuro = items[indice][2]
+            if not futuro.done():
+                futuro.set_result((integral, detalle, info))
+
+    # --- HTTP ---
+
+    async def _atender_conexion(self, lector, escritor):
+        try:
+            while True:
+                peticion = await self._leer_peticion(lector)
+                if peticion is None:
+                    break
+                metodo, ruta, cuerpo, mantener = peticion
+                estado, respuesta = await self._responder(metodo, ruta, cuerpo)
+                await self._escribir_respuesta(escritor, estado, respuesta, mantener)
+                if not mantener:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except _ErrorHttp as e:
+            await self._escribir_respuesta(escritor, e.estado, {"error": str(e)}, False)
+        finally:
+            escritor.close()
+
+    @staticmethod
+    async def _leer_linea(lector, estado, mensaje):
+        """Lee una línea; si supera el límite del lector (MAX_LINEA) responde 'estado'."""
+        try:
+            return await lector.readline()
+        except (ValueError, asyncio.LimitOverrunError): # readline envuelve LimitOverrunError en ValueError
+            raise _ErrorHttp(estado, mensaje)
+
+    async def _leer_peticion(self, lector):
+        linea = await self._leer_linea(lector, HTTPStatus.BAD_REQUEST,
+                                       f"La línea de petición supera {MAX_LINEA} bytes.")
+        if not linea:
+            return None
+        try:
+            metodo, ruta, version = linea.decode("latin-1").split()
+        except ValueError:
+            raise _ErrorHttp(HTTPStatus.BAD_REQUEST, "Línea de petición inválida.")
+        encabezados = {}
+        numero, bytes_encabezados = 0, 0
+        while True:
+            linea = await self._leer_linea(lector, HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE,
+                                           f"Un encabezado supera {MAX_LINEA} bytes.")
+            if linea in (b"\r\n", b"\n", b""):
+                break
+            numero += 1
+            bytes_encabezados += len(linea)
+            if numero > MAX_ENCABEZADOS or bytes_encabezados > MAX_BYTES_ENCABEZADOS:
+                raise _ErrorHttp(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE,
+                                 f"Los encabezados superan el máximo de {MAX_ENCABEZADOS} encabezados "
+                                 f"o {MAX_BYTES_ENCABEZADOS} bytes.")
+            nombre, _, valor = linea.decode("latin-1").partition(":")
+            encabezados[nombre.strip().lower()] = valor.strip()
+        try:
+            longitud = int(encabezados.get("content-length", "0") or 0)
+        except ValueError:
+            raise _ErrorHttp(HTTPStatus.BAD_REQUEST, "Content-Length debe ser un entero.")
+        if longitud < 0:
+            raise _ErrorHttp(HTTPStatus.BAD_REQUEST, "Content-Length no puede ser negativo.")
+        if longitud > MAX_CUERPO:
+            raise _ErrorHttp(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"El cuerpo supera {MAX_CUERPO} bytes.")
+        cuerpo = await lector.readexactly(longitud) if longitud else b""
+        conexion = encabezados.get("connection", "").lower()
+        mantener = conexion == "keep-alive" or (version == "HTTP/1.1" and conexion != "close")
+        return metodo, ruta.split("?", 1)[0], cuerpo, mantener
+
+    async def _escribir_respuesta(self, escritor, estado, respuesta, mantener):
+        estado = HTTPStatus(estado)
+        datos = json.dumps(respuesta, ensure_ascii=False).encode("utf-8")
+        encabezados = [f"HTTP/1.1 {estado.value} {estado.phrase}",
+                       "Content-Type: application/json; charset=utf-8",
+                       f"Content-Length: {len(datos)}",
+                       f"Connection: {'keep-alive' if mantener else 'close'}"]
+        if estado == HTTPStatus.SERVICE_UNAVAILABLE:
+            encabezados.append("Retry-After: 1")
+        escritor.write(("\r\n".join(encabezados) + "\r\n\r\n").encode("latin-1") + datos)
+        await escritor.drain()
+
+    async def _responder(self, metodo, ruta, cuerpo):
+        if ruta == "/salud":
+            if metodo != "GET":
+                return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "Use GET en /salud."}
+            return HTTPStatus.OK, {"estado": "ok", "en_cola": self._cola.qsize(),
+                                   "lotes_en_ejecucion": self._lotes_en_ejecucion,
+                                   "procesos": self.max_workers}
+        if ruta != "/integrar":
+            return HTTPStatus.NOT_FOUND, {"error": f"Ruta desconocida: {ruta}. Use /integrar o /salud."}
+        if metodo != "POST":
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "Use POST en /integrar."}
+        try:
+            peticion = json.loads(cuerpo or b"null")
+        except ValueError as e:
+            return HTTPStatus.BAD_REQUEST, {"error": f"JSON inválido: {e}"}
+        return await self._integrar(peticion)
+
+    async def _integrar(self, peticion):
+        if isinstance(peticion, dict) and "trabajos" in peticion:
+            registros = peticion["trabajos"]
+            detail = peticion.get("detail", DETALLE_NINGUNO)
+            timeout = peticion.get("timeout", self.timeout)
+        else:
+            registros, detail, timeout = [peticion], DETALLE_NINGUNO, self.timeout
+        if not isinstance(registros, list):
+            return HTTPStatus.BAD_REQUEST, {"error": "'trabajos' debe ser una lista."}
+        error_detalle = validar_detalle(detail)
+        if error_detalle:
+            return HTTPStatus.BAD_REQUEST, {"error": error_detalle}
+        if not isinstance(timeout, (int, float)) or timeout <= 0:
+            return HTTPStatus.BAD_REQUEST, {"error": "'timeout' debe ser un número positivo (segundos)."}
+        if len(registros) > self.max_trabajos:
+            return HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": f"La petición tiene {len(registros)} trabajos; "
+                                                                  f"el máximo es {self.max_trabajos}."}
+        timeout = min(timeout, self.timeout)
+
+        # Primero se validan todos los trabajos: una petición por encima de los límites no encola nada
+        trabajos = []
+        for numero, registro in enumerate(registros):
+            try:
+                trabajo = trabajo_desde_registro(registro)
+            except ValueError as e:
+                trabajos.append(f"Error: Trabajo inválido en la posición {numero}: {e}")
+                continue
+            if _puntos_solicitados(trabajo) > self.max_N:
+                return HTTPStatus.BAD_REQUEST, {"error": f"El trabajo en la posición {numero} pide más de "
+                                                         f"{self.max_N} puntos de evaluación."}
+            trabajos.append(trabajo)
+
+        loop = asyncio.get_running_loop()
+        fecha_limite = time.time() + timeout
+        identificadores, futuros = [], []
+        for numero, (registro, trabajo) in enumerate(zip(registros, trabajos)):
+            futuro = loop.create_future()
+            identificador = registro.get("id", numero) if isinstance(registro, dict) else numero
+            if isinstance(trabajo, str):
+                futuro.set_result((None, trabajo, {}))
+            else:
+                try:
+                    self._cola.put_nowait((trabajo, detail, futuro, fecha_limite))
+                except asyncio.QueueFull: # Contrapresión: no se acepta nada de esta petición
+                    for pendiente in futuros:
+                        pendiente.cancel()
+                    return HTTPStatus.SERVICE_UNAVAILABLE, {"error": "La cola de trabajos está llena; "
+                                                                     "reintente más tarde."}
+            identificadores.append(identificador)
+            futuros.append(futuro)
+
+        try:
+            resultados = await asyncio.wait_for(asyncio.gather(*futuros), timeout)
+        except asyncio.TimeoutError: # gather cancela los futuros pendientes
+            return HTTPStatus.GATEWAY_TIMEOUT, {"error": f"Se agotó el tiempo de la petición ({timeout} s)."}
+        return HTTPStatus.OK, {"resultados": [resultado_json(identificador, *resultado)
+                                               for identificador, resultado in zip(identificadores, resultados)]}
+
+
+class _ErrorHttp(Exception):
+    def __init__(self, estado, mensaje):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+def main(argv=None):
+    """Punto de entrada de la línea de comandos."""
+    parser = argparse.ArgumentParser(prog="python -m integracion_numerical_app.server",
+                                     description="Servicio HTTP/JSON local de integración numérica.")
+    parser.add_argument("--host", default="127.0.0.1", choices=HOSTS_LOCALES)
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=None, help="Procesos del pool (por defecto, el número de CPUs).")
+    parser.add_argument("--tamano-lote", type=int, default=32, help="Trabajos máximos por lote enviado al pool.")
+    parser.add_argument("--espera-lote", type=float, default=0.005, help="Segundos máximos para completar un lote.")
+    parser.add_argument("--max-cola", type=int, default=1024, help="Trabajos máximos en cola antes de responder 503.")
+    parser.add_argument("--timeout", type=float, default=30.0,
+                        help="Tiempo límite por defecto y máximo de cada petición (s).")
+    parser.add_argument("--max-N", type=int, default=MAX_N, help="Puntos de evaluación máximos por trabajo.")
+    parser.add_argument("--max-trabajos", type=int, default=MAX_TRABAJOS, help="Trabajos máximos por petición.")
+    args = parser.parse_args(argv)
+
+    servidor = ServidorIntegracion(args.host, args.puerto, args.workers, args.tamano_lote,
+                                   args.espera_lote, args.max_cola, args.timeout, args.max_N, args.max_trabajos)
+    print(f"Servidor de integración en http://{args.host}:{args.puerto} (Ctrl+C para terminar)")
+    try:
+        asyncio.run(servidor.servir_para_siempre())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
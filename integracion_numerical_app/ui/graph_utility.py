@@ -3,57 +3,7 @@ import numpy as np
 import inspect
 import math
 
-# START NEW CODE
-class MathNamespace:
-    pass
-
-# Popular el namespace con funciones de numpy que imitan las funciones del módulo math
-# Esto hace que funcionen automáticamente con arrays de numpy.
-_safe_math_namespace = MathNamespace()
-_safe_math_namespace.acos = np.arccos
-_safe_math_namespace.acosh = np.arccosh
-_safe_math_namespace.asin = np.arcsin
-_safe_math_namespace.asinh = np.arcsinh
-_safe_math_namespace.atan = np.arctan
-_safe_math_namespace.atan2 = np.arctan2
-_safe_math_namespace.atanh = np.arctanh
-_safe_math_namespace.ceil = np.ceil
-_safe_math_namespace.copysign = np.copysign
-_safe_math_namespace.cos = np.cos
-_safe_math_namespace.cosh = np.cosh
-_safe_math_namespace.degrees = np.degrees
-_safe_math_namespace.exp = np.exp
-_safe_math_namespace.fabs = np.fabs # Nota: np.abs es más general, pero fabs es específico de float.
-_safe_math_namespace.floor = np.floor
-_safe_math_namespace.fmod = np.fmod
-# _safe_math_namespace.frexp = np.frexp # np.frexp devuelve dos arrays, manejar si es necesario
-_safe_math_namespace.hypot = np.hypot
-_safe_math_namespace.isclose = np.isclose
-_safe_math_namespace.isfinite = np.isfinite
-_safe_math_namespace.isinf = np.isinf
-_safe_math_namespace.isnan = np.isnan
-# _safe_math_namespace.ldexp = np.ldexp # np.ldexp es ufunc
-_safe_math_namespace.log = np.log
-_safe_math_namespace.log10 = np.log10
-_safe_math_namespace.log1p = np.log1p
-_safe_math_namespace.log2 = np.log2
-# _safe_math_namespace.modf = np.modf # np.modf devuelve dos arrays, manejar si es necesario
-_safe_math_namespace.pow = np.power
-_safe_math_namespace.radians = np.radians
-_safe_math_namespace.sin = np.sin
-_safe_math_namespace.sinh = np.sinh
-_safe_math_namespace.sqrt = np.sqrt
-_safe_math_namespace.tan = np.tan
-_safe_math_namespace.tanh = np.tanh
-_safe_math_namespace.trunc = np.trunc # np.trunc es equivalente a int() para positivos, np.fix más general
-
-# Constantes
-_safe_math_namespace.pi = np.pi
-_safe_math_namespace.e = np.e
-_safe_math_namespace.tau = getattr(np, 'tau', 2 * np.pi) # tau no está en todas las versiones de numpy
-_safe_math_namespace.inf = np.inf
-_safe_math_namespace.nan = np.nan
-# END NEW CODE
+from ..core.expression_compiler import compilar_expresion
 
 def plot_function_and_integral(func_str, a, b, N, result, x_points_method=None, y_points_method=None, method_name=""):
     """
@@ -69,57 +19,21 @@ def plot_function_and_integral(func_str, a, b, N, result, x_points_method=None,
         y_points_method (list, optional): Coordenadas y de los puntos usados por el método.
         method_name (str, optional): Nombre del método numérico para el título.
     """
-    # Namespace para evaluar la función de forma segura
-    # Permitimos funciones de numpy, math (a través de _safe_math_namespace) y la constante 'e'
-    safe_dict = {
-        "np": np,
-        "math": _safe_math_namespace,
-        "sin": np.sin, "cos": np.cos, "tan": np.tan,
-        "asin": np.arcsin, "acos": np.arccos, "atan": np.arctan,
-        "sinh": np.sinh, "cosh": np.cosh, "tanh": np.tanh,
-        "asinh": np.arcsinh, "acosh": np.arccosh, "atanh": np.arctanh,
-        "exp": np.exp, "log": np.log, "log10": np.log10, "sqrt": np.sqrt,
-        "pi": np.pi, "e": np.e,
-        "abs": np.abs, "fabs": np.fabs, "floor": np.floor, "ceil": np.ceil,
-        "degrees": np.degrees, "radians": np.radians,
-        # Funciones especiales podrían necesitar scipy, por ahora mantenemos numpy
-    }
-
-    # Intenta crear la función evaluable
+    # Intenta crear la función evaluable. La expresión se valida y compila una sola vez
+    # (caché compartida con el núcleo de integración) y se evalúa con funciones de numpy.
     try:
-        # Asegurarse de que la expresión usa 'x' como variable
-        if 'x' not in func_str:
-            # Si 'x' no está, no podemos graficarla como f(x)
-            # Podríamos intentar inferir, pero es mejor ser explícito
-            # Por ahora, si es una constante, la graficaremos como una línea horizontal
-            # Esto es un caso borde, normalmente la función dependerá de x
-            if not any(var in func_str for var in safe_dict.keys()): # Si no es una función conocida
-                try:
-                    const_val = float(eval(func_str, {"__builtins__": {}}, safe_dict))
-                    func = lambda x: const_val * np.ones_like(x) # Crear una función que devuelve la constante
-                    func_str_display = f"f(x) = {const_val}"
-                except:
-                    plt.text(0.5, 0.5, f"Error: No se pudo interpretar la función '{func_str}' para graficar.\nAsegúrate de que usa 'x' como variable (ej. 'x**2') o es una constante válida.",
-                             ha='center', va='center', fontsize=10, color='red')
-                    plt.title(f"Error de Graficación ({method_name})")
-                    plt.show()
-                    return
-            else: # Es una función conocida pero no usa 'x' (ej. sin(pi/2)). Evaluarla.
-                 try:
-                    const_val = float(eval(func_str, {"__builtins__": {}}, safe_dict))
-                    func = lambda x: const_val * np.ones_like(x)
-                    func_str_display = f"f(x) = {func_str} ≈ {const_val:.4f}"
-                 except Exception as e:
-                    plt.text(0.5, 0.5, f"Error al evaluar función constante '{func_str}': {e}",
-                             ha='center', va='center', fontsize=10, color='red')
-                    plt.title(f"Error de Graficación ({method_name})")
-                    plt.show()
-                    return
-
+        # Reemplazar ^ con ** para la exponenciación si es necesario para eval
+        expresion = compilar_expresion(func_str.replace('^', '**'))
+        if 'x' not in expresion.nombres:
+            # Si 'x' no está, la graficaremos como una línea horizontal (ej. '5' o 'sin(pi/2)')
+            const_val = float(expresion.evaluar_numpy())
+            func = lambda x: const_val * np.ones_like(x) # Crear una función que devuelve la constante
+            if expresion.nombres:
+                func_str_display = f"f(x) = {func_str} ≈ {const_val:.4f}"
+            else:
+                func_str_display = f"f(x) = {const_val}"
         else:
-            # Reemplazar ^ con ** para la exponenciación si es necesario para eval
-            processed_func_str = func_str.replace('^', '**')
-            func = lambda x: eval(processed_func_str, {"__builtins__": {}}, {**safe_dict, "x": x})
+            func = lambda x: expresion.evaluar_numpy(x=x)
             func_str_display = f"f(x) = {func_str}"
 
     except Exception as e:
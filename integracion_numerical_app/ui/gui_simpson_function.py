@@ -1,9 +1,12 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
 # import integracion_simpson_funcion # Importamos el módulo que contiene la lógica de Simpson
-from integracion_numerical_app.core import simpson_function_method as integracion_simpson_funcion
+from integracion_numerical_app.core.result_cache import CacheResultados
 from .graph_utility import plot_function_and_integral # Importar utilidad de graficación
 
+# Caché de resultados: recalcular la misma integral (ej. los valores por defecto) es inmediato
+cache_resultados = CacheResultados()
+
 # --- Variables globales para almacenar datos para graficar ---
 x_puntos_graf = None
 y_puntos_graf = None
@@ -82,7 +85,7 @@ def calcular_integral():
 
         # Llamada a la función de lógica que ahora devuelve 4 valores
         # resultado_integral, detalles_str, puntos_x, puntos_y = integracion_simpson_funcion.simpson_funcion(funcion_str, a, b, N)
-        retorno_calculo = integracion_simpson_funcion.simpson_funcion(funcion_str, a, b, N)
+        retorno_calculo = cache_resultados.simpson_funcion(funcion_str, a, b, N)
         
         if not (isinstance(retorno_calculo, tuple) and len(retorno_calculo) == 4):
             messagebox.showerror("Error Interno",
@@ -99,7 +102,7 @@ def calcular_integral():
 
         if resultado_integral is not None:
             text_resultado_integral.insert(tk.END, f"{resultado_integral:.8f}")
-            text_detalles_calculo.insert(tk.END, detalles_str.replace("\\n", "\n"))
+            text_detalles_calculo.insert(tk.END, detalles_str.render(max_filas=500))
             
             x_puntos_graf = puntos_x
             y_puntos_graf = puntos_y
@@ -1,8 +1,11 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
-from ..core.simpson_vector_method import simpson_un_tercio
+from ..core.result_cache import CacheResultados
 from .graph_utility import plot_vector_integral
 
+# Caché de resultados: los vectores se identifican por un hash de su contenido
+cache_resultados = CacheResultados()
+
 class CalculadoraSimpsonVectoresUI:
     def __init__(self, root):
         self.root = root
@@ -94,7 +97,7 @@ class CalculadoraSimpsonVectoresUI:
             x_vector = self._parse_vector(x_str, "X")
             y_vector = self._parse_vector(y_str, "Y")
             
-            retorno_calculo = simpson_un_tercio(x_vector, y_vector)
+            retorno_calculo = cache_resultados.simpson_un_tercio(x_vector, y_vector)
 
             if not (isinstance(retorno_calculo, tuple) and len(retorno_calculo) == 4):
                 messagebox.showerror("Error Interno",
@@ -111,7 +114,7 @@ class CalculadoraSimpsonVectoresUI:
             self.texto_resultado.delete(1.0, tk.END)
             self.texto_resultado.insert(tk.END, f"Resultado de la integral: {resultado:.8f}\n\n")
             self.texto_resultado.insert(tk.END, "Detalles del Cálculo:\n")
-            self.texto_resultado.insert(tk.END, detalles.replace("\\n", "\n"))
+            self.texto_resultado.insert(tk.END, detalles.render(max_filas=500))
             self.texto_resultado.configure(state='disabled')
 
             self.x_vector_graf = x_vector
@@ -1,8 +1,11 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
-from ..core.trapeze_function_method import trapecio_funcion
+from ..core.result_cache import CacheResultados
 from .graph_utility import plot_function_and_integral
 
+# Caché de resultados: recalcular la misma integral (ej. los valores por defecto) es inmediato
+cache_resultados = CacheResultados()
+
 class CalculadoraTrapecioUI:
     def __init__(self, root):
         self.root = root
@@ -109,7 +112,7 @@ class CalculadoraTrapecioUI:
             return
 
         try:
-            retorno_calculo = trapecio_funcion(func_str, a, b, N)
+            retorno_calculo = cache_resultados.trapecio_funcion(func_str, a, b, N)
             
             if not (isinstance(retorno_calculo, tuple) and len(retorno_calculo) == 4):
                 messagebox.showerror("Error Interno", 
@@ -127,7 +130,7 @@ class CalculadoraTrapecioUI:
             if resultado is not None:
                 self.texto_resultado.insert(tk.END, f"Resultado de la integral: {resultado:.8f}\n\n")
                 self.texto_resultado.insert(tk.END, "Detalles del Cálculo:\n")
-                self.texto_resultado.insert(tk.END, detalles.replace("\\n", "\n"))
+                self.texto_resultado.insert(tk.END, detalles.render(max_filas=500))
                 self.x_puntos_graf = x_puntos
                 self.y_puntos_graf = y_puntos
                 self.resultado_calculado = resultado
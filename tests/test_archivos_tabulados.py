@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from integracion_numerical_app.core.simpson_stream_method import (abrir_tabulado, simpson_un_tercio_archivo,
+                                                                  simpson_un_tercio_por_bloques)
+
+X = np.linspace(0.0, 1.0, 1001)
+INTEGRAL_X3 = 0.25
+
+
+def test_npy_y_npz(tmp_path):
+    np.save(tmp_path / "datos.npy", np.column_stack((X, X ** 3)))
+    np.savez(tmp_path / "datos.npz", x=X, fx=X ** 3)
+    for nombre in ("datos.npy", "datos.npz"):
+        assert simpson_un_tercio_archivo(tmp_path / nombre)[0] == pytest.approx(INTEGRAL_X3, rel=1e-12)
+
+
+def test_raw_requiere_formato_explicito(tmp_path):
+    ruta = tmp_path / "datos.bin"
+    np.column_stack((X, X ** 3)).astype("<f8").tofile(ruta)
+    with pytest.raises(ValueError, match="formato='raw'"):
+        abrir_tabulado(ruta)
+    assert simpson_un_tercio_archivo(ruta, formato="raw")[0] == pytest.approx(INTEGRAL_X3, rel=1e-12)
+
+
+@pytest.mark.parametrize("nombre", ["datos.csv", "datos.txt"])
+def test_texto_no_se_mapea(tmp_path, nombre):
+    ruta = tmp_path / nombre
+    np.savetxt(ruta, np.column_stack((X, X ** 3)), delimiter=",")
+    with pytest.raises(ValueError, match="texto"):
+        simpson_un_tercio_archivo(ruta)
+    assert simpson_un_tercio_por_bloques(str(ruta), tamano_bloque=100)[0] == pytest.approx(INTEGRAL_X3, rel=1e-12)
+
+
+def test_bloques_float32_coinciden_con_el_mapeo(tmp_path):
+    x = np.linspace(0.0, 1.0, 10001).astype(np.float32)
+    datos = np.column_stack((x, np.sin(x)))
+    np.save(tmp_path / "datos.npy", datos)
+    datos.astype("<f4").tofile(tmp_path / "datos.bin")
+    esperado = simpson_un_tercio_archivo(tmp_path / "datos.npy", detail="none")[0]
+    assert simpson_un_tercio_archivo(tmp_path / "datos.bin", formato="raw", dtype="<f4")[0] == esperado
+    for ruta, tamano, opciones in [(tmp_path / "datos.npy", 333, {}),
+                                   (tmp_path / "datos.bin", 4096, {"formato": "binario", "dtype": "<f4"})]:
+        resultado = simpson_un_tercio_por_bloques(ruta, tamano_bloque=tamano, detail="none", **opciones)
+        assert resultado.n_puntos == x.size
+        assert resultado[0] == pytest.approx(esperado, rel=1e-12)
+
+
+def test_por_bloques_requiere_formato_binario_explicito(tmp_path):
+    ruta = tmp_path / "datos.bin"
+    np.column_stack((X, X ** 3)).astype("<f8").tofile(ruta)
+    with pytest.raises(ValueError, match="formato='binario'"):
+        simpson_un_tercio_por_bloques(ruta)
+    assert simpson_un_tercio_por_bloques(ruta, tamano_bloque=100, formato="binario")[0] == \
+        pytest.approx(INTEGRAL_X3, rel=1e-12)
+    # Un binario con extensión de texto da un ValueError, no un UnicodeDecodeError
+    (tmp_path / "binario.csv").write_bytes(b"\xff\xfe\x00\x81" * 64)
+    with pytest.raises(ValueError, match="UTF-8"):
+        simpson_un_tercio_por_bloques(tmp_path / "binario.csv")
+
+
+def test_tsv_usa_tabulador(tmp_path):
+    ruta = tmp_path / "datos.tsv"
+    np.savetxt(ruta, np.column_stack((X, X ** 3)), delimiter="\t", header="x\tfx", comments="")
+    assert simpson_un_tercio_por_bloques(ruta, tamano_bloque=100)[0] == pytest.approx(INTEGRAL_X3, rel=1e-12)
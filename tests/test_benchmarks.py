@@ -0,0 +1,20 @@
+from integracion_numerical_app.benchmarks.suite import comparar
+
+
+def _ejecucion(**casos):
+    return {"casos": {clave: {"segundos": segundos, "memoria_pico": 1000}
+                      for clave, segundos in casos.items()}}
+
+
+def test_comparar_marca_regresiones_y_casos_faltantes():
+    base = _ejecucion(igual=1.0, lento=1.0, solo_base=1.0)
+    actual = _ejecucion(igual=1.05, lento=1.5, solo_actual=1.0)
+    comparaciones, regresiones = comparar(actual, base, umbral=0.20)
+    por_caso = {c["caso"]: c for c in comparaciones}
+    assert set(por_caso) == {"igual", "lento", "solo_base", "solo_actual"}
+    assert not por_caso["igual"]["regresion"]
+    assert por_caso["lento"]["regresion"]
+    assert por_caso["solo_base"]["estado"] == "sin_medir"
+    assert por_caso["solo_actual"]["estado"] == "sin_base"
+    assert por_caso["solo_actual"]["cambio_tiempo"] is None
+    assert {c["caso"] for c in regresiones} == {"lento", "solo_base", "solo_actual"}
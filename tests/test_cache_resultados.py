@@ -0,0 +1,54 @@
+import sqlite3
+
+import numpy as np
+
+from integracion_numerical_app.core.result_cache import CacheResultados, clave_cache
+from integracion_numerical_app.core.simpson_vector_method import simpson_un_tercio
+
+
+def test_claves_canonicas():
+    assert clave_cache("simpson_funcion", "x**2+1", 0, 1, 10) == clave_cache("simpson_funcion", "(x ** 2) + 1", 0.0, 1.0, 10)
+    assert clave_cache("simpson_funcion", "x", 0, 1, 10) == clave_cache("simpson_funcion", "x", 0, 1, 10, detail="full")
+    assert clave_cache("simpson_funcion", "x", 0, 1, 10) != clave_cache("simpson_funcion", "x", 0, 1, 10.0)
+    assert clave_cache("simpson_funcion", "x", 0, 1, 10) != clave_cache("simpson_funcion", "x", 0, 1, 12)
+
+
+def test_acierto_devuelve_el_mismo_resultado():
+    cache = CacheResultados()
+    original = cache.trapecio_funcion("exp(x)", 0, 1, 2000, acumulado=True)
+    repetido = cache.trapecio_funcion("exp(x)", 0.0, 1.0, 2000, acumulado=True)
+    assert cache.estadisticas()["aciertos_memoria"] == 1
+    assert repetido[0] == original[0]
+    assert repetido[2] == original[2] and repetido[3] == original[3]
+    np.testing.assert_array_equal(repetido.acumulada, original.acumulada)
+    # Fallo y acierto devuelven el mismo reporte, truncado a max_filas_reporte filas por sección
+    assert str(repetido[1]) == str(original[1])
+    assert "filas omitidas" in str(original[1])
+    repetido[2].append(5.0) # Cada acierto es una copia
+    assert len(cache.trapecio_funcion("exp(x)", 0, 1, 2000, acumulado=True)[2]) == 2001
+
+
+def test_resultados_grandes_no_se_serializan():
+    cache = CacheResultados(max_bytes=1024)
+    cache.simpson_funcion("x", 0, 1, 1000)
+    cache.simpson_funcion("x", 0, 1, 1000)
+    estadisticas = cache.estadisticas()
+    assert estadisticas["fallos"] == 2 and estadisticas["bytes_memoria"] == 0
+
+
+def test_disco_sin_pickle(tmp_path):
+    ruta = tmp_path / "cache.sqlite"
+    x = np.linspace(0, 1, 11, dtype=np.float32)
+    with CacheResultados(ruta_sqlite=str(ruta)) as cache:
+        esperado = cache.simpson_un_tercio(x, x ** 2)
+    with CacheResultados(ruta_sqlite=str(ruta)) as cache:
+        resultado = cache.simpson_un_tercio(x, x ** 2)
+        assert cache.estadisticas()["aciertos_disco"] == 1
+    assert resultado[0] == esperado[0] == simpson_un_tercio(x, x ** 2)[0]
+    assert resultado[2].dtype == np.float32
+    # Un valor con otro formato (ej. pickle) nunca se carga: se descarta y se recalcula
+    with sqlite3.connect(ruta) as conexion:
+        conexion.execute("UPDATE resultados SET valor = ?", (b"\x80\x04cos\nsystem\n",))
+    with CacheResultados(ruta_sqlite=str(ruta)) as cache:
+        assert cache.simpson_un_tercio(x, x ** 2)[0] == esperado[0]
+        assert cache.estadisticas()["fallos"] == 1
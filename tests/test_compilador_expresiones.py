@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from integracion_numerical_app.core.expression_compiler import compilar_expresion
+from integracion_numerical_app.core.simpson_function_method import simpson_funcion
+from integracion_numerical_app.core.trapeze_function_method import trapecio_funcion
+from integracion_numerical_app.core.vectorized_engine import evaluar_en_malla, evaluar_variables_en_malla
+
+
+@pytest.mark.parametrize("f_str", ["__import__('os')", "x.__class__", "(lambda: 1)()", "'a'", "os.system"])
+def test_rechaza_construcciones_no_permitidas(f_str):
+    with pytest.raises(ValueError):
+        compilar_expresion(f_str)
+
+
+def test_np_funciona_en_el_ambito_escalar():
+    expresion = compilar_expresion("np.sin(x) + np.maximum(x, 1)")
+    assert expresion.evaluar(x=0.5) == pytest.approx(np.sin(0.5) + 1.0)
+    with pytest.raises(FloatingPointError):
+        compilar_expresion("np.log(x)").evaluar(x=-1.0)
+
+
+def test_np_en_el_camino_escalar_de_respaldo():
+    # max() no se puede vectorizar: se usa el camino escalar, que también conoce 'np'
+    escalar = simpson_funcion("max(np.sin(x), 0)", 0.0, 3.0, 30, detail="none")
+    vectorizado = simpson_funcion("np.maximum(np.sin(x), 0)", 0.0, 3.0, 30, detail="none")
+    assert escalar[0] == pytest.approx(vectorizado[0], rel=1e-13)
+
+
+@pytest.mark.parametrize("f_str", ["np.mean(x)", "np.cumsum(x)", "np.sum(x)"])
+def test_np_solo_expone_ufuncs(f_str):
+    integral, mensaje, _, _ = trapecio_funcion(f_str, 0, 1, 10)
+    assert integral is None
+    assert "has no attribute" in mensaje
+
+
+def test_solo_se_expanden_las_constantes_en_la_variable():
+    x = np.linspace(0.0, 1.0, 5)
+    np.testing.assert_array_equal(evaluar_en_malla("2 + pi", x), np.full(5, 2 + np.pi))
+    assert evaluar_en_malla("x[0] + x", x) is None  # Subíndices: no permitido
+    y = evaluar_variables_en_malla("x + 0 * x", (5, 3), x=x[:, None], y=np.zeros((1, 3)))
+    np.testing.assert_array_equal(y, np.repeat(x[:, None], 3, axis=1))
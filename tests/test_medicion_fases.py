@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from integracion_numerical_app.core.integration_result import ResultadoIntegracion
+from integracion_numerical_app.core.phase_timing import RECOLECTOR_FASES, midiendo_fases
+from integracion_numerical_app.core.simpson_function_method import simpson_funcion
+from integracion_numerical_app.core.simpson_vector_method import (simpson_no_uniforme, simpson_un_tercio,
+                                                                  simpson_un_tercio_canales)
+from integracion_numerical_app.core.trapeze_function_method import trapecio_funcion
+
+
+@pytest.mark.parametrize("metodo", [simpson_funcion, trapecio_funcion])
+def test_la_sonda_no_cuenta_como_evaluacion(metodo):
+    RECOLECTOR_FASES.limpiar()
+    with midiendo_fases():
+        fijo = metodo("exp(x)", 0, 1, 20, detail="none")
+        auto = metodo("exp(x)", 0, 1, 6, detail="none", auto_N=True, tol=1e-10)
+    assert fijo.medicion["evaluaciones"] == 21
+    assert "sonda" in fijo.medicion["fases"]
+    assert auto.medicion["evaluaciones"] == auto.info["evaluaciones"]
+    nombre = fijo.medicion["metodo"]
+    assert RECOLECTOR_FASES.resumen()[nombre]["evaluaciones"] == 21 + auto.info["evaluaciones"]
+    RECOLECTOR_FASES.limpiar()
+
+
+@pytest.mark.parametrize("detail", ["none", "summary", "full"])
+@pytest.mark.parametrize("acumulado", [False, True])
+def test_simpson_un_tercio_siempre_devuelve_resultado(detail, acumulado):
+    x = np.linspace(0, 1, 11)
+    resultado = simpson_un_tercio(x, x ** 2, detail=detail, acumulado=acumulado)
+    assert isinstance(resultado, ResultadoIntegracion)
+    assert resultado[0] == pytest.approx(1 / 3, rel=1e-13)
+    assert ("acumulada" in resultado.info) == acumulado
+
+
+@pytest.mark.parametrize("detail", ["none", "full"])
+def test_simpson_no_uniforme_devuelve_resultado(detail):
+    x = np.array([0.0, 0.1, 0.3, 0.4, 0.7, 1.0])
+    with midiendo_fases():
+        resultado = simpson_no_uniforme(x, x ** 2, detail=detail)
+    assert isinstance(resultado, ResultadoIntegracion)
+    assert resultado[0] == pytest.approx(1 / 3, rel=1e-12)
+    assert resultado.medicion["metodo"] == "simpson_no_uniforme"
+    uniforme = simpson_no_uniforme(np.linspace(0, 1, 11), np.linspace(0, 1, 11) ** 2, detail=detail)
+    assert isinstance(uniforme, ResultadoIntegracion)
+
+
+@pytest.mark.parametrize("detail", ["none", "summary"])
+def test_simpson_canales_devuelve_resultado(detail):
+    x = np.linspace(0, 1, 11)
+    with midiendo_fases():
+        resultado = simpson_un_tercio_canales(x, np.vstack([x ** 2, x ** 3]), detail=detail)
+    assert isinstance(resultado, ResultadoIntegracion)
+    np.testing.assert_allclose(resultado[0], [1 / 3, 1 / 4], rtol=1e-13)
+    assert "suma_ponderada" in resultado.medicion["fases"]
@@ -0,0 +1,166 @@
+import math
+
+import numpy as np
+import pytest
+
+from integracion_numerical_app.core.clenshaw_curtis_method import clenshaw_curtis_funcion
+from integracion_numerical_app.core.double_integral_method import integral_doble
+from integracion_numerical_app.core.filon_method import filon_funcion
+from integracion_numerical_app.core.gauss_kronrod_method import gauss_kronrod_adaptativo
+from integracion_numerical_app.core.gauss_legendre_method import gauss_legendre_funcion
+from integracion_numerical_app.core.monte_carlo_method import integrar_monte_carlo
+from integracion_numerical_app.core.simpson_function_method import simpson_adaptativo, simpson_funcion
+from integracion_numerical_app.core.simpson_vector_method import (simpson_no_uniforme, simpson_un_tercio,
+                                                                  simpson_un_tercio_canales)
+from integracion_numerical_app.core.tanh_sinh_method import tanh_sinh_funcion
+from integracion_numerical_app.core.trapeze_function_method import romberg_funcion, trapecio_funcion
+from integracion_numerical_app.core.vectorized_engine import (coeficiente, construir_malla, evaluar_en_malla,
+                                                              obtener_pesos, suma_ponderada)
+
+E_MENOS_1 = math.e - 1.0
+
+
+# --- Motor vectorizado ---
+
+@pytest.mark.parametrize("regla", ["simpson", "trapecio"])
+@pytest.mark.parametrize("N", [2, 6, 10, 1000])
+def test_suma_ponderada_coincide_con_los_pesos(regla, N):
+    y = np.random.default_rng(N).random(N + 1)
+    assert suma_ponderada(regla, y) == pytest.approx(float(np.dot(obtener_pesos(regla, N), y)), rel=1e-13)
+    assert [coeficiente(regla, i, N) for i in range(N + 1)] == obtener_pesos(regla, N).tolist()
+
+
+def test_suma_ponderada_por_eje():
+    y = np.random.default_rng(0).random((3, 11))
+    esperado = y @ obtener_pesos("simpson", 10)
+    np.testing.assert_allclose(suma_ponderada("simpson", y, eje=1), esperado, rtol=1e-13)
+    np.testing.assert_allclose(suma_ponderada("simpson", y.T, eje=0), esperado, rtol=1e-13)
+
+
+def test_regla_desconocida():
+    with pytest.raises(ValueError):
+        suma_ponderada("punto_medio", [1.0, 2.0, 3.0])
+
+
+@pytest.mark.parametrize("metodo", [simpson_funcion, trapecio_funcion])
+@pytest.mark.parametrize("f_vectorizable, f_escalar", [
+    ("x**2 * exp(-x)", "x**2 * exp(-x) if x >= 0 else 0"),
+    ("sin(3*x) + 1", "max(sin(3*x) + 1, 0)"),
+])
+def test_caminos_vectorizado_y_escalar_coinciden(metodo, f_vectorizable, f_escalar):
+    assert evaluar_en_malla(f_vectorizable, construir_malla("simpson", 0.0, 2.0, 10)) is not None
+    assert evaluar_en_malla(f_escalar, construir_malla("simpson", 0.0, 2.0, 10)) is None
+    vectorizado = metodo(f_vectorizable, 0.0, 2.0, 100, detail="none")
+    escalar = metodo(f_escalar, 0.0, 2.0, 100, detail="none")
+    assert vectorizado[0] == pytest.approx(escalar[0], rel=1e-13)
+    np.testing.assert_allclose(vectorizado[2], escalar[2], rtol=1e-15)
+    np.testing.assert_allclose(vectorizado[3], escalar[3], rtol=1e-13)
+
+
+# --- Valores conocidos ---
+
+def test_simpson_es_exacto_para_cubicas():
+    integral, detalle, x, y = simpson_funcion("3*x**3 - 2*x + 1", 0, 2, 6)
+    assert integral == pytest.approx(12.0 - 4.0 + 2.0, rel=1e-13)
+    assert len(x) == len(y) == 7
+    assert "Simpson 1/3" in str(detalle)
+
+
+def test_trapecio_con_error_conocido():
+    # Error del trapecio para x^2 en [0, 1]: h^2 / 6
+    N = 10
+    assert trapecio_funcion("x**2", 0, 1, N)[0] == pytest.approx(1 / 3 + (1 / N) ** 2 / 6, rel=1e-12)
+
+
+@pytest.mark.parametrize("metodo", [simpson_funcion, trapecio_funcion])
+def test_auto_n_alcanza_la_tolerancia(metodo):
+    resultado = metodo("exp(x)", 0, 1, 6, detail="none", auto_N=True, tol=1e-10)
+    assert resultado.info["convergio"]
+    assert resultado[0] == pytest.approx(E_MENOS_1, abs=1e-8)
+
+
+def test_acumulado_termina_en_la_integral():
+    resultado = simpson_funcion("cos(x)", 0, math.pi / 2, 20, detail="none", acumulado=True)
+    assert resultado.acumulada[0] == 0.0
+    assert resultado.acumulada[-1] == pytest.approx(resultado[0], rel=1e-13)
+    np.testing.assert_allclose(resultado.acumulada, np.sin(resultado.x_acumulada), atol=1e-6)
+
+
+@pytest.mark.parametrize("llamada, esperado, tolerancia", [
+    (lambda: simpson_adaptativo("exp(x)", 0, 1, tol=1e-10, detail="none"), E_MENOS_1, 1e-9),
+    (lambda: romberg_funcion("exp(x)", 0, 1, tol=1e-12, detail="none"), E_MENOS_1, 1e-11),
+    (lambda: gauss_legendre_funcion("x**9", 0, 1, 4, orden=5, detail="none"), 0.1, 1e-14),
+    (lambda: gauss_kronrod_adaptativo("exp(x)", 0, 1, detail="none"), E_MENOS_1, 1e-12),
+    (lambda: clenshaw_curtis_funcion("exp(x)", 0, 1, detail="none"), E_MENOS_1, 1e-12),
+    (lambda: tanh_sinh_funcion("1/sqrt(x)", 0, 1, detail="none"), 2.0, 1e-10),
+    (lambda: tanh_sinh_funcion("exp(-x)", 0, math.inf, detail="none"), 1.0, 1e-10),
+    (lambda: filon_funcion("1", 0, math.pi, 10, 1, detail="none"), 2.0, 1e-10),
+    (lambda: integral_doble("x*y", 0, 1, 0, 2, 10, 10, detail="none"), 1.0, 1e-13),
+    (lambda: integral_doble("x + y", 0, 1, 0, 1, 4, 6, regla="trapecio", detail="none"), 1.0, 1e-13),
+])
+def test_valores_conocidos(llamada, esperado, tolerancia):
+    resultado = llamada()
+    assert resultado[0] is not None, resultado[1]
+    assert resultado[0] == pytest.approx(esperado, abs=tolerancia)
+
+
+@pytest.mark.parametrize("metodo", ["sobol", "halton", "aleatorio"])
+def test_monte_carlo(metodo):
+    resultado = integrar_monte_carlo("x*y", {"x": (0, 1), "y": (0, 1)}, metodo=metodo,
+                                     n_max=1 << 14, tamano_bloque=1 << 12, detail="none")
+    assert resultado.info["evaluaciones"] == 1 << 14
+    assert resultado[0] == pytest.approx(0.25, abs=6 * resultado.info["error_estandar"])
+
+
+def test_simpson_tabulado_uniforme_y_no_uniforme():
+    x = np.linspace(0, 1, 101)
+    assert simpson_un_tercio(x, x ** 3, detail="none")[0] == pytest.approx(0.25, rel=1e-13)
+    x_no_uniforme = np.sort(np.concatenate(([0.0, 1.0], np.random.default_rng(1).random(99))))
+    assert simpson_no_uniforme(x_no_uniforme, x_no_uniforme ** 2, detail="none")[0] == pytest.approx(1 / 3, rel=1e-10)
+
+
+def test_simpson_canales_coincide_con_cada_canal():
+    x = np.linspace(0, 2, 51)
+    canales = np.vstack([np.sin(x), x ** 2, np.exp(-x)])
+    integrales = simpson_un_tercio_canales(x, canales, tamano_bloque=64, detail="none")[0]
+    for integral, fx in zip(integrales, canales):
+        assert integral == pytest.approx(simpson_un_tercio(x, fx, detail="none")[0], rel=1e-13)
+
+
+# --- Errores: (None, mensaje, None, None) ---
+
+@pytest.mark.parametrize("llamada, fragmento", [
+    (lambda: simpson_funcion("", 0, 1, 10), "cadena de texto no vacía"),
+    (lambda: simpson_funcion("x", 1, 0, 10), "mayor que el límite inferior"),
+    (lambda: simpson_funcion("x", 0, 1, 7), "debe ser par"),
+    (lambda: simpson_funcion("x", 0, 1, 4), ">= 6"),
+    (lambda: simpson_funcion("x", 0, 1, 10, detail="todo"), "nivel de detalle"),
+    (lambda: simpson_funcion("x + z", 0, 1, 10), "no reconocida"),
+    (lambda: simpson_funcion("1 / (x - 0.5)", 0, 1, 10), "x = 0.5000"),
+    (lambda: trapecio_funcion("x", 0, 1, 0), "N"),
+    (lambda: trapecio_funcion("log(0.55 - x)", 0, 1, 10), "x = 0.6000"),
+    (lambda: simpson_adaptativo("x", 0, 1, tol=0), "tolerancia"),
+    (lambda: romberg_funcion("x", 0, 1, max_niveles=0), "max_niveles"),
+    (lambda: gauss_kronrod_adaptativo("log(x)", -1, 1), "Error al evaluar"),
+    (lambda: integral_doble("x * z", 0, 1, 0, 1, 4, 4), "variables x e y"),
+    (lambda: integral_doble("x * y", 0, 1, 0, 1, 3, 4), "pares"),
+    (lambda: integrar_monte_carlo("x", [(0, 1)]), "diccionario"),
+])
+def test_tuplas_de_error(llamada, fragmento):
+    integral, mensaje, x, y = llamada()
+    assert integral is None and x is None and y is None
+    assert mensaje.startswith("Error")
+    assert fragmento in mensaje
+
+
+# --- Niveles del reporte ---
+
+@pytest.mark.parametrize("metodo", [simpson_funcion, trapecio_funcion])
+def test_reporte_resumen_tiene_su_linea_de_resultado(metodo):
+    integral, detalle, _, _ = metodo("x**2", 0, 1, 6, detail="summary")
+    texto = str(detalle)
+    assert "Suma completa" not in texto
+    assert "\n           ≈" not in texto
+    assert texto.rstrip().splitlines()[-1].startswith("Integral ≈")
+    assert texto.rstrip().endswith(f"{integral:.8f}")
+    assert metodo("x**2", 0, 1, 6, detail="none")[1] is None
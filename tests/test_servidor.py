@@ -0,0 +1,171 @@
+import asyncio
+import http.client
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from integracion_numerical_app.cli import trabajo_desde_registro
+from integracion_numerical_app.server import (ServidorIntegracion, _ejecutar_bloque_con_limite, _inicializar_proceso,
+                                              _puntos_solicitados)
+
+
+@pytest.fixture(scope="module")
+def servidor():
+    """Servidor real en un puerto libre (puerto=0), con su propio bucle de eventos en un hilo."""
+    servidor = ServidorIntegracion(puerto=0, max_workers=1, max_N=10 ** 6, max_trabajos=10, timeout=5.0)
+    loop = asyncio.new_event_loop()
+    hilo = threading.Thread(target=loop.run_forever, daemon=True)
+    hilo.start()
+    asyncio.run_coroutine_threadsafe(servidor.iniciar(), loop).result(timeout=60)
+    yield servidor
+    asyncio.run_coroutine_threadsafe(servidor.detener(), loop).result(timeout=60)
+    loop.call_soon_threadsafe(loop.stop)
+    hilo.join()
+
+
+def _pedir(servidor, metodo, ruta, cuerpo=None, encabezados=None):
+    conexion = http.client.HTTPConnection("127.0.0.1", servidor.puerto, timeout=30)
+    try:
+        conexion.request(metodo, ruta, body=cuerpo, headers=encabezados or {})
+        respuesta = conexion.getresponse()
+        return respuesta.status, json.loads(respuesta.read())
+    finally:
+        conexion.close()
+
+
+def _integrar(servidor, peticion):
+    return _pedir(servidor, "POST", "/integrar", json.dumps(peticion).encode("utf-8"),
+                  {"Content-Type": "application/json"})
+
+
+def test_integra_trabajos(servidor):
+    estado, respuesta = _integrar(servidor, {"trabajos": [
+        {"id": "s", "method": "simpson", "f_str": "x**3", "a": 0, "b": 2, "N": 10},
+        {"id": "malo", "method": "simpson", "f_str": "x"},
+        {"id": "gk", "method": "gauss_kronrod", "f_str": "exp(x)", "a": 0, "b": 1},
+    ]})
+    assert estado == 200
+    simpson, malo, kronrod = respuesta["resultados"]
+    assert simpson["id"] == "s" and simpson["integral"] == pytest.approx(4.0)
+    assert malo["integral"] is None and "Faltan campos obligatorios" in malo["error"]
+    assert kronrod["integral"] == pytest.approx(1.718281828459045)
+
+
+def test_salud_y_rutas(servidor):
+    estado, respuesta = _pedir(servidor, "GET", "/salud")
+    assert estado == 200
+    assert respuesta["procesos"] == 1 and respuesta["lotes_en_ejecucion"] == 0
+    assert _pedir(servidor, "GET", "/otra")[0] == 404
+    assert _pedir(servidor, "GET", "/integrar")[0] == 405
+    assert _pedir(servidor, "POST", "/integrar", b"{no es json")[0] == 400
+
+
+@pytest.mark.parametrize("longitud", ["abc", "-5"])
+def test_content_length_invalido(servidor, longitud):
+    conexion = http.client.HTTPConnection("127.0.0.1", servidor.puerto, timeout=30)
+    try:
+        conexion.putrequest("POST", "/integrar")
+        conexion.putheader("Content-Length", longitud)
+        conexion.endheaders()
+        respuesta = conexion.getresponse()
+        assert respuesta.status == 400
+        assert "Content-Length" in json.loads(respuesta.read())["error"]
+    finally:
+        conexion.close()
+
+
+def _enviar_crudo(servidor, datos):
+    with socket.create_connection(("127.0.0.1", servidor.puerto), timeout=30) as conexion:
+        try:
+            conexion.sendall(datos)
+        except ConnectionError: # El servidor ya respondió y cerró
+            pass
+        respuesta = b""
+        while bloque := conexion.recv(65536):
+            respuesta += bloque
+    return int(respuesta.split(b" ", 2)[1])
+
+
+@pytest.mark.parametrize("datos, estado", [
+    (b"GET /" + b"a" * 20000 + b" HTTP/1.1\r\n\r\n", 400),
+    (b"GET /salud HTTP/1.1\r\nX-Largo: " + b"a" * 20000 + b"\r\n\r\n", 431),
+    (b"GET /salud HTTP/1.1\r\n" + b"".join(b"X-%d: 1\r\n" % i for i in range(200)) + b"\r\n", 431),
+    (b"GET /salud HTTP/1.1\r\n" + b"".join(b"X-%d: " % i + b"a" * 4000 + b"\r\n" for i in range(20)) + b"\r\n",
+     431),
+])
+def test_limites_de_encabezados(servidor, datos, estado):
+    assert _enviar_crudo(servidor, datos) == estado
+    assert _pedir(servidor, "GET", "/salud")[0] == 200
+
+
+def test_limites_por_peticion(servidor):
+    trabajo = {"method": "simpson", "f_str": "x", "a": 0, "b": 1, "N": 10}
+    estado, respuesta = _integrar(servidor, {"trabajos": [trabajo] * 11})
+    assert estado == 413 and "máximo es 10" in respuesta["error"]
+    estado, respuesta = _integrar(servidor, {"trabajos": [trabajo, dict(trabajo, N=2 * 10 ** 6)]})
+    assert estado == 400 and "posición 1" in respuesta["error"]
+    romberg = {"method": "romberg", "f_str": "x", "a": 0, "b": 1, "max_niveles": 30}
+    assert _integrar(servidor, romberg)[0] == 400
+
+
+@pytest.mark.skipif(not hasattr(signal, "setitimer"), reason="Sin SIGALRM los trabajos vencidos no se interrumpen")
+def test_tiempo_agotado_libera_el_proceso(servidor):
+    # max() obliga al camino escalar: 10^6 evaluaciones tardan más de 2 s
+    lento = {"method": "simpson", "f_str": "max(x, 0.5) * exp(-x) + sin(x)**2 + cos(x)**2",
+             "a": 0, "b": 1, "N": 10 ** 6}
+    inicio = time.monotonic()
+    estado, respuesta = _integrar(servidor, {"trabajos": [lento], "timeout": 0.3})
+    assert estado == 504
+    # El trabajo se interrumpe en el pool al vencer la petición
+    while _pedir(servidor, "GET", "/salud")[1]["lotes_en_ejecucion"]:
+        assert time.monotonic() - inicio < 1.2, "El trabajo vencido sigue ocupando el proceso"
+        time.sleep(0.02)
+    estado, respuesta = _integrar(servidor, {"method": "trapecio", "f_str": "x", "a": 0, "b": 1, "N": 4})
+    assert estado == 200 and respuesta["resultados"][0]["integral"] == pytest.approx(0.5)
+
+
+def _ejecutar_sin_sigalrm(trabajo):
+    # Simula una llamada a C que no revisa las señales: SIGALRM queda bloqueada
+    _inicializar_proceso()
+    signal.pthread_sigmask(signal.SIG_BLOCK, [signal.SIGALRM])
+    _ejecutar_bloque_con_limite([(0, trabajo, time.time() + 0.3)], "none")
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGXCPU"), reason="Sin límite de CPU los procesos atascados no se terminan")
+def test_limite_de_cpu_termina_el_proceso_atascado():
+    trabajo = trabajo_desde_registro({"method": "simpson", "f_str": "x + 10**10**7", "a": 0, "b": 1, "N": 10})
+    proceso = multiprocessing.Process(target=_ejecutar_sin_sigalrm, args=(trabajo,))
+    inicio = time.monotonic()
+    proceso.start()
+    proceso.join(15)
+    assert proceso.exitcode == -signal.SIGXCPU
+    assert time.monotonic() - inicio < 8
+
+
+def test_pool_roto_se_reemplaza(servidor):
+    lento = {"method": "simpson", "f_str": "max(x, 0.5) * exp(-x) + sin(x)**2 + cos(x)**2",
+             "a": 0, "b": 1, "N": 10 ** 6}
+    with ThreadPoolExecutor(1) as hilos:
+        respuesta = hilos.submit(_integrar, servidor, {"trabajos": [lento], "timeout": 5})
+        while not _pedir(servidor, "GET", "/salud")[1]["lotes_en_ejecucion"]:
+            time.sleep(0.01)
+        for proceso in multiprocessing.active_children(): # Los procesos del pool
+            os.kill(proceso.pid, signal.SIGKILL)
+        estado, cuerpo = respuesta.result(timeout=30)
+    assert estado == 200 and "BrokenProcessPool" in cuerpo["resultados"][0]["error"]
+    estado, cuerpo = _integrar(servidor, {"method": "trapecio", "f_str": "x", "a": 0, "b": 1, "N": 4})
+    assert estado == 200 and cuerpo["resultados"][0]["integral"] == pytest.approx(0.5)
+
+
+def test_puntos_solicitados():
+    assert _puntos_solicitados(("simpson", "x", 0, 1, 100, {})) == 100
+    assert _puntos_solicitados(("gauss_legendre", "x", 0, 1, 100, {"orden": 7})) == 700
+    assert _puntos_solicitados(("doble", "x*y", 0, 1, None, {"Nx": 9, "Ny": 99})) == 1000
+    assert _puntos_solicitados(("simpson", "x", 0, 1, "10", {"N_max": True})) == 1